@@ -0,0 +1,355 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import os
+import tempfile
+import time
+import html_node
+from fast_renderer import markdown_to_html
+from markdown_parser import markdown_to_blocks
+from markdown_processor import markdown_to_html_node
+from node_parser import text_to_text_nodes
+from page_generator import generate_pages_recursive
+
+# Linear code grows by SCALE_FACTOR when the input does; quadratic code by
+# its square. A run passes while growth stays under SCALE_FACTOR * TOLERANCE.
+SCALE_FACTOR = 8
+TOLERANCE = 2.5
+
+
+def _many_links(n):
+    return " ".join(f"[link {i}](/page/{i})" for i in range(n))
+
+def _many_images(n):
+    return " ".join(f"![alt {i}](/img/{i}.png)" for i in range(n))
+
+def _unbalanced_brackets(n):
+    return "[" * n + "](" + "x" * n + " ![" * n
+
+def _unclosed_urls(n):
+    return "[a](" * n + "tail"
+
+def _whitespace_runs(n):
+    return "a\n" + " \t" * n + "\nb\n" + "\n" + " " * n + "x"
+
+def _many_blocks(n):
+    return "\n\n".join(f"Paragraph {i} with **bold** text" for i in range(n))
+
+def _many_delimiters(n):
+    return "**b** _i_ `c` " * n
+
+def render(markdown):
+    return markdown_to_html_node(markdown).to_html()
+
+# name -> (input generator, base size, function under test)
+PATHOLOGICAL_INPUTS = {
+    "many_links": (_many_links, 4000, text_to_text_nodes),
+    "many_images": (_many_images, 4000, text_to_text_nodes),
+    "unbalanced_brackets": (_unbalanced_brackets, 20000, text_to_text_nodes),
+    "unclosed_urls": (_unclosed_urls, 10000, text_to_text_nodes),
+    "many_delimiters": (_many_delimiters, 4000, text_to_text_nodes),
+    "whitespace_runs": (_whitespace_runs, 50000, render),
+    "many_blocks": (_many_blocks, 1000, render),
+}
+
+def time_samples(func, arg, repeats=3):
+    """
+    Return the wall-clock time of each of several runs of func(arg).
+
+    The garbage collector is paused while timing, as timeit does, so that
+    collections triggered by large inputs do not distort the measurements.
+    """
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(arg)
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+def time_call(func, arg, repeats=3):
+    """
+    Return the best wall-clock time of func(arg) over several runs.
+    """
+    return min(time_samples(func, arg, repeats))
+
+def scaling_ratio(make_input, n, func=render, factor=SCALE_FACTOR):
+    """
+    Return how much slower func gets when the input grows by factor.
+    """
+    small = time_call(func, make_input(n))
+    large = time_call(func, make_input(n * factor))
+    return large / small
+
+def check_linear_scaling(inputs=None):
+    """
+    Measure every pathological input and fail if any scales superlinearly.
+
+    Returns:
+        Dict[str, float]: The measured scaling ratio per input.
+
+    Raises:
+        AssertionError: If any ratio exceeds SCALE_FACTOR * TOLERANCE.
+    """
+    inputs = PATHOLOGICAL_INPUTS if inputs is None else inputs
+    ratios = {}
+    for name, (make_input, n, func) in inputs.items():
+        ratio = scaling_ratio(make_input, n, func)
+        if ratio > SCALE_FACTOR * TOLERANCE:
+            # Retry once so a noisy neighbour does not fail the run
+            ratio = min(ratio, scaling_ratio(make_input, n, func))
+        ratios[name] = ratio
+
+    limit = SCALE_FACTOR * TOLERANCE
+    failures = {name: ratio for name, ratio in ratios.items() if ratio > limit}
+    if failures:
+        details = ", ".join(f"{name}: x{ratio:.1f}" for name, ratio in failures.items())
+        raise AssertionError(f"Superlinear scaling (limit x{limit:.0f} for x{SCALE_FACTOR} input): {details}")
+    return ratios
+
+
+def _unescaped_leaf_to_html(self, minify=False):
+    # LeafNode.to_html as it was before escaping was added
+    if self.value is None:
+        raise ValueError("LeafNode must have a value")
+    value = self.value
+    if minify and self.tag not in html_node.PRESERVE_WHITESPACE_TAGS:
+        value = html_node._HTML_WHITESPACE.sub(" ", value)
+    if self.tag is None:
+        return value
+    return f"<{self.tag}{_unescaped_props_to_html(self)}>{value}</{self.tag}>"
+
+def _unescaped_props_to_html(self):
+    if self.props is None:
+        return ""
+    html_props = ""
+    for key, value in self.props.items():
+        html_props += f' {key}="{value}"'
+    return html_props
+
+def load_corpus(content_dir=os.path.join(os.path.dirname(__file__), "..", "content")):
+    """
+    Return the site's markdown documents concatenated into one corpus.
+    """
+    documents = []
+    for root, dirs, files in os.walk(content_dir):
+        for file in sorted(files):
+            if file.endswith(".md"):
+                with open(os.path.join(root, file), encoding="utf-8") as f:
+                    documents.append(f.read())
+    return "\n\n".join(documents)
+
+def escaping_overhead(markdown=None, copies=20, rounds=5, include_parse=True):
+    """
+    Compare rendering with and without HTML escaping.
+
+    The escaping and reference renderers are timed alternately over several
+    rounds and the median ratio is returned to damp machine noise.
+
+    Args:
+        markdown (str): Document to render; defaults to the site content.
+        copies (int): How many times the document is repeated.
+        rounds (int): Number of alternating measurements.
+        include_parse (bool): Time markdown-to-HTML end to end rather than
+            serialization of a prebuilt tree only.
+
+    Returns:
+        float: Escaped time divided by unescaped time (1.0 means no overhead).
+    """
+    markdown = "\n\n".join([markdown or load_corpus()] * copies)
+    if include_parse:
+        subject, func = markdown, render
+    else:
+        subject, func = markdown_to_html_node(markdown), lambda node: node.to_html()
+    escaping = (html_node.LeafNode.to_html, html_node.HTMLNode.props_to_html)
+    ratios = []
+    for _ in range(rounds):
+        escaped = time_call(func, subject)
+        html_node.LeafNode.to_html = _unescaped_leaf_to_html
+        html_node.HTMLNode.props_to_html = _unescaped_props_to_html
+        try:
+            unescaped = time_call(func, subject)
+        finally:
+            html_node.LeafNode.to_html, html_node.HTMLNode.props_to_html = escaping
+        ratios.append(escaped / unescaped)
+    return sorted(ratios)[len(ratios) // 2]
+
+
+# Baseline regression gate. A benchmark regresses when its median is more
+# than REGRESSION_TOLERANCE slower than the baseline median and even its
+# fastest run is slower than that median, i.e. the slowdown is not noise.
+BASELINE_VERSION = 1
+BASELINE_REPEATS = 7
+REGRESSION_TOLERANCE = 0.2
+
+_WORDS = ("elf", "ring", "shire", "mountain", "river", "tower", "road", "song", "star", "forest")
+
+def synthetic_page(i):
+    """
+    Return a deterministic markdown page exercising every block and inline type.
+    """
+    words = [_WORDS[(i * 7 + j * 3) % len(_WORDS)] for j in range(60)]
+    text = " ".join(words)
+    return "\n\n".join([
+        f"# Page {i}",
+        f"A paragraph about the {text} with **bold {words[0]}**, _italic {words[1]}_ and `code {i}`.\n"
+        f"It links to [page {i + 1}](/pages/{i + 1}) and shows ![image {i}](/images/{i}.png).",
+        f"## Section {i}",
+        "\n".join(f"- item {j} about the **{words[j]}**" for j in range(8)),
+        "\n".join(f"{j}. step {j} along the _{words[j]}_" for j in range(1, 9)),
+        f"> A quote about the {text}\n> spanning two lines",
+        f"```\ndef page_{i}():\n    return {i}\n```",
+        text,
+    ])
+
+def synthetic_corpus(pages=60):
+    """
+    Return the fixed corpus the baseline benchmarks run over.
+    """
+    return [synthetic_page(i) for i in range(pages)]
+
+def _run_each(func):
+    return lambda documents: [func(document) for document in documents]
+
+def _inline_runs(documents):
+    # The text of every paragraph, as text_to_text_nodes sees it
+    return [block.replace("\n", " ") for document in documents for block in markdown_to_blocks(document)
+            if block[0].isalpha()]
+
+def _build_site(documents):
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        for i, document in enumerate(documents):
+            os.makedirs(os.path.join(content, f"section{i % 6}"), exist_ok=True)
+            with open(os.path.join(content, f"section{i % 6}", f"page{i}.md"), "w", encoding="utf-8") as f:
+                f.write(document)
+        template = os.path.join(root, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content, template, os.path.join(root, "public"))
+
+# name -> (benchmark function, input derived from the corpus)
+BASELINE_BENCHMARKS = {
+    "markdown_to_blocks": (_run_each(markdown_to_blocks), lambda corpus: corpus),
+    "text_to_text_nodes": (_run_each(text_to_text_nodes), _inline_runs),
+    "markdown_to_html_node": (_run_each(markdown_to_html_node), lambda corpus: corpus),
+    "markdown_to_html": (_run_each(markdown_to_html), lambda corpus: corpus),
+    "generate_pages_recursive": (_build_site, lambda corpus: corpus),
+}
+
+def run_benchmarks(repeats=BASELINE_REPEATS, corpus=None, names=None):
+    """
+    Time every baseline benchmark, or the given ones, over the synthetic corpus.
+
+    Returns:
+        dict: A baseline document with the samples and median of each benchmark.
+    """
+    corpus = synthetic_corpus() if corpus is None else corpus
+    results = {}
+    for name, (func, make_input) in BASELINE_BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        subject = make_input(corpus)
+        func(subject)  # warm up caches and imports
+        samples = time_samples(func, subject, repeats)
+        results[name] = {"median": statistics.median(samples), "samples": samples}
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "repeats": repeats,
+        "benchmarks": results,
+    }
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare a run of run_benchmarks with a stored baseline.
+
+    Returns:
+        Dict[str, float]: Median ratio (new / baseline) of every benchmark
+        that regressed. Benchmarks missing from the baseline are skipped.
+
+    Raises:
+        ValueError: If the baseline has an unknown format.
+    """
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported benchmark baseline version: {baseline.get('version')}")
+    regressions = {}
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + tolerance and min(result["samples"]) > base["median"]:
+            regressions[name] = ratio
+    return regressions
+
+def load_baseline(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run the parser and build benchmarks.")
+    parser.add_argument("--save-baseline", metavar="PATH",
+                        help="time the baseline benchmarks and store the results in PATH")
+    parser.add_argument("--check-baseline", metavar="PATH",
+                        help="time the baseline benchmarks and exit non-zero on a regression against PATH")
+    parser.add_argument("--repeats", type=int, default=BASELINE_REPEATS,
+                        help="runs per benchmark (default %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="allowed relative slowdown of the median (default %(default)s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.save_baseline or args.check_baseline:
+        results = run_benchmarks(args.repeats)
+        baseline = load_baseline(args.check_baseline) if args.check_baseline else None
+        for name, result in results["benchmarks"].items():
+            line = f"{name:<26} {result['median'] * 1000:8.2f} ms"
+            if baseline is not None and name in baseline["benchmarks"]:
+                line += f"  ({result['median'] / baseline['benchmarks'][name]['median'] - 1:+.1%} vs baseline)"
+            print(line)
+        if args.save_baseline:
+            save_baseline(args.save_baseline, results)
+            print(f"Baseline written to {args.save_baseline}")
+        if baseline is not None:
+            if baseline.get("python") != results["python"]:
+                print(f"Warning: baseline was recorded with Python {baseline.get('python')}")
+            regressions = compare_to_baseline(results, baseline, args.tolerance)
+            if regressions:
+                # Measure again so a noisy neighbour does not fail the run
+                retry = run_benchmarks(args.repeats, names=regressions)
+                regressions = compare_to_baseline(retry, baseline, args.tolerance)
+            if regressions:
+                details = ", ".join(f"{name}: {ratio - 1:+.1%}" for name, ratio in regressions.items())
+                print(f"Regression (tolerance {args.tolerance:.0%}): {details}")
+                sys.exit(1)
+        return
+
+    try:
+        ratios = check_linear_scaling()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    for name, ratio in ratios.items():
+        print(f"{name:<22} x{ratio:.1f} for x{SCALE_FACTOR} input")
+    print(f"{'escaping overhead':<22} {(escaping_overhead() - 1) * 100:+.1f}% end to end, "
+          f"{(escaping_overhead(include_parse=False) - 1) * 100:+.1f}% serialization only")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import time
+import image_probe
+from build_errors import ErrorReport
+from page_generator import render_page
+from sources import DirectorySource
+from static_files import is_template_file
+from template_engine import compile_template, select_layout
+
+
+class Site:
+    """
+    What to build: where the content and static files come from and how to render them.
+
+    Args:
+        content (Source): The markdown pages.
+        static (Source): Static files, the template, layouts and partials.
+            Every file it lists is published, so a DirectorySource for it
+            should not apply the content ignore patterns.
+        base_path (str): Prefix applied to root-relative href/src paths.
+        minify (bool): Strip insignificant whitespace from the pages.
+        template (str): Path of the default template within static.
+        fast (bool): Render without building a node tree (see render_page).
+    """
+
+    def __init__(self, content, static, base_path="/", minify=False, template="template.html", fast=False):
+        self.content = content
+        self.static = static
+        self.base_path = base_path
+        self.minify = minify
+        self.template = template
+        self.fast = fast
+
+    @classmethod
+    def from_directory(cls, root=".", **options):
+        """
+        Return the site laid out as root/content and root/static on disk.
+        """
+        return cls(DirectorySource(os.path.join(root, "content")),
+                   DirectorySource(os.path.join(root, "static"), ignore=False), **options)
+
+
+class Builder:
+    """
+    Build a Site into an output writer, as often as needed within one process.
+
+    Compiled templates and rendered pages are kept between builds and reused
+    while the versions of their source files are unchanged, so a rebuild
+    after editing one page renders only that page. Static files are copied
+    on every build, as the writer may be a fresh one.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self._templates = {}
+        self._pages = {}
+
+    def _read(self, path):
+        # Version first: a file changing in between leaves the template stale, not wrong
+        version = self.site.static.version(path)
+        return self.site.static.read_text(path), version
+
+    def template(self, path):
+        """
+        Return the compiled template at path within the static source.
+        """
+        template = self._templates.get(path)
+        static = self.site.static
+        if template is None or any(static.version(dependency) != version
+                                   for dependency, version in template.dependencies.items()):
+            template = compile_template(path, self._read, self.site.base_path, self.site.minify)
+            self._templates[path] = template
+        return template
+
+    def build(self, writer, keep_going=False):
+        """
+        Write every page and static file of the site through writer.
+
+        Args:
+            writer (OutputWriter): Where the output goes, e.g. a MemoryWriter
+                or a DirectoryWriter.
+            keep_going (bool): Record pages that fail under "errors" and build
+                the rest, instead of raising the first error.
+
+        Returns:
+            dict: Counts of pages, pages rendered and served from the cache,
+            static files, the output paths of the pages, errors keyed by page
+            (see build_errors.ErrorReport) and the time taken.
+        """
+        start = time.perf_counter()
+        site = self.site
+
+        static = 0
+        for relative_path in site.static.files():
+            if not is_template_file(relative_path):
+                site.static.copy_to(writer, relative_path)
+                static += 1
+
+        pages = {path: version for path, version in site.content.files().items() if path.endswith(".md")}
+        for stale in set(self._pages) - set(pages):
+            del self._pages[stale]
+
+        errors = ErrorReport("") if keep_going else None
+        outputs = []
+        rendered = cached = 0
+        for relative_path, version in pages.items():
+            try:
+                template = self.template(select_layout(site.template, relative_path, site.static.exists))
+                key = (version, template.fingerprint, site.minify, site.fast)
+                entry = self._pages.get(relative_path)
+                if entry is not None and entry[0] == key and image_probe.fingerprint(entry[2]) == entry[3]:
+                    page = entry[1]
+                    cached += 1
+                else:
+                    markdown = site.content.read_text(relative_path)
+                    images = image_probe.referenced_images(markdown)
+                    image_key = image_probe.fingerprint(images)
+                    page = render_page(markdown, template, site.base_path, site.minify, fast=site.fast)
+                    self._pages[relative_path] = (key, page, images, image_key)
+                    rendered += 1
+            except Exception as e:
+                if errors is None:
+                    raise
+                try:
+                    markdown = site.content.read_text(relative_path)
+                except (OSError, UnicodeDecodeError):
+                    markdown = ""
+                errors.add(relative_path, relative_path, e, markdown)
+                continue
+            output = relative_path[:-len(".md")] + ".html"
+            writer.write(output, page)
+            outputs.append(output)
+
+        return {
+            "pages": len(outputs),
+            "rendered": rendered,
+            "cached": cached,
+            "static": static,
+            "outputs": outputs,
+            "errors": errors.errors if errors is not None else {},
+            "seconds": round(time.perf_counter() - start, 6),
+        }
@@ -0,0 +1,103 @@
+import json
+import os
+import textwrap
+from markdown_parser import block_to_block_type, markdown_to_blocks
+from markdown_processor import block_to_html_node
+
+
+def locate_block_errors(markdown):
+    """
+    Find every block of a markdown document that fails to render.
+
+    Each block is rendered on its own, so one bad block does not hide the
+    ones after it. Only called once a page has failed, so it never slows
+    down pages that render.
+
+    Returns:
+        List[dict]: {"line", "type", "error"} for each failing block, where
+        line is the 1-based line the block starts on.
+    """
+    source = textwrap.dedent(markdown)
+    located = []
+    pos = 0
+    for block in markdown_to_blocks(source):
+        start = source.find(block, pos)
+        pos = start + len(block)
+        try:
+            block_to_html_node(block)
+        except Exception as e:
+            located.append({
+                "line": source.count("\n", 0, start) + 1,
+                "type": block_to_block_type(block).value,
+                "error": _describe(e),
+            })
+    return located
+
+
+def _describe(error):
+    return f"{type(error).__name__}: {error}"
+
+
+class ErrorReport:
+    """
+    Pages that failed to build, collected so the rest of the build can go on.
+
+    Errors are keyed by source path relative to the content root, in the
+    order pages failed.
+    """
+
+    def __init__(self, dir_path_content="content"):
+        self.dir_path_content = dir_path_content
+        self.errors = {}
+
+    def __len__(self):
+        return len(self.errors)
+
+    def add(self, relative_path, from_path, error, markdown=None):
+        """
+        Record that the page at from_path failed with error.
+
+        For a source that can be read, the failing blocks are located too;
+        markdown is the source text when it is not read from from_path.
+        """
+        blocks = []
+        try:
+            if markdown is None:
+                with open(from_path, "r", encoding="utf-8") as f:
+                    markdown = f.read()
+            blocks = locate_block_errors(markdown)
+        except (OSError, UnicodeDecodeError):
+            pass
+        self.errors[relative_path] = {"error": _describe(error), "blocks": blocks}
+
+    def update(self, errors):
+        """
+        Merge errors from another report or a manifest's "errors" section.
+        """
+        self.errors.update(errors.errors if isinstance(errors, ErrorReport) else errors)
+
+    def format(self):
+        """
+        Return one line per failing block, or per page when no block is to blame.
+
+        Lines look like content/blog/post.md:12: paragraph: ValueError: ...
+        """
+        lines = []
+        for relative_path in sorted(self.errors):
+            entry = self.errors[relative_path]
+            path = os.path.join(self.dir_path_content, relative_path)
+            if not entry["blocks"]:
+                lines.append(f"{path}: {entry['error']}")
+            for block in entry["blocks"]:
+                lines.append(f"{path}:{block['line']}: {block['type']}: {block['error']}")
+        lines.append(f"{len(self.errors)} page{'' if len(self.errors) == 1 else 's'} failed")
+        return "\n".join(lines)
+
+    def save(self, path):
+        """
+        Write the report as JSON.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self.errors.items())), f, indent=1)
+        os.replace(tmp_path, path)
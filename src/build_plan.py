@@ -0,0 +1,112 @@
+import os
+from content_index import scan_content
+from manifest import load_manifest, read_manifest
+from static_files import is_template_file
+
+
+def scan_tree(root, suffix=None):
+    """
+    Collect stat data for every file below root using os.scandir.
+
+    No file is opened; only directory listings and stat results are used.
+
+    Args:
+        root (str): Directory to walk.
+        suffix (str): If given, only files whose name ends with it are kept.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: (size, mtime_ns) keyed by posix relative path.
+    """
+    files = {}
+    pending = [(root, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append((entry.path, prefix + entry.name + "/"))
+                elif suffix is None or entry.name.endswith(suffix):
+                    st = entry.stat()
+                    files[prefix + entry.name] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def _changed(entry, stat):
+    return entry is None or (entry["source_size"], entry["source_mtime_ns"]) != stat
+
+
+def _templates_changed(entries, templates):
+    return set(entries) != set(templates) or any(_changed(entries[path], templates[path]) for path in templates)
+
+
+def plan_build(dir_path_content="content", static_dir="static", dest_dir="public", base_path="/",
+               minify=False, manifest_path=None):
+    """
+    Work out what a build would change, compared with the previous build.
+
+    Sources are compared with the previous build's manifest, read from
+    manifest_path or else from dest_dir, by size and mtime only, so
+    planning costs one stat per file however large the site is. Every page
+    is re-rendered when there is no usable manifest or when the base path,
+    the minify setting or any template, layout or partial changed.
+
+    Returns:
+        dict: Sorted lists under "render", "copy" and "delete" (the latter
+        relative to dest_dir), the number of unchanged pages and static files,
+        and "reason" explaining a full rebuild, or None.
+    """
+    manifest = load_manifest(dest_dir) if manifest_path is None else read_manifest(manifest_path)
+    sources = scan_content(dir_path_content, ".md")
+    static = {}
+    templates = {}
+    for path, stat in scan_tree(static_dir).items():
+        (templates if is_template_file(path) else static)[path] = stat
+
+    reason = None
+    if manifest is None:
+        reason = "no previous build manifest"
+    elif manifest.get("shard"):
+        reason = "previous build was a single shard"
+    elif manifest["base_path"] != base_path:
+        reason = f"base path changed from {manifest['base_path']}"
+    elif manifest.get("minify", False) != minify:
+        reason = "minify setting changed"
+    elif _templates_changed(manifest.get("templates") or {}, templates):
+        reason = "templates changed"
+    old_pages = {} if manifest is None else manifest["pages"]
+    old_static = {} if manifest is None else manifest.get("static") or {}
+
+    render = sorted(
+        path for path, stat in sources.items() if reason is not None or _changed(old_pages.get(path), stat)
+    )
+    copy = sorted(path for path, stat in static.items() if _changed(old_static.get(path), stat))
+    delete = sorted(
+        [entry["output"] for path, entry in old_pages.items() if path not in sources]
+        + [path for path in old_static if path not in static]
+    )
+    return {
+        "render": render,
+        "copy": copy,
+        "delete": delete,
+        "unchanged_pages": len(sources) - len(render),
+        "unchanged_static": len(static) - len(copy),
+        "reason": reason,
+    }
+
+
+def format_plan(plan):
+    """
+    Render a plan from plan_build() as human-readable text.
+    """
+    lines = []
+    if plan["reason"]:
+        lines.append(f"Full rebuild: {plan['reason']}")
+    for key, verb in (("render", "Render"), ("copy", "Copy"), ("delete", "Delete")):
+        lines.append(f"{verb} {len(plan[key])}:")
+        lines.extend(f"  {path}" for path in plan[key])
+    lines.append(f"Unchanged: {plan['unchanged_pages']} pages, {plan['unchanged_static']} static files")
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+# Shared no-op context used when profiling is off
+_NO_PROFILING = contextlib.nullcontext()
+
+
+class BuildProfiler:
+    """
+    Record how long each page and each rendering stage takes.
+
+    With memory=True, tracemalloc also records per page and per stage the
+    peak allocation above the level at the start (peak_bytes) and the memory
+    still allocated at the end (net_bytes), and the allocation sites that
+    grew the most within one stage. Tracing slows rendering down noticeably,
+    so timings from a memory run are only comparable with each other.
+
+    Pages are profiled one at a time; stages are only recorded inside page().
+    """
+
+    def __init__(self, memory=False, top=10):
+        self.memory = memory
+        self.top = top
+        self.pages = {}
+        self.top_allocations = []
+        self._page = None
+        self._started_tracing = False
+        self._start = time.perf_counter()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextlib.contextmanager
+    def page(self, name):
+        """
+        Profile everything done for one page.
+        """
+        record = {"seconds": 0.0, "stages": {}}
+        self._page = (name, record)
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_current = tracemalloc.get_traced_memory()[0]
+            self._page_peak = start_current
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record["peak_bytes"] = max(self._page_peak, peak) - start_current
+                record["net_bytes"] = current - start_current
+            self.pages[name] = record
+            self._page = None
+
+    def stage(self, name):
+        """
+        Return a context manager profiling one stage of the current page.
+        """
+        if self._page is None:
+            return _NO_PROFILING
+        return self._stage(name)
+
+    @contextlib.contextmanager
+    def _stage(self, name):
+        page_name, record = self._page
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            start_current, peak = tracemalloc.get_traced_memory()
+            self._page_peak = max(self._page_peak, peak)
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = {"seconds": time.perf_counter() - start}
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                self._page_peak = max(self._page_peak, peak)
+                stage["peak_bytes"] = peak - start_current
+                stage["net_bytes"] = current - start_current
+                self._record_sites(snapshot, page_name, name)
+            record["stages"][name] = stage
+
+    def _record_sites(self, before, page_name, stage_name):
+        growth = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        for stat in growth[:self.top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            self.top_allocations.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "bytes": stat.size_diff,
+                "count": stat.count_diff,
+                "page": page_name,
+                "stage": stage_name,
+            })
+        self.top_allocations.sort(key=lambda site: -site["bytes"])
+        del self.top_allocations[self.top:]
+
+    def stage_totals(self):
+        """
+        Return the total seconds and the largest peak_bytes of each stage.
+        """
+        totals = {}
+        for record in self.pages.values():
+            for name, stage in record["stages"].items():
+                total = totals.setdefault(name, {"seconds": 0.0})
+                total["seconds"] += stage["seconds"]
+                if "peak_bytes" in stage:
+                    total["peak_bytes"] = max(total.get("peak_bytes", 0), stage["peak_bytes"])
+        return totals
+
+    def report(self):
+        """
+        Return the profile as a JSON-serializable dict.
+        """
+        report = {
+            "seconds": time.perf_counter() - self._start,
+            "memory": self.memory,
+            "stages": self.stage_totals(),
+            "pages": self.pages,
+        }
+        if self.memory:
+            report["top_allocations"] = self.top_allocations
+        return report
+
+    def save(self, path):
+        """
+        Write the report to path as JSON.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def summary(self, count=5):
+        """
+        Return a short text summary: stage totals and the costliest pages.
+        """
+        lines = []
+        for name, total in self.stage_totals().items():
+            line = f"{name:<10} {total['seconds'] * 1000:9.1f} ms"
+            if "peak_bytes" in total:
+                line += f"  peak {total['peak_bytes'] / 1024:9.1f} KiB"
+            lines.append(line)
+        key = "peak_bytes" if self.memory else "seconds"
+        for name, record in sorted(self.pages.items(), key=lambda item: -item[1][key])[:count]:
+            line = f"{record['seconds'] * 1000:9.1f} ms"
+            if self.memory:
+                line += f"  peak {record['peak_bytes'] / 1024:9.1f} KiB  net {record['net_bytes'] / 1024:9.1f} KiB"
+            lines.append(f"{line}  {name}")
+        return "\n".join(lines)
+
+    def close(self):
+        """
+        Stop tracemalloc if this profiler started it.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
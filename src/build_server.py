@@ -0,0 +1,189 @@
+import json
+import os
+import socket
+import socketserver
+import time
+import image_probe
+import syntax_highlighter
+from manifest import new_manifest, page_entry, write_manifest
+from output_writers import DirectoryWriter
+from page_generator import find_pages, render_page
+from static_files import clean_public, copy_static, template_entries
+from template_engine import load_template, select_layout
+
+
+class BuildServer:
+    """
+    Keep templates, the content index and rendered pages in memory so that
+    repeated builds only re-render pages whose source or template changed.
+
+    The build manifest is written to manifest_path, if given, and never into
+    the published output.
+    """
+
+    def __init__(self, content_dir="content", template_path="static/template.html", static_dir="static",
+                 manifest_path=None):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.static_dir = static_dir
+        self.manifest_path = manifest_path
+        self._dir_mtimes = None
+        self._pages = None
+        self._rendered = {}
+
+    def content_index(self):
+        """
+        Return the markdown files below the content directory.
+
+        The listing is only rebuilt when the mtime of any indexed directory
+        changes, which is what happens when a file is added or removed.
+        """
+        if self._dir_mtimes is not None:
+            try:
+                unchanged = all(
+                    os.stat(path).st_mtime_ns == mtime for path, mtime in self._dir_mtimes.items()
+                )
+            except FileNotFoundError:
+                unchanged = False
+            if unchanged:
+                return self._pages
+
+        dir_mtimes = {}
+        for root, dirs, files in os.walk(self.content_dir):
+            dir_mtimes[root] = os.stat(root).st_mtime_ns
+        self._pages = [from_path for from_path, _ in find_pages(self.content_dir, "")]
+        self._dir_mtimes = dir_mtimes
+        return self._pages
+
+    def render(self, from_path, template, base_path, minify=False):
+        """
+        Render one page, reusing the cached output when its source is unchanged.
+
+        Returns:
+            Tuple[str, bool]: The page and whether it came from the cache.
+        """
+        st = os.stat(from_path)
+        key = (st.st_mtime_ns, st.st_size, template.fingerprint, minify)
+        cached = self._rendered.get(from_path)
+        # The page's images are checked too, since their dimensions end up in the page
+        if cached is not None and cached[0] == key and image_probe.fingerprint(cached[2]) == cached[3]:
+            return cached[1], True
+
+        with open(from_path, "r", encoding="utf-8") as f:
+            markdown = f.read()
+        images = image_probe.referenced_images(markdown)
+        image_key = image_probe.fingerprint(images)
+        page = render_page(markdown, template, base_path, minify)
+        self._rendered[from_path] = (key, page, images, image_key)
+        return page, False
+
+    def build(self, base_path="/", dest_dir="public", minify=False):
+        """
+        Run a full build into dest_dir and return a summary of the work done.
+        """
+        start = time.perf_counter()
+        pages = self.content_index()
+
+        clean_public(dest_dir)
+        writer = DirectoryWriter(dest_dir)
+        static = copy_static(dest_dir, self.static_dir, writer)
+
+        # Drop cache entries for pages that no longer exist
+        for stale in set(self._rendered) - set(pages):
+            del self._rendered[stale]
+
+        cached = 0
+        entries = {}
+        for from_path in pages:
+            relative_path = os.path.relpath(from_path, self.content_dir)
+            # Compiled templates are cached by the engine until a template file changes
+            template = load_template(select_layout(self.template_path, relative_path), base_path, minify)
+            page, hit = self.render(from_path, template, base_path, minify)
+            cached += hit
+            dest_relative_path = os.path.splitext(relative_path)[0] + ".html"
+            writer.write(dest_relative_path, page)
+            entries[relative_path.replace(os.sep, "/")] = page_entry(
+                from_path, dest_relative_path.replace(os.sep, "/"), page
+            )
+        if self.manifest_path is not None:
+            manifest = new_manifest(entries, base_path, None, static, template_entries(self.static_dir), minify)
+            write_manifest(self.manifest_path, manifest)
+        syntax_highlighter.save_cache()
+        image_probe.save_cache()
+
+        return {
+            "pages": len(pages),
+            "rendered": len(pages) - cached,
+            "cached": cached,
+            "seconds": round(time.perf_counter() - start, 6),
+        }
+
+
+class _BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+            if request.get("command") == "shutdown":
+                response = {"ok": True}
+                self.server.shutdown_requested = True
+            else:
+                stats = self.server.builder.build(
+                    request.get("base_path", "/"), request.get("dest_dir", "public"),
+                    request.get("minify", False),
+                )
+                response = {"ok": True, **stats}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _BuildSocketServer(socketserver.UnixStreamServer):
+    shutdown_requested = False
+
+    def __init__(self, socket_path, builder):
+        super().__init__(socket_path, _BuildRequestHandler)
+        self.builder = builder
+
+
+def serve(socket_path, builder=None, ready=None):
+    """
+    Serve build requests on a Unix socket until a shutdown request arrives.
+
+    Each request is a single JSON line such as {"base_path": "/", "dest_dir": "public", "minify": false}
+    or {"command": "shutdown"}; the reply is a single JSON line with build stats.
+
+    Args:
+        socket_path (str): Filesystem path of the Unix socket.
+        builder (BuildServer): The builder holding the warm caches.
+        ready (threading.Event): Optional event set once the socket is listening.
+    """
+    builder = builder or BuildServer()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with _BuildSocketServer(socket_path, builder) as server:
+        if ready is not None:
+            ready.set()
+        try:
+            while not server.shutdown_requested:
+                server.handle_request()
+        finally:
+            os.unlink(socket_path)
+
+
+def send_request(socket_path, request):
+    """
+    Send one request to a running build server and return its decoded reply.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def request_build(socket_path, base_path="/", dest_dir="public", minify=False):
+    """
+    Ask a running build server to rebuild the site.
+    """
+    return send_request(socket_path, {"base_path": base_path, "dest_dir": dest_dir, "minify": minify})
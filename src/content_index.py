@@ -0,0 +1,182 @@
+import fnmatch
+import json
+import os
+import time
+
+IGNORE_FILE = ".siteignore"
+# Hidden files and directories (.git, editor swap files) and editor backups
+DEFAULT_IGNORE = (".*", "*~", "#*#")
+# A directory modified this recently may change again within the same mtime
+# tick, so its listing is not trusted on the next scan
+_RACY_NS = 2 * 10**9
+
+
+def load_ignore(root):
+    """
+    Return the ignore patterns for the content tree at root.
+
+    The defaults are followed by the lines of root/.siteignore, if present.
+    Blank lines and lines starting with # are skipped. A pattern is a glob
+    matched against each file or directory name, or against the path from
+    root when it contains a slash; a trailing slash matches directories
+    only. For example "drafts/", "*.tmp" or "blog/2019/*.md".
+
+    Returns:
+        Tuple[str, ...]: The patterns, in order.
+    """
+    patterns = list(DEFAULT_IGNORE)
+    try:
+        with open(os.path.join(root, IGNORE_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    patterns.append(line)
+    except FileNotFoundError:
+        pass
+    return tuple(patterns)
+
+
+def is_ignored(relative_path, is_dir, patterns):
+    """
+    Return whether the posix relative_path matches any of the ignore patterns.
+    """
+    name = relative_path.rpartition("/")[2]
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip("/")
+        if "/" in pattern:
+            if fnmatch.fnmatchcase(relative_path, pattern.lstrip("/")):
+                return True
+        elif fnmatch.fnmatchcase(name, pattern):
+            return True
+    return False
+
+
+class TreeIndex:
+    """
+    Directory listings keyed by path, reused while the directory's mtime matches.
+
+    Adding, removing or renaming an entry changes its directory's mtime, so
+    an unchanged directory does not need listing (and matching against the
+    ignore patterns) again. Files are still stat()ed on every scan, since
+    editing a file does not touch its directory. When a path is given the
+    index is loaded from and saved to a JSON file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.patterns = None
+        self.directories = {}
+        self.dirty = False
+        self.listed = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.patterns = tuple(data["patterns"])
+                self.directories = data["directories"]
+            except (OSError, ValueError, KeyError, TypeError):
+                self.patterns = None
+                self.directories = {}
+
+    def listing(self, directory, relative, patterns):
+        """
+        Return the (file names, directory names) in directory that are not ignored.
+
+        Args:
+            directory (str): Path of the directory.
+            relative (str): Its posix path from the content root, "" for the root.
+            patterns (Tuple[str, ...]): Ignore patterns (see load_ignore).
+        """
+        if patterns != self.patterns:
+            # Listings were filtered with other patterns
+            self.patterns = patterns
+            self.directories = {}
+            self.dirty = True
+        mtime_ns = os.stat(directory).st_mtime_ns
+        entry = self.directories.get(directory)
+        if entry is not None and entry[0] == mtime_ns:
+            return entry[1], entry[2]
+
+        files, dirs = [], []
+        self.listed += 1
+        with os.scandir(directory) as entries:
+            for item in entries:
+                is_dir = item.is_dir()
+                if not is_ignored(relative + item.name, is_dir, patterns):
+                    (dirs if is_dir else files).append(item.name)
+        files.sort()
+        dirs.sort()
+        if time.time_ns() - mtime_ns > _RACY_NS:
+            self.directories[directory] = [mtime_ns, files, dirs]
+            self.dirty = True
+        return files, dirs
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"patterns": self.patterns, "directories": self.directories}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+_index = TreeIndex()
+
+
+def use_cache_file(path):
+    """
+    Switch discovery to a directory index persisted at path.
+    """
+    global _index
+    _index = TreeIndex(path)
+
+
+def save_cache():
+    """
+    Write the directory index to disk if it is file backed and has changed.
+    """
+    _index.save()
+
+
+def scan_content(root, suffix=".md", index=None):
+    """
+    Find the files below root that are not ignored, with their stat data.
+
+    Directories are walked depth first in sorted order with os.scandir, and
+    ignored directories are never entered, so results are deterministic.
+
+    Args:
+        root (str): The content root directory.
+        suffix (str): Only files whose name ends with it are kept; None keeps all.
+        index (TreeIndex): Directory listings to reuse; the module index if None.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: (size, mtime_ns) keyed by posix relative
+        path, in sorted walk order.
+    """
+    index = index or _index
+    patterns = load_ignore(root)
+    files = {}
+    pending = [(root, "")]
+    while pending:
+        directory, relative = pending.pop()
+        try:
+            names, dirs = index.listing(directory, relative, patterns)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for name in names:
+            if suffix is None or name.endswith(suffix):
+                try:
+                    st = os.stat(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                files[relative + name] = (st.st_size, st.st_mtime_ns)
+        # Reversed so the stack pops subdirectories in sorted order
+        for name in reversed(dirs):
+            pending.append((os.path.join(directory, name), relative + name + "/"))
+    return files
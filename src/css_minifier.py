@@ -0,0 +1,99 @@
+import functools
+import os
+import re
+
+# Strings and comments in one left-to-right scan, so a quote inside a
+# comment or a /* inside a string is never taken for the other
+_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|/\*.*?(?:\*/|\Z)', re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+_AROUND_PUNCTUATION = re.compile(r" ?([{};,>]) ?")
+# A colon followed by whitespace only occurs in declarations; "a :hover" is
+# a selector and must keep its space, so only the space after is removed
+_AFTER_COLON = re.compile(r": ")
+_PLACEHOLDER = re.compile(r"\0(\d+)\0")
+
+_STYLESHEET_LINK = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+
+@functools.lru_cache(maxsize=64)
+def minify_css(css):
+    """
+    Strip comments and insignificant whitespace from a stylesheet.
+
+    Strings and /*! licence comments are left untouched. Results are cached by content, so each
+    stylesheet is only minified once per process however often it is used.
+
+    Args:
+        css (str): The stylesheet.
+
+    Returns:
+        str: The minified stylesheet.
+    """
+    strings = []
+
+    def stash(match):
+        token = match.group()
+        # /*! ... */ comments conventionally carry licences and are kept
+        if token.startswith("/*") and not token.startswith("/*!"):
+            return ""
+        strings.append(token)
+        return f"\0{len(strings) - 1}\0"
+
+    text = _STRING_OR_COMMENT.sub(stash, css)
+    text = _WHITESPACE.sub(" ", text)
+    text = _AROUND_PUNCTUATION.sub(r"\1", text)
+    text = _AFTER_COLON.sub(":", text)
+    text = text.replace(";}", "}").strip()
+    return _PLACEHOLDER.sub(lambda m: strings[int(m.group(1))], text)
+
+
+def read_minified(path):
+    """
+    Return the minified contents of the stylesheet at path.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return minify_css(f.read())
+
+
+def _inlinable(css, max_bytes):
+    # Relative url()s and @imports would resolve against the page instead of
+    # the stylesheet, and a closing tag would end the <style> element early
+    return len(css.encode("utf-8")) <= max_bytes and "url(" not in css and "@import" not in css \
+        and "</style" not in css.lower()
+
+
+def inline_stylesheets(html, static_dir, max_bytes):
+    """
+    Replace <link rel="stylesheet"> tags for small local stylesheets with
+    <style> elements holding their minified contents.
+
+    Only root-relative hrefs (resolved below static_dir) are inlined, and
+    only stylesheets of at most max_bytes once minified that contain no
+    url() or @import.
+
+    Returns:
+        Tuple[str, List[str]]: The new HTML and the paths of the stylesheets
+        that were inlined.
+    """
+    inlined = []
+
+    def replace(match):
+        attributes = {name.lower(): double if double is not None else single
+                      for name, double, single in _ATTRIBUTE.findall(match.group())}
+        href = attributes.get("href", "")
+        if "stylesheet" not in attributes.get("rel", "").lower().split() \
+                or attributes.get("media", "all") != "all" \
+                or not href.startswith("/") or href.startswith("//"):
+            return match.group()
+        path = os.path.join(static_dir, href.lstrip("/").split("?")[0])
+        try:
+            css = read_minified(path)
+        except OSError:
+            return match.group()
+        if not _inlinable(css, max_bytes):
+            return match.group()
+        inlined.append(path)
+        return f"<style>{css}</style>"
+
+    return _STYLESHEET_LINK.sub(replace, html), inlined
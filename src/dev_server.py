@@ -0,0 +1,173 @@
+import hashlib
+import http.server
+import mimetypes
+import os
+import threading
+import urllib.parse
+import image_probe
+from page_generator import render_page
+from static_files import is_template_file
+from template_engine import load_template, select_layout
+
+
+class DevServer:
+    """
+    Render pages on demand for local development, without writing anything.
+
+    A request for /blog/post.html or /blog/post/ is mapped back to
+    content/blog/post.md or content/blog/post/index.md, the same mapping a
+    build uses in reverse, and the page is rendered only when it is asked
+    for. Rendered pages are kept in memory until the mtime of the source or
+    of its template changes; other paths are served straight from static/.
+    """
+
+    def __init__(self, content_dir="content", template_path="static/template.html", static_dir="static",
+                 base_path="/", minify=False, inline_css=None):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.static_dir = static_dir
+        self.base_path = base_path
+        self.minify = minify
+        self.inline_css = inline_css
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, url_path):
+        """
+        Map a request path to what should be served for it.
+
+        Returns:
+            Tuple[str, str]: ("page", markdown path), ("static", file path) or
+            ("redirect", url) when a directory is requested without its
+            trailing slash; None if nothing matches.
+        """
+        path = urllib.parse.unquote(urllib.parse.urlsplit(url_path).path)
+        if path + "/" == self.base_path:
+            return "redirect", self.base_path
+        if not path.startswith(self.base_path):
+            return None
+        parts = [part for part in path[len(self.base_path):].split("/") if part]
+        if any(part in (".", "..") or "\\" in part for part in parts):
+            return None
+        relative = "/".join(parts)
+        is_directory = not relative or path.endswith("/")
+        html_path = f"{relative}/index.html".lstrip("/") if is_directory else relative
+
+        # Pages win over static files of the same name, as in a build
+        if html_path.endswith(".html"):
+            from_path = os.path.join(self.content_dir, *(html_path[:-len(".html")] + ".md").split("/"))
+            if os.path.isfile(from_path):
+                return "page", from_path
+        static_path = os.path.join(self.static_dir, *html_path.split("/"))
+        if os.path.isfile(static_path) and not is_template_file(html_path):
+            return "static", static_path
+        if not is_directory and (os.path.isfile(os.path.join(self.content_dir, *parts, "index.md"))
+                                 or os.path.isfile(os.path.join(self.static_dir, *parts, "index.html"))):
+            return "redirect", path + "/"
+        return None
+
+    def render(self, from_path):
+        """
+        Return the page rendered from from_path, rendering it only when needed.
+
+        Returns:
+            Tuple[bytes, str, bool]: The page, its ETag and whether it came
+            from the cache.
+        """
+        relative_path = os.path.relpath(from_path, self.content_dir)
+        template = load_template(select_layout(self.template_path, relative_path),
+                                 self.base_path, self.minify, self.inline_css)
+        st = os.stat(from_path)
+        key = (st.st_mtime_ns, st.st_size, template.fingerprint)
+        cached = self._pages.get(from_path)
+        # Probed per request, so an edited image re-renders the pages that show it
+        if cached is not None and cached[0] == key and image_probe.fingerprint(cached[3]) == cached[4]:
+            return cached[1], cached[2], True
+
+        with open(from_path, "r", encoding="utf-8") as f:
+            markdown = f.read()
+        images = image_probe.referenced_images(markdown)
+        image_key = image_probe.fingerprint(images)
+        body = render_page(markdown, template, self.base_path, self.minify).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        with self._lock:
+            self._pages[from_path] = (key, body, etag, images, image_key)
+        return body, etag, False
+
+
+class _DevRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        site = self.server.site
+        target = site.resolve(self.path)
+        if target is None:
+            self.send_error(404)
+            return
+        kind, value = target
+        if kind == "redirect":
+            self.send_response(301)
+            self.send_header("Location", value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        try:
+            if kind == "page":
+                body, etag, _ = site.render(value)
+                content_type = "text/html; charset=utf-8"
+            else:
+                st = os.stat(value)
+                etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+                body = None
+                content_type = mimetypes.guess_type(value)[0] or "application/octet-stream"
+        except Exception as e:
+            self.send_error(500, explain=f"{type(e).__name__}: {e}")
+            return
+
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        if body is None:
+            with open(value, "rb") as f:
+                body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # Always revalidate, so edits show up on reload while unchanged pages cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _DevHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site, verbose):
+        super().__init__(address, _DevRequestHandler)
+        self.site = site
+        self.verbose = verbose
+
+
+def make_server(site=None, host="127.0.0.1", port=8888, verbose=True):
+    """
+    Create a threaded HTTP server for site; call serve_forever() to run it.
+
+    Args:
+        site (DevServer): The site to serve; a default DevServer if None.
+        port (int): Port to listen on; 0 picks a free one.
+        verbose (bool): Log each request to stderr.
+    """
+    return _DevHTTPServer((host, port), site or DevServer(), verbose)
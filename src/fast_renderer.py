@@ -0,0 +1,182 @@
+import re
+import textwrap
+from headings import HeadingIndex
+from html_node import _HTML_WHITESPACE, PRESERVE_WHITESPACE_TAGS, escape_html
+from image_probe import image_props
+from markdown_extractors import IMAGE_PATTERN, LINK_PATTERN
+from markdown_parser import BlockType, block_to_block_type, markdown_to_blocks
+from node_parser import split_code_block
+from syntax_highlighter import highlight
+
+_ORDERED_ITEM = re.compile(r"(\d+)\.\s+(.*)")
+_DELIMITERS = (("**", "b"), ("_", "i"), ("`", "code"))
+
+
+def markdown_to_html(markdown, minify=False, headings=None):
+    """
+    Render markdown straight to HTML without building a node tree.
+
+    Produces exactly markdown_to_html_node(markdown).to_html(minify), and
+    raises the same ValueErrors, but appends each piece of markup to one
+    list that is joined once instead of creating TextNodes, LeafNodes and
+    ParentNodes and serializing them recursively. Use markdown_to_html_node
+    when the tree itself is needed.
+
+    Args:
+        markdown (str): The markdown string to convert.
+        minify (bool): Collapse insignificant whitespace, as to_html does.
+        headings (HeadingIndex): Collects the page's headings, as with
+            markdown_to_html_node.
+
+    Returns:
+        str: The HTML.
+    """
+    if headings is None:
+        headings = HeadingIndex()
+    out = ['<div class="markdown-body">']
+    for block in markdown_to_blocks(textwrap.dedent(markdown)):
+        _block_to_html(block, out, minify, headings)
+    out.append("</div>")
+    return "".join(out)
+
+
+def _block_to_html(block, out, minify, headings):
+    block_type = block_to_block_type(block)
+
+    if block_type == BlockType.PARAGRAPH:
+        out.append("<p>")
+        _inline_to_html(block.replace("\n", " "), out, minify)
+        out.append("</p>")
+
+    elif block_type == BlockType.HEADING:
+        level = len(block) - len(block.lstrip("#"))
+        if level + 1 >= len(block):
+            raise ValueError("Invalid heading format")
+        text = block[level + 1:].strip()
+        # Inline markup is checked first, so a bad heading is not indexed
+        start = len(out)
+        _inline_to_html(text, out, minify)
+        out.insert(start, f'<h{level} id="{escape_html(headings.add(level, text), quote=True)}">')
+        out.append(f"</h{level}>")
+
+    elif block_type == BlockType.CODE:
+        _code_to_html(block, out)
+
+    elif block_type == BlockType.QUOTE:
+        out.append("<blockquote>")
+        _inline_to_html(" ".join(line.lstrip(">").strip() for line in block.split("\n")), out, minify)
+        out.append("</blockquote>")
+
+    elif block_type == BlockType.UNORDERED_LIST:
+        # splitlines() also breaks on separators such as \u2028 that the block
+        # type check does not, so every item is checked as list_to_html_node does
+        out.append("<ul>")
+        for line in block.splitlines():
+            line = line.strip()
+            if line:
+                if not line.startswith("- "):
+                    raise ValueError(f"Invalid unordered list item: '{line}'")
+                out.append("<li>")
+                _inline_to_html(line[2:], out, minify)
+                out.append("</li>")
+        out.append("</ul>")
+
+    elif block_type == BlockType.ORDERED_LIST:
+        out.append("<ol>")
+        expected = 1
+        for line in block.splitlines():
+            line = line.strip()
+            if line:
+                match = _ORDERED_ITEM.match(line)
+                if not match:
+                    raise ValueError(f"Invalid ordered list item: '{line}'")
+                if int(match.group(1)) != expected:
+                    raise ValueError(
+                        f"Ordered list must increment properly: got {int(match.group(1))}, expected {expected}")
+                expected += 1
+                out.append("<li>")
+                _inline_to_html(match.group(2), out, minify)
+                out.append("</li>")
+        out.append("</ol>")
+
+    else:
+        raise ValueError(f"Unsupported block type: {block_type}")
+
+
+def _code_to_html(block, out):
+    # Whitespace inside <pre> is significant, so code is never minified
+    language, code = split_code_block(block)
+    if language is None:
+        out.append(f"<pre><code>{escape_html(code)}</code></pre>")
+        return
+
+    out.append(f'<pre><code class="{escape_html(f"language-{language}", quote=True)}">')
+    tokens = highlight(code, language)
+    if tokens is None:
+        out.append(escape_html(code))
+    else:
+        for kind, token in tokens:
+            if kind is None:
+                out.append(escape_html(token))
+            else:
+                out.append(f'<span class="tok-{kind}">{escape_html(token)}</span>')
+    out.append("</code></pre>")
+
+
+def _inline_to_html(text, out, minify):
+    """
+    Mirror text_to_text_nodes and the leaf serialization of each node.
+    """
+    # Runs are (tag, text); tag None marks plain text still to be split
+    runs = [(None, text)]
+    for delimiter, tag in _DELIMITERS:
+        split_runs = []
+        for run in runs:
+            if run[0] is not None:
+                split_runs.append(run)
+                continue
+            parts = run[1].split(delimiter)
+            if len(parts) == 1:
+                split_runs.append(run)
+                continue
+            if len(parts) % 2 == 0:
+                raise ValueError(f"Invalid delimiter usage in: {run[1]}")
+            for i, part in enumerate(parts):
+                if part:
+                    split_runs.append((tag if i % 2 == 1 else None, part))
+        runs = split_runs
+
+    for tag, value in runs:
+        if tag is not None:
+            out.append(f"<{tag}>{_leaf_text(value, tag, minify)}</{tag}>")
+            continue
+        pos = 0
+        for match in IMAGE_PATTERN.finditer(value):
+            _links_to_html(value[pos:match.start()], out, minify)
+            props = image_props(match.group(2), match.group(1))
+            attributes = "".join(f' {key}="{escape_html(prop, quote=True)}"' for key, prop in props.items())
+            out.append(f"<img{attributes}></img>")
+            pos = match.end()
+        _links_to_html(value[pos:] if pos else value, out, minify)
+
+
+def _links_to_html(text, out, minify):
+    # Links are found per text run, so the (?<!!) lookbehind never sees
+    # characters from a neighbouring run, as with split_nodes_link
+    pos = 0
+    for match in LINK_PATTERN.finditer(text):
+        if match.start() > pos:
+            out.append(_leaf_text(text[pos:match.start()], None, minify))
+        href = escape_html(match.group(2), quote=True)
+        out.append(f'<a href="{href}">{_leaf_text(match.group(1), "a", minify)}</a>')
+        pos = match.end()
+    if pos < len(text):
+        out.append(_leaf_text(text[pos:], None, minify))
+
+
+def _leaf_text(value, tag, minify):
+    if "&" in value or "<" in value or ">" in value:
+        value = escape_html(value)
+    if minify and tag not in PRESERVE_WHITESPACE_TAGS:
+        value = _HTML_WHITESPACE.sub(" ", value)
+    return value
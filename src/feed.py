@@ -0,0 +1,203 @@
+import datetime
+import heapq
+import json
+import os
+import re
+from html_node import escape_html
+
+FEED_NAME = "feed.xml"
+_BODY = re.compile(r'<div class="markdown-body">(.*?)</div>', re.DOTALL)
+# Markdown never nests a block inside a block of the same tag
+_BLOCK = re.compile(r"<(h[1-6]|p|pre|ul|ol|blockquote)\b[^>]*>.*?</\1>", re.DOTALL)
+_TAG = re.compile(r"<[^>]*>")
+
+
+def page_url(relative_path):
+    """
+    Return the URL of a page relative to the site root, e.g. blog/tom/ for
+    blog/tom/index.md and blog/tom.html for blog/tom.md.
+    """
+    stem = relative_path[:-len(".md")]
+    if stem == "index" or stem.endswith("/index"):
+        return stem[:-len("index")]
+    return stem + ".html"
+
+
+def page_summary(page, max_chars=400):
+    """
+    Take the title and an excerpt from a rendered page.
+
+    The excerpt is the blocks after the page's first heading, up to the one
+    that brings the text past max_chars, as HTML.
+
+    Returns:
+        Tuple[str, str]: (title text, escaped as in the page; excerpt HTML).
+    """
+    body = _BODY.search(page)
+    title = ""
+    excerpt = []
+    length = 0
+    for block in _BLOCK.finditer(body.group(1) if body else ""):
+        if block.group(1) == "h1" and not title and not excerpt:
+            title = _TAG.sub("", block.group()).strip()
+            continue
+        excerpt.append(block.group())
+        length += len(_TAG.sub("", block.group()))
+        if length >= max_chars:
+            break
+    return title, "".join(excerpt)
+
+
+def _timestamp(mtime_ns):
+    moment = datetime.datetime.fromtimestamp(mtime_ns // 10**9, datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FeedBuilder:
+    """
+    Collect the newest posts of a section during a build and write an Atom feed.
+
+    Pages are offered to add() as they are rendered, or served from the render
+    cache, so no post is read or rendered again for the feed. A post is dated
+    by its source's mtime; only the newest limit posts are kept, and the title
+    and excerpt are only extracted from pages that make it into that set.
+
+    With a state path the entries and the serialized feed are kept between
+    builds, and the feed is only serialized again when one of its entries
+    changed.
+    """
+
+    def __init__(self, site_url, section="blog", base_path="/", limit=10, title=None, path=None):
+        self.site_url = site_url.rstrip("/")
+        self.section = section
+        self.base_path = base_path
+        self.limit = limit
+        self.title = title or section.title()
+        self.path = path
+        self.changed = None
+        self._newest = []
+        self._state = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = None
+
+    @property
+    def output_path(self):
+        """
+        The feed's path relative to the output root.
+        """
+        return f"{self.section}/{FEED_NAME}"
+
+    def add(self, relative_path, mtime_ns, page):
+        """
+        Offer a rendered page to the feed.
+
+        Args:
+            relative_path (str): Posix path of the source below the content root.
+            mtime_ns (int): The source's mtime, used as the post's date.
+            page (str): The rendered page.
+        """
+        if not relative_path.startswith(self.section + "/"):
+            return
+        # Newest first, then by path; the heap's smallest item is the one to drop
+        rank = (mtime_ns, _Reversed(relative_path))
+        if len(self._newest) >= self.limit and (self.limit == 0 or rank <= self._newest[0][0]):
+            return
+        title, excerpt = page_summary(page)
+        url = f"{self.site_url}{self.base_path}{page_url(relative_path)}"
+        item = (rank, {"title": title, "link": url, "updated": _timestamp(mtime_ns), "summary": excerpt})
+        if len(self._newest) < self.limit:
+            heapq.heappush(self._newest, item)
+        else:
+            heapq.heapreplace(self._newest, item)
+
+    def entries(self):
+        """
+        Return the feed's entries, newest first.
+        """
+        return [entry for _, entry in sorted(self._newest, key=lambda item: item[0], reverse=True)]
+
+    def render(self, entries):
+        """
+        Serialize entries as an Atom feed.
+        """
+        section_url = f"{self.site_url}{self.base_path}{self.section}/"
+        feed_url = section_url + FEED_NAME
+        title = escape_html(self.title)
+        updated = max((entry["updated"] for entry in entries), default=_timestamp(0))
+        lines = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f"  <title>{title}</title>",
+            f"  <id>{escape_html(feed_url)}</id>",
+            f'  <link rel="self" href="{escape_html(feed_url, quote=True)}"/>',
+            f'  <link href="{escape_html(section_url, quote=True)}"/>',
+            f"  <updated>{updated}</updated>",
+            f"  <author><name>{title}</name></author>",
+        ]
+        for entry in entries:
+            link = escape_html(entry["link"], quote=True)
+            lines += [
+                "  <entry>",
+                f"    <title>{entry['title']}</title>",
+                f"    <id>{link}</id>",
+                f'    <link href="{link}"/>',
+                f"    <updated>{entry['updated']}</updated>",
+                f'    <summary type="html">{escape_html(entry["summary"])}</summary>',
+                "  </entry>",
+            ]
+        lines.append("</feed>")
+        return "\n".join(lines) + "\n"
+
+    def write(self, writer):
+        """
+        Write the feed through writer and save the state if file backed.
+
+        Sets changed to whether any entry differs from the previous build's.
+
+        Returns:
+            str: The feed's path relative to the output root.
+        """
+        entries = self.entries()
+        state = self._state
+        options = [self.site_url, self.base_path, self.title]
+        if state is not None and state.get("entries") == entries and state.get("options") == options:
+            self.changed = False
+            xml = state["xml"]
+        else:
+            self.changed = True
+            xml = self.render(entries)
+            self._state = {"options": options, "entries": entries, "xml": xml}
+            self._save()
+        writer.write(self.output_path, xml)
+        return self.output_path
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.path)
+
+
+class _Reversed:
+    # Orders strings backwards, so among posts of the same date the first
+    # path alphabetically ranks highest
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __le__(self, other):
+        return self.value >= other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
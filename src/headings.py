@@ -0,0 +1,94 @@
+import re
+from html_node import escape_html
+from node_parser import text_to_text_nodes
+from text_node import TextType
+
+_NOT_SLUG = re.compile(r"[^\w\s-]")
+_SPACES = re.compile(r"\s+")
+
+
+def heading_text(markdown):
+    """
+    Return the plain text of a heading's inline markdown.
+
+    The text is joined from the parsed inline nodes, so only real bold,
+    italic and code delimiters are removed. Images are dropped and links
+    keep their text.
+    """
+    nodes = text_to_text_nodes(markdown)
+    return "".join(node.text for node in nodes if node.text_type != TextType.IMAGE).strip()
+
+
+def slugify(text):
+    """
+    Turn heading text into an id: lowercase words joined by hyphens.
+
+    Characters other than letters, digits, hyphens and whitespace are removed;
+    an empty result becomes "section".
+    """
+    slug = _SPACES.sub("-", _NOT_SLUG.sub("", text.lower()).strip())
+    return slug or "section"
+
+
+class HeadingIndex:
+    """
+    The headings of one page, in document order, with unique ids.
+
+    Every renderer adds each heading as it is built, so the ids and the table
+    of contents come out of the page's single render pass. A repeated slug
+    gets -1, -2, ... appended, skipping any id already taken, so ids only
+    depend on the page's own headings.
+    """
+
+    def __init__(self):
+        self.headings = []
+        self._ids = set()
+
+    def add(self, level, markdown):
+        """
+        Record a heading and return its id.
+
+        Args:
+            level (int): 1 to 6.
+            markdown (str): The heading's inline markdown, without the #s.
+        """
+        text = heading_text(markdown)
+        slug = slugify(text)
+        heading_id = slug
+        suffix = 0
+        while heading_id in self._ids:
+            suffix += 1
+            heading_id = f"{slug}-{suffix}"
+        self._ids.add(heading_id)
+        self.headings.append((level, heading_id, text))
+        return heading_id
+
+    def toc_html(self, min_level=2):
+        """
+        Return nested lists linking to the headings of min_level and below.
+
+        h1 is normally the page title, so it is left out by default.
+
+        Returns:
+            str: A <nav class="toc"> element, or "" when there are no headings.
+        """
+        out = []
+        levels = []
+        for level, heading_id, text in self.headings:
+            if level < min_level:
+                continue
+            if levels and level <= levels[-1]:
+                # Close deeper lists, then the previous item at this depth
+                while len(levels) > 1 and level < levels[-1] and level <= levels[-2]:
+                    levels.pop()
+                    out.append("</li></ul>")
+                levels[-1] = level
+                out.append("</li>")
+            else:
+                levels.append(level)
+                out.append("<ul>")
+            out.append(f'<li><a href="#{heading_id}">{escape_html(text)}</a>')
+        if not out:
+            return ""
+        out.append("</li></ul>" * len(levels))
+        return f'<nav class="toc">{"".join(out)}</nav>'
@@ -0,0 +1,54 @@
+import functools
+import re
+
+# Elements whose contents are copied through untouched
+_PRESERVED_BLOCK = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# A tag followed by whitespace and the name of the next tag, if it has one
+_BETWEEN_TAGS = re.compile(r"(</?([A-Za-z][\w-]*)?[^<>]*>)[ \t\n\r\f]+(?=</?([A-Za-z][\w-]*)?)")
+# Whitespace between two of these renders as a space, e.g. <a>x</a> <a>y</a>
+_INLINE_TAGS = frozenset({
+    "a", "abbr", "b", "bdi", "bdo", "button", "cite", "code", "data", "del", "dfn", "em", "i", "img",
+    "input", "ins", "kbd", "label", "mark", "q", "s", "samp", "select", "small", "span", "strong", "sub",
+    "sup", "textarea", "time", "u", "var",
+})
+_WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+_PLACEHOLDER = re.compile(r"<\0(\d+)\0>")
+
+
+@functools.lru_cache(maxsize=32)
+def minify_template(template):
+    """
+    Strip comments and insignificant whitespace from an HTML template.
+
+    Whitespace between tags is removed unless both tags are inline elements,
+    where it would show as a space and is collapsed to one instead; any other
+    whitespace run is collapsed to a single space. Placeholders such as {{ Content }} are left
+    intact, as is everything inside pre/textarea/script/style elements.
+    Results are cached, so a template is only minified once per process.
+
+    Args:
+        template (str): The template text.
+
+    Returns:
+        str: The minified template.
+    """
+    preserved = []
+
+    def stash(match):
+        preserved.append(match.group(1))
+        # Keep the placeholder tag-shaped so surrounding whitespace still collapses
+        return f"<\0{len(preserved) - 1}\0>"
+
+    text = _PRESERVED_BLOCK.sub(stash, template)
+    text = _COMMENT.sub("", text)
+    text = _BETWEEN_TAGS.sub(_between_tags, text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _PLACEHOLDER.sub(lambda m: preserved[int(m.group(1))], text)
+
+
+def _between_tags(match):
+    before, after = match.group(2), match.group(3)
+    if before and after and before.lower() in _INLINE_TAGS and after.lower() in _INLINE_TAGS:
+        return match.group(1) + " "
+    return match.group(1)
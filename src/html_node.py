@@ -1,4 +1,36 @@
-   
+import re
+
+# Tags whose text content must be emitted verbatim
+PRESERVE_WHITESPACE_TAGS = {"pre", "code", "textarea", "script", "style"}
+
+_HTML_WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+
+
+def escape_html(text, quote=False):
+    """
+    Escape &, < and > (and " when quote is set) for inclusion in HTML.
+
+    Most text contains none of these characters, so each replace is guarded
+    by a membership test and plain strings are returned without copying.
+
+    Args:
+        text (str): The raw text.
+        quote (bool): Also escape double quotes, for attribute values.
+
+    Returns:
+        str: The escaped text.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if quote and '"' in text:
+        text = text.replace('"', "&quot;")
+    return text
+
+
 class HTMLNode:
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
@@ -6,7 +38,7 @@ class HTMLNode:
         self.children = children
         self.props = props
     
-    def to_html(self):
+    def to_html(self, minify=False):
         raise NotImplementedError("Child classes must implement this method")
     
     def props_to_html(self):
@@ -15,7 +47,7 @@ class HTMLNode:
         
         html_props = ""
         for key, value in self.props.items():
-            html_props += f' {key}="{value}"'
+            html_props += f' {key}="{escape_html(value, quote=True)}"'
         
         return html_props
     
@@ -33,29 +65,44 @@ class LeafNode(HTMLNode):
     def __init__(self, tag,  value,  props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
-        if self.value is None:
+    def to_html(self, minify=False):
+        value = self.value
+        if value is None:
             raise ValueError("LeafNode must have a value")
         
-        if self.tag is None:
-            return self.value
+        # Inline fast path: most leaves contain nothing to escape
+        if "&" in value or "<" in value or ">" in value:
+            value = escape_html(value)
+        
+        tag = self.tag
+        if minify and tag not in PRESERVE_WHITESPACE_TAGS:
+            value = _HTML_WHITESPACE.sub(" ", value)
+        
+        if tag is None:
+            return value
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        if self.props is None:
+            return f"<{tag}>{value}</{tag}>"
+        
+        return f"<{tag}{self.props_to_html()}>{value}</{tag}>"
     
 class ParentNode(HTMLNode):
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
     
-    def to_html(self):
+    def to_html(self, minify=False):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         
         if self.children is None:
             raise ValueError("ParentNode must have children")
         
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
+        # Whitespace below <pre>/<code> is significant, so stop minifying there
+        minify = minify and self.tag not in PRESERVE_WHITESPACE_TAGS
+        children_html = "".join([child.to_html(minify) for child in self.children])
+        
+        if self.props is None:
+            return f"<{self.tag}>{children_html}</{self.tag}>"
         
         return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
 
@@ -0,0 +1,227 @@
+import json
+import os
+import struct
+from markdown_extractors import IMAGE_PATTERN
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers; C4, C8 and CC are other segments
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field: TEM, RST0-7 and SOI
+_JPEG_STANDALONE = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+
+def probe_dimensions(path):
+    """
+    Read an image's width and height from its header.
+
+    Only the first bytes are read for PNG, GIF and WebP; for JPEG the
+    segment headers are read and their data skipped until the frame header.
+
+    Returns:
+        Tuple[int, int]: (width, height), or None if the format is not
+        recognised or the header is truncated.
+    """
+    with open(path, "rb") as f:
+        head = f.read(30)
+        if head[:8] == _PNG_SIGNATURE and head[12:16] == b"IHDR" and len(head) >= 24:
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+            return _webp_dimensions(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_dimensions(f)
+    return None
+
+
+def _webp_dimensions(head):
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    return None
+
+
+def _jpeg_dimensions(f):
+    while True:
+        byte = f.read(1)
+        if byte != b"\xff":
+            return None
+        marker = f.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in _JPEG_STANDALONE:
+            continue
+        if marker in (0xD9, 0xDA):  # end of image or start of scan before any frame
+            return None
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack(">H", header)[0]
+        if marker in _JPEG_SOF:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+class ImageSizeCache:
+    """
+    Image dimensions keyed by path, reused while the file's size and mtime match.
+
+    When a path is given the cache is loaded from and saved to a JSON file,
+    so unchanged images are not opened again on the next build.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def dimensions(self, image_path):
+        """
+        Return (width, height) of image_path, or None if unknown or missing.
+        """
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        entry = self.entries.get(image_path)
+        if entry is None or entry[:2] != [st.st_size, st.st_mtime_ns]:
+            try:
+                size = probe_dimensions(image_path)
+            except OSError:
+                return None
+            entry = [st.st_size, st.st_mtime_ns, *(size or (None, None))]
+            self.entries[image_path] = entry
+            self.dirty = True
+        return None if entry[2] is None else (entry[2], entry[3])
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+_cache = ImageSizeCache()
+_static_dir = None
+
+
+def enable(static_dir="static", cache_path=None):
+    """
+    Start adding dimensions and lazy loading to images.
+
+    Root-relative image sources such as /images/a.png are looked up below
+    static_dir. Until this is called images are emitted with src and alt only.
+
+    Args:
+        static_dir (str): Directory the site's root-relative URLs map to.
+        cache_path (str): Optional JSON file persisting dimensions between builds.
+    """
+    global _cache, _static_dir
+    _cache = ImageSizeCache(cache_path)
+    _static_dir = static_dir
+
+
+def disable():
+    """
+    Go back to emitting images with src and alt only.
+    """
+    global _cache, _static_dir
+    _cache = ImageSizeCache()
+    _static_dir = None
+
+
+def static_dir():
+    """
+    Return the directory images are probed in, or None while disabled.
+    """
+    return _static_dir
+
+
+def referenced_images(markdown):
+    """
+    Return the distinct root-relative image sources of a markdown document, sorted.
+
+    Args:
+        markdown (str | bytes): The markdown source; bytes are decoded as UTF-8.
+    """
+    if isinstance(markdown, bytes):
+        markdown = markdown.decode("utf-8", "replace")
+    return tuple(sorted({src for _, src in IMAGE_PATTERN.findall(markdown) if _is_local(src)}))
+
+
+def fingerprint(sources):
+    """
+    Return a string identifying the dimensions given to images, for cache keys.
+
+    Only the listed sources (see referenced_images) are looked at, so an image
+    change only affects the pages showing it. The string holds the sources
+    and their probed dimensions, never paths or mtimes, so it is the same on
+    every checkout and survives a touch. Empty while image probing is disabled.
+    """
+    if _static_dir is None:
+        return ""
+    return ";".join(f"{src}={_local_dimensions(src)}" for src in sources)
+
+
+def save_cache():
+    """
+    Write the dimension cache to disk if it is file backed and has changed.
+    """
+    _cache.save()
+
+
+def image_props(src, alt):
+    """
+    Return the attributes of an <img> for src and alt.
+
+    Once enabled, every image gets loading="lazy" and decoding="async", and
+    local images also get their width and height so the page does not shift
+    as they load.
+    """
+    props = {"src": src, "alt": alt}
+    if _static_dir is None:
+        return props
+    size = _local_dimensions(src) if _is_local(src) else None
+    if size is not None:
+        props["width"] = str(size[0])
+        props["height"] = str(size[1])
+    props["loading"] = "lazy"
+    props["decoding"] = "async"
+    return props
+
+
+def _is_local(src):
+    return src.startswith("/") and not src.startswith("//")
+
+
+def _local_dimensions(src):
+    # (width, height) of a root-relative source below the static directory
+    path = os.path.normpath(os.path.join(_static_dir, src.lstrip("/").split("?")[0].split("#")[0]))
+    if not path.startswith(os.path.normpath(_static_dir) + os.sep):
+        return None
+    return _cache.dimensions(path)
@@ -1,40 +1,242 @@
+import argparse
+import json
 import os
-import shutil
 import sys
-from page_generator import  generate_pages_recursive
+import content_index
+import image_probe
+import syntax_highlighter
+from build_errors import ErrorReport
+from manifest import new_manifest, save_manifest, write_manifest
+from output_writers import open_writer
+from page_generator import  find_pages, generate_pages_recursive
+from static_files import clean_public, copy_static, template_entries
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("base_path", nargs="?", default="/")
+    parser.add_argument("dest_dir", nargs="?", default="public")
+    parser.add_argument("--minify", action="store_true",
+                        help="strip insignificant whitespace and comments from the output")
+    renderer = parser.add_mutually_exclusive_group()
+    renderer.add_argument("--mmap", action="store_true",
+                          help="parse pages from memory-mapped files to reduce copying on large pages")
+    renderer.add_argument("--fast", action="store_true",
+                          help="render markdown straight to HTML without building a node tree")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="persist build caches (rendered pages, syntax highlighting) in DIR between builds")
+    parser.add_argument("--cache-restore", metavar="SHARED_DIR",
+                        help="copy cache entries from a shared cache directory before building")
+    parser.add_argument("--cache-save", metavar="SHARED_DIR",
+                        help="copy new cache entries to a shared cache directory after building")
+    parser.add_argument("--cache-max-mb", metavar="MB", type=float,
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--minify-css", action="store_true",
+                        help="write stylesheets minified")
+    parser.add_argument("--inline-css", metavar="BYTES", nargs="?", type=int, const=8192,
+                        help="inline local stylesheets of at most BYTES (default 8192) once minified "
+                             "into the page templates")
+    parser.add_argument("--no-image-sizes", action="store_true",
+                        help="do not add width/height and lazy loading attributes to images")
+    parser.add_argument("--feed", metavar="SITE_URL",
+                        help="write an Atom feed of the newest blog posts to blog/feed.xml, linking to "
+                             "SITE_URL (e.g. https://example.com)")
+    parser.add_argument("--feed-size", metavar="N", type=int, default=10,
+                        help="number of posts in the feed (default 10)")
+    parser.add_argument("--jobs", "-j", metavar="N", type=int, default=1,
+                        help="render pages in N worker processes, largest pages first (default 1)")
+    parser.add_argument("--memory-budget", metavar="MB", type=float,
+                        help="with --jobs, limit the estimated memory of pages rendering at once")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="skip pages that fail to build, finish the rest and then report every error "
+                             "with its file and line")
+    parser.add_argument("--error-report", metavar="FILE",
+                        help="with --keep-going, also write the errors to FILE as JSON")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="write the site straight into a .tar.gz or .zip archive instead of dest_dir")
+    parser.add_argument("--atomic-writes", action="store_true",
+                        help="write each output file to a temporary name and rename it into place")
+    parser.add_argument("--background-writes", action="store_true",
+                        help="write output files on a background thread while rendering continues")
+    parser.add_argument("--plan", nargs="?", const="text", choices=("text", "json"),
+                        help="compare sources with the previous build's manifest and report what a build "
+                             "would change, without building")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="keep the build manifest used by --plan at PATH, outside the published output "
+                             "(default: manifest.json in --cache-dir; none is kept without either)")
+    parser.add_argument("--profile", metavar="REPORT",
+                        help="write per-page and per-stage timings to REPORT as JSON")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="also trace memory with tracemalloc: peak and net allocation per page and "
+                             "stage, and the top allocation sites (slows the build down)")
+    parser.add_argument("--shard", metavar="I/N",
+                        help="render only shard I of N (numbered from 1) and write a shard manifest")
+    parser.add_argument("--merge", metavar="SHARD_DIR", nargs="+",
+                        help="merge shard output directories into dest_dir and verify completeness")
+    parser.add_argument("--dev-server", metavar="PORT", nargs="?", type=int, const=8888,
+                        help="serve the site on localhost:PORT (default 8888), rendering each page when it "
+                             "is requested, without writing any output")
+    parser.add_argument("--serve", metavar="SOCKET",
+                        help="run a build server on a Unix socket, keeping caches warm between builds")
+    parser.add_argument("--client", metavar="SOCKET",
+                        help="ask the build server listening on SOCKET to rebuild")
+    parser.add_argument("--stop-server", metavar="SOCKET",
+                        help="shut down the build server listening on SOCKET")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    base_path = args.base_path
+    dest_dir = args.dest_dir
+
+    cache = None
+    if args.cache_dir:
+        from render_cache import RenderCache, sync_cache
+        if args.cache_restore:
+            sync_cache(args.cache_restore, args.cache_dir)
+        max_bytes = int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb else None
+        cache = RenderCache(args.cache_dir, max_bytes)
+        syntax_highlighter.use_cache_file(os.path.join(args.cache_dir, "highlight.json"))
+        # Directory mtimes are local to this checkout, so the index is never synced
+        content_index.use_cache_file(os.path.join(args.cache_dir, "content-index.json"))
+    elif args.cache_restore or args.cache_save:
+        sys.exit("--cache-restore/--cache-save require --cache-dir")
+    if not args.no_image_sizes:
+        image_probe.enable("static", os.path.join(args.cache_dir, "images.json") if args.cache_dir else None)
+    if args.profile_memory and not args.profile:
+        sys.exit("--profile-memory requires --profile")
+    if args.error_report and not args.keep_going:
+        sys.exit("--error-report requires --keep-going")
+    if args.jobs > 1 and args.profile:
+        sys.exit("--profile cannot be used with --jobs")
+    manifest_path = args.manifest
+    if manifest_path is None and args.cache_dir:
+        manifest_path = os.path.join(args.cache_dir, "manifest.json")
+    if args.plan and manifest_path is None:
+        sys.exit("--plan requires --manifest or --cache-dir to find the previous build's manifest")
+    if args.feed and args.shard:
+        sys.exit("--feed needs every page, so it cannot be used with --shard")
+
+    inline_css = None if args.inline_css is None else ("static", args.inline_css)
+
+    if args.dev_server is not None:
+        from dev_server import DevServer, make_server
+        site = DevServer(base_path=base_path, minify=args.minify, inline_css=inline_css)
+        with make_server(site, port=args.dev_server) as server:
+            print(f"Serving on http://localhost:{server.server_address[1]}{base_path}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return
+    if args.serve:
+        from build_server import BuildServer, serve
+        serve(args.serve, BuildServer(manifest_path=manifest_path))
+        return
+    if args.client:
+        from build_server import request_build
+        result = request_build(args.client, base_path, os.path.abspath(dest_dir), args.minify)
+        print(result)
+        if not result.get("ok"):
+            sys.exit(1)
+        return
+    if args.stop_server:
+        from build_server import send_request
+        send_request(args.stop_server, {"command": "shutdown"})
+        return
+
+    if args.merge:
+        from sharding import merge_shards
+        merged = merge_shards(args.merge, dest_dir, base_path, manifest_path)
+        print(f"Merged {len(args.merge)} shards ({len(merged['pages'])} pages) into {dest_dir}")
+        if merged["errors"]:
+            errors = ErrorReport("content")
+            errors.update(merged["errors"])
+            report_errors(errors, args.error_report)
+        return
+
+    if args.plan:
+        from build_plan import format_plan, plan_build
+        plan = plan_build("content", "static", dest_dir, base_path, args.minify, manifest_path)
+        print(json.dumps(plan, indent=1) if args.plan == "json" else format_plan(plan))
+        return
+
+    pages = None
+    shard = None
+    if args.shard:
+        from sharding import parse_shard, select_shard, shard_info
+        index, count = parse_shard(args.shard)
+        pages, all_pages = select_shard(find_pages("content", dest_dir), "content", index, count)
+        shard = shard_info(index, count, all_pages)
+
+    profiler = None
+    if args.profile:
+        from build_profiler import BuildProfiler
+        profiler = BuildProfiler(args.profile_memory)
+
+    feed = None
+    if args.feed:
+        from feed import FeedBuilder
+        feed_state = os.path.join(args.cache_dir, "feed.json") if args.cache_dir else None
+        feed = FeedBuilder(args.feed, "blog", base_path, args.feed_size, path=feed_state)
+    errors = ErrorReport("content") if args.keep_going else None
+    if not args.archive:
+        clean_public(dest_dir)
+    with open_writer(args.archive or dest_dir, args.atomic_writes, args.background_writes) as writer:
+        # Static files only need to come from one shard
+        static = None
+        if shard is None or shard["index"] == 1:
+            static = copy_static(dest_dir, writer=writer, minify_css=args.minify_css)
+        if args.jobs > 1:
+            from parallel_build import RenderTimes, generate_pages_parallel
+            times = RenderTimes(os.path.join(args.cache_dir, "render-times.json") if args.cache_dir else None)
+            memory_budget = int(args.memory_budget * 1024 * 1024) if args.memory_budget else None
+            # Archive members are stored in write order, so keep it deterministic
+            entries = generate_pages_parallel("content", "static/template.html", dest_dir, base_path,
+                                              args.minify, args.mmap, pages, cache, writer, args.fast,
+                                              inline_css, feed, errors, args.jobs, times, memory_budget,
+                                              ordered=bool(args.archive))
+            times.save()
+        else:
+            entries = generate_pages_recursive("content", "static/template.html", dest_dir, base_path,
+                                               args.minify, args.mmap, pages, cache, writer, profiler,
+                                               args.fast, None, inline_css, feed, errors)
+        if feed is not None:
+            feed.write(writer)
+            print(f"Feed {'updated' if feed.changed else 'unchanged'}: {feed.output_path}")
+        manifest = new_manifest(entries, base_path, shard, static, template_entries("static"), args.minify,
+                                errors.errors if errors else None)
+        # A shard's output is merged, not published, and the merge needs its manifest
+        if shard is not None:
+            save_manifest(dest_dir, manifest, writer)
+        elif manifest_path is not None:
+            write_manifest(manifest_path, manifest)
+    syntax_highlighter.save_cache()
+    image_probe.save_cache()
+    content_index.save_cache()
+    if profiler is not None:
+        profiler.close()
+        profiler.save(args.profile)
+        print(profiler.summary())
+        print(f"Profile written to {args.profile}")
+    if cache is not None:
+        cache.prune()
+        print(f"Render cache: {cache.hits} hits, {cache.misses} misses")
+        if args.cache_save:
+            sync_cache(args.cache_dir, args.cache_save)
+    if errors:
+        report_errors(errors, args.error_report)
 
-def clean_public(clean_dir="public"):
-    """
-    Clean the public directory by removing it and creating a new one.
-    """
-    if os.path.exists(clean_dir):
-        shutil.rmtree(clean_dir)
-    os.makedirs(clean_dir)
 
-def copy_static(dest_dir="public"):
+def report_errors(errors, report_path=None):
     """
-    Copy static files to the public directory.
+    Print the errors of a keep-going build, optionally save them, and exit with status 1.
     """
-    if os.path.exists("static"):
-        for item in os.listdir("static"):
-            if item == "template.html":
-                continue  # skip template
-            s = os.path.join("static", item)
-            d = os.path.join(dest_dir, item)
-            if os.path.isdir(s):
-                shutil.copytree(s, d, dirs_exist_ok=True)
-            else:
-                os.makedirs(os.path.dirname(d), exist_ok=True)
-                shutil.copy2(s, d)
-
-
-def main():
-    base_path = sys.argv[1] if len(sys.argv) > 1 else "/"
-    dest_dir =  sys.argv[2] if len(sys.argv) > 2 else "public"
-
-    clean_public(dest_dir)
-    copy_static(dest_dir)
-    generate_pages_recursive("content", "static/template.html", dest_dir, base_path)
+    print(errors.format(), file=sys.stderr)
+    if report_path:
+        errors.save(report_path)
+    sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
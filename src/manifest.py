@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def page_entry(from_path, dest_relative_path, page):
+    """
+    Describe one generated page for the build manifest.
+
+    Args:
+        from_path (str): The markdown source file.
+        dest_relative_path (str): Output path relative to the output root.
+        page (str): The rendered page.
+
+    Returns:
+        dict: The manifest entry.
+    """
+    return {
+        "output": dest_relative_path,
+        **file_entry(from_path),
+        "sha256": hashlib.sha256(page.encode("utf-8")).hexdigest(),
+    }
+
+
+def file_entry(path):
+    """
+    Describe an input file by the stat data used to detect changes.
+    """
+    st = os.stat(path)
+    return {"source_size": st.st_size, "source_mtime_ns": st.st_mtime_ns}
+
+
+def new_manifest(pages, base_path="/", shard=None, static=None, templates=None, minify=False, errors=None):
+    """
+    Build a manifest dict from page entries keyed by relative source path.
+
+    Args:
+        pages (Dict[str, dict]): page_entry() results keyed by relative source path.
+        base_path (str): The base path the pages were rendered with.
+        shard (dict): The shard section, for sharded builds.
+        static (Dict[str, dict]): file_entry() results for copied static files.
+        templates (Dict[str, dict]): file_entry() results for the template,
+            layouts and partials.
+        minify (bool): Whether the pages were minified.
+        errors (Dict[str, dict]): Pages that failed to build, keyed by
+            relative source path (see build_errors.ErrorReport).
+    """
+    return {
+        "version": MANIFEST_VERSION,
+        "base_path": base_path,
+        "minify": minify,
+        "shard": shard,
+        "templates": None if templates is None else dict(sorted(templates.items())),
+        "static": None if static is None else dict(sorted(static.items())),
+        "pages": dict(sorted(pages.items())),
+        "errors": dict(sorted((errors or {}).items())),
+    }
+
+
+def save_manifest(dest_dir, manifest, writer=None):
+    """
+    Write the manifest into an output directory, or through writer if given.
+
+    Only shard outputs carry their manifest this way; merge_shards leaves it
+    out of the merged site. Published builds keep theirs outside the output
+    (see write_manifest), as it lists source paths, mtimes and hashes.
+    """
+    if writer is not None:
+        writer.write(MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True))
+        return MANIFEST_NAME
+    return write_manifest(os.path.join(dest_dir, MANIFEST_NAME), manifest)
+
+
+def write_manifest(path, manifest):
+    """
+    Write the manifest to a file at path.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_manifest(dest_dir):
+    """
+    Read the manifest from an output directory.
+
+    Returns:
+        dict: The manifest, or None if the directory has none or it is unreadable.
+    """
+    return read_manifest(os.path.join(dest_dir, MANIFEST_NAME))
+
+
+def read_manifest(path):
+    """
+    Read the manifest file at path.
+
+    Returns:
+        dict: The manifest, or None if there is none or it is unreadable.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
@@ -1,5 +1,11 @@
 import re
 
+# Neither pattern nests quantifiers and each character class excludes the
+# delimiter that ends it, so a failed match attempt never rescans text
+# beyond the next bracket or parenthesis: matching is O(n) in the text.
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def extract_markdown_images(text):
     """
     Extract all markdown images from text and return a list of tuples
@@ -11,9 +17,7 @@ def extract_markdown_images(text):
     Returns:
         List[Tuple[str, str]]: List of (alt_text, url) tuples
     """
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
     """
@@ -26,7 +30,5 @@ def extract_markdown_links(text):
     Returns:
         List[Tuple[str, str]]: List of (text, url) tuples
     """
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
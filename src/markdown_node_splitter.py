@@ -1,4 +1,4 @@
-from markdown_extractors import extract_markdown_images, extract_markdown_links
+from markdown_extractors import IMAGE_PATTERN, LINK_PATTERN
 from text_node import TextNode, TextType
 
 # Supported delimiters for inline markdown styling
@@ -9,6 +9,11 @@ SUPPORTED_DELIMITERS = {
 }
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
+    """
+    Split TEXT nodes on an inline delimiter such as ** or `.
+
+    Each node is split once with str.split, so this is O(n) in the text.
+    """
     if delimiter not in SUPPORTED_DELIMITERS:
         raise ValueError(f"Unsupported delimiter: {delimiter}")
     
@@ -41,33 +46,23 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
-
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
+    """
+    Split TEXT nodes around markdown images.
 
-        text = node.text
-        matches = extract_markdown_images(text)
+    Runs in O(n) per node: matches are located with a single scan and the
+    text between them is sliced by offset rather than re-split each time.
+    """
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
-        if not matches:
-            new_nodes.append(node)
-            continue
-
-        for alt_text, url in matches:
-            parts = text.split(f"![{alt_text}]({url})", 1)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-            text = parts[1]
-        
-        if text:
-            new_nodes.append(TextNode(text, TextType.TEXT))
+def split_nodes_link(old_nodes):
+    """
+    Split TEXT nodes around markdown links (but not images).
 
-    return new_nodes
+    Runs in O(n) per node, like split_nodes_image.
+    """
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
 
-def split_nodes_link(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
 
     for node in old_nodes:
@@ -76,20 +71,18 @@ def split_nodes_link(old_nodes):
             continue
 
         text = node.text
-        matches = extract_markdown_links(text)
+        pos = 0
 
-        if not matches:
-            new_nodes.append(node)
-            continue
-
-        for anchor_text, url in matches:
-            parts = text.split(f"[{anchor_text}]({url})", 1)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
-            text = parts[1]
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if start > pos:
+                new_nodes.append(TextNode(text[pos:start], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            pos = end
 
-        if text:
-            new_nodes.append(TextNode(text, TextType.TEXT))
+        if pos == 0:
+            new_nodes.append(node)
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
 
-    return new_nodes
\ No newline at end of file
+    return new_nodes
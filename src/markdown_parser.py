@@ -1,17 +1,23 @@
 from enum import Enum
 import re
 
+# Block separator: a newline, any whitespace, then another newline. A failed
+# attempt only scans the whitespace run that follows one newline, and runs
+# never overlap, so splitting is O(n) even on huge whitespace-only input.
+_BLOCK_SEPARATOR = re.compile(r'\n\s*\n')
 
 def markdown_to_blocks(markdown):
     """
     Split markdown string into blocks based on one or more blank lines.
     A block is a section of text separated by one or more blank lines.
+
+    Runs in O(n) time in the length of the markdown.
     """
     # Normalize line endings and strip leading/trailing whitespace
     markdown = markdown.strip()
 
     # Use regex to split on 2+ newlines (including lines that may contain spaces/tabs)
-    raw_blocks = re.split(r'\n\s*\n', markdown)
+    raw_blocks = _BLOCK_SEPARATOR.split(markdown)
 
     # Trim each block
     return [block.strip() for block in raw_blocks if block.strip()]
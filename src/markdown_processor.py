@@ -1,15 +1,21 @@
 import textwrap
+from headings import HeadingIndex
 from html_node import ParentNode
 from markdown_parser import BlockType, block_to_block_type, markdown_to_blocks
 from node_parser import code_to_html_node, heading_to_html_node, list_to_html_node, paragraph_to_html_node, quote_to_html_node, text_node_to_html_node, text_to_text_nodes
 
 
-def markdown_to_html_node(markdown):
+def markdown_to_html_node(markdown, transforms=None, headings=None):
     """
     Convert a markdown string to an HTML node representation.
     
     Args:
         markdown (str): The markdown string to convert.
+        transforms (TransformPipeline): Optional transforms, applied to each
+            block's nodes as soon as the block is built and then to the root
+            div once all blocks are in place, so the tree is walked once.
+        headings (HeadingIndex): Collects the page's headings, e.g. for a
+            table of contents; headings get ids from it either way.
         
     Returns:
         ParentNode: The root node of the HTML representation.
@@ -18,20 +24,28 @@ def markdown_to_html_node(markdown):
     blocks = markdown_to_blocks(textwrap.dedent(markdown))
     
     # Create a parent node to hold all blocks
-    children = []
+    root = ParentNode("div", [], props={"class": "markdown-body"})
+    children = root.children
+    if headings is None:
+        headings = HeadingIndex()
     
     for block in blocks:
-        html_node = block_to_html_node(block)
+        html_node = block_to_html_node(block, headings)
+        if transforms is not None:
+            html_node = transforms.apply(html_node, (root,))
         children.append(html_node)
-        
-    return ParentNode("div", children, props={"class": "markdown-body"})
+    
+    if transforms is not None:
+        root = transforms.apply(root, children=False)
+    return root
 
-def block_to_html_node(block):
+def block_to_html_node(block, headings=None):
     """
     Convert a markdown block to an HTML node representation.
     
     Args:
         block (str): The markdown block to convert.
+        headings (HeadingIndex): Assigns heading ids (see heading_to_html_node).
         
     Returns:
         ParentNode: The HTML node representation of the block.
@@ -42,7 +56,7 @@ def block_to_html_node(block):
         return paragraph_to_html_node(block)
     
     elif block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, headings)
     
     elif block_type == BlockType.CODE:
         return code_to_html_node(block)
@@ -1,6 +1,8 @@
 import re
 from html_node import LeafNode, ParentNode
+from image_probe import image_props
 from markdown_node_splitter import (split_nodes_delimiter, split_nodes_image, split_nodes_link)
+from syntax_highlighter import highlight
 from text_node import TextNode, TextType
 
 def text_to_text_nodes(text):
@@ -42,7 +44,7 @@ def text_node_to_html_node(text_node):
             return LeafNode("a", text_node.text, {"href": text_node.url})
         
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", image_props(text_node.url, text_node.text))
         
         case _:
             raise ValueError(f"Unsupported TextType: {text_node.text_type}")
@@ -78,7 +80,14 @@ def paragraph_to_html_node(text):
     children = text_to_children(paragraph)
     return ParentNode("p", children)
 
-def heading_to_html_node(text):
+def heading_to_html_node(text, headings=None):
+    """
+    Convert a heading block to an <hN> node.
+
+    Args:
+        headings (HeadingIndex): Optional index of the page's headings; the
+            heading is added to it and gets the id it assigns.
+    """
     level = 0
     for char in text:
         if char == "#":
@@ -89,15 +98,51 @@ def heading_to_html_node(text):
         raise ValueError("Invalid heading format")
     text = text[level + 1:].strip()
     children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    props = None if headings is None else {"id": headings.add(level, text)}
+    return ParentNode(f"h{level}", children, props)
 
-def code_to_html_node(text):
+# A fence info string such as ```python or ```c++
+_INFO_STRING = re.compile(r"[\w+#.-]+")
+
+def split_code_block(text):
+    """
+    Split a fenced code block into its language (or None) and its code.
+
+    Raises:
+        ValueError: If text is not a fenced code block.
+    """
     if not text.startswith("```") or not text.endswith("```"):
         raise ValueError("invalid code block")
-    text_code = text[4:-3].strip()
-    raw_text_node = TextNode(text_code, TextType.TEXT)
-    child = text_node_to_html_node(raw_text_node)
-    code_node = ParentNode("code", [child])
+    info, newline, rest = text[3:-3].partition("\n")
+    language = info.strip()
+    if newline and _INFO_STRING.fullmatch(language):
+        return language, rest.strip()
+    return None, text[4:-3].strip()
+
+def code_to_html_node(text):
+    """
+    Convert a fenced code block to a <pre><code> node, highlighted when the
+    fence names a supported language.
+
+    Leaves hold the raw code and are escaped exactly once when serialized,
+    so source such as "&lt;" is shown literally rather than as "<".
+    """
+    language, text_code = split_code_block(text)
+
+    if language is None:
+        raw_text_node = TextNode(text_code, TextType.TEXT)
+        child = text_node_to_html_node(raw_text_node)
+        return ParentNode("pre", [ParentNode("code", [child])])
+
+    tokens = highlight(text_code, language)
+    if tokens is None:
+        children = [LeafNode(None, text_code)]
+    else:
+        children = [
+            LeafNode(None, token) if kind is None else LeafNode("span", token, {"class": f"tok-{kind}"})
+            for kind, token in tokens
+        ]
+    code_node = ParentNode("code", children, {"class": f"language-{language}"})
     return ParentNode("pre", [code_node])
 
 def quote_to_html_node(text):
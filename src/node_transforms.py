@@ -0,0 +1,173 @@
+import time
+from html_node import PRESERVE_WHITESPACE_TAGS, ParentNode
+
+
+class NodeTransform:
+    """
+    Base class for post-processing passes over an HTML node tree.
+
+    Subclasses override visit(). Setting tags limits the nodes a transform
+    is shown to, e.g. tags = {"a", "img"}; None means every node. Text
+    leaves have tag None, so a transform wanting them must see all nodes.
+    """
+
+    tags = None
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def cache_key(self):
+        """
+        Return a string identifying what the transform does to a page, including
+        its configuration, or None if pages it visits must not be cached.
+
+        Transforms that collect data from pages return None, so that they are
+        shown every page rather than only those the render cache misses.
+        """
+        return None
+
+    def visit(self, node, ancestors):
+        """
+        Inspect or modify node in place.
+
+        Args:
+            node (HTMLNode): The node being visited.
+            ancestors (Tuple[HTMLNode, ...]): Its parents, outermost first.
+
+        Returns:
+            HTMLNode: A replacement node, or None to keep node.
+        """
+        raise NotImplementedError("Child classes must implement this method")
+
+
+class TransformPipeline:
+    """
+    Run several transforms in a single traversal of a node tree.
+
+    Each node is handed to every interested transform, in registration
+    order, before its children are visited, so a replacement node's children
+    are the ones walked. The time spent in each transform is accumulated in
+    timings so the cost of every plugin is visible.
+    """
+
+    def __init__(self, transforms=()):
+        self.transforms = []
+        self.timings = {}
+        self._by_tag = {}
+        for transform in transforms:
+            self.register(transform)
+
+    def register(self, transform):
+        """
+        Add a transform after the ones already registered.
+
+        Raises:
+            ValueError: If a transform with the same name is registered.
+        """
+        if transform.name in self.timings:
+            raise ValueError(f"Transform already registered: {transform.name}")
+        self.transforms.append(transform)
+        self.timings[transform.name] = 0.0
+        # Per-tag dispatch lists are rebuilt lazily, in registration order
+        self._by_tag = {}
+        return transform
+
+    def cache_key(self):
+        """
+        Return the cache keys of every transform, in order, or None if any
+        transform cannot be cached (see NodeTransform.cache_key).
+        """
+        keys = tuple(transform.cache_key() for transform in self.transforms)
+        return None if None in keys else keys
+
+    def _for_tag(self, tag):
+        transforms = self._by_tag.get(tag)
+        if transforms is None:
+            transforms = [t for t in self.transforms if t.tags is None or tag in t.tags]
+            self._by_tag[tag] = transforms
+        return transforms
+
+    def apply(self, node, ancestors=(), children=True):
+        """
+        Visit node and, unless children is False, everything below it.
+
+        Returns:
+            HTMLNode: node, or the node that replaced it.
+        """
+        timings = self.timings
+        for transform in self._for_tag(node.tag):
+            start = time.perf_counter()
+            replacement = transform.visit(node, ancestors)
+            timings[transform.name] += time.perf_counter() - start
+            if replacement is not None:
+                node = replacement
+        if children and isinstance(node, ParentNode) and node.children:
+            ancestors = ancestors + (node,)
+            child_nodes = node.children
+            for i, child in enumerate(child_nodes):
+                child_nodes[i] = self.apply(child, ancestors)
+        return node
+
+    def report(self):
+        """
+        Return one line per transform with the total time spent in it.
+        """
+        return "\n".join(f"{name:<24} {seconds * 1000:9.3f} ms" for name, seconds in self.timings.items())
+
+
+def _in_preformatted(ancestors):
+    return any(ancestor.tag in PRESERVE_WHITESPACE_TAGS for ancestor in ancestors)
+
+
+class RewriteUrls(NodeTransform):
+    """
+    Pass every link href and image src through a function.
+
+    A function cannot be told apart from another by the render cache, so
+    pages are only cached when key names what it does, e.g. the prefix it
+    adds; it must change whenever the function's output does.
+    """
+
+    tags = {"a", "img"}
+
+    def __init__(self, rewrite, key=None):
+        self.rewrite = rewrite
+        self.key = key
+
+    def cache_key(self):
+        return None if self.key is None else f"{self.name}:{self.key}"
+
+    def visit(self, node, ancestors):
+        attribute = "href" if node.tag == "a" else "src"
+        if node.props and attribute in node.props:
+            node.props[attribute] = self.rewrite(node.props[attribute])
+
+
+class CollectImages(NodeTransform):
+    """
+    Record the (src, alt) of every image, in document order.
+    """
+
+    tags = {"img"}
+
+    def __init__(self):
+        self.images = []
+
+    def visit(self, node, ancestors):
+        props = node.props or {}
+        self.images.append((props.get("src"), props.get("alt")))
+
+
+class WordCount(NodeTransform):
+    """
+    Count the words of text outside code and preformatted blocks.
+    """
+
+    def __init__(self):
+        self.words = 0
+
+    def visit(self, node, ancestors):
+        if node.children is None and node.value and node.tag not in PRESERVE_WHITESPACE_TAGS \
+                and not _in_preformatted(ancestors):
+            self.words += len(node.value.split())
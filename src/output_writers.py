@@ -0,0 +1,263 @@
+import gzip
+import io
+import os
+import queue
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+
+# Zip cannot store dates before 1980, so use that as the default fixed time
+_DEFAULT_EPOCH = 315532800
+
+
+def _fixed_mtime():
+    """
+    Timestamp stamped on every archive member, honouring SOURCE_DATE_EPOCH.
+    """
+    return int(os.environ.get("SOURCE_DATE_EPOCH", _DEFAULT_EPOCH))
+
+
+class OutputWriter:
+    """
+    Base class for build outputs; paths are relative to the output root.
+    """
+
+    def write(self, relative_path, data):
+        """
+        Write data (str or bytes) to relative_path.
+        """
+        raise NotImplementedError("Child classes must implement this method")
+
+    def copy_file(self, src, relative_path):
+        """
+        Copy an existing file to relative_path.
+        """
+        with open(src, "rb") as f:
+            self.write(relative_path, f.read())
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DirectoryWriter(OutputWriter):
+    """
+    Write output files below a directory on disk.
+
+    Directories created during this writer's lifetime are remembered, so
+    each one costs a single makedirs no matter how many files go into it.
+    The cache is only valid while nothing else deletes the tree, which is
+    why a writer should live for exactly one build. Files are written with
+    raw os.open/os.write to avoid the buffered file object's extra calls.
+
+    With atomic=True each file is written to a temporary name in the same
+    directory and renamed into place, so readers never see partial files.
+    """
+
+    def __init__(self, root, atomic=False):
+        self.root = root
+        self.atomic = atomic
+        self._created_dirs = set()
+
+    def _target(self, relative_path):
+        path = os.path.join(self.root, relative_path)
+        directory = os.path.dirname(path)
+        if directory and directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+        return path
+
+    def write(self, relative_path, data):
+        path = self._target(relative_path)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp" if self.atomic else path
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        if self.atomic:
+            os.replace(tmp_path, path)
+
+    def copy_file(self, src, relative_path):
+        path = self._target(relative_path)
+        if self.atomic:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copy2(src, tmp_path)
+            os.replace(tmp_path, path)
+        else:
+            shutil.copy2(src, path)
+
+
+class MemoryWriter(OutputWriter):
+    """
+    Keep output files in a dict of relative path to bytes, e.g. for tests.
+    """
+
+    def __init__(self):
+        self.root = ""
+        self.files = {}
+
+    def write(self, relative_path, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.files[relative_path.replace(os.sep, "/")] = data
+
+
+class BackgroundWriter(OutputWriter):
+    """
+    Hand writes to another writer on a background thread.
+
+    Rendering continues while earlier pages are written; queued operations
+    are drained in batches so the thread wakes up once per burst rather than
+    once per file. The queue is bounded to cap memory held by pending pages.
+    The first error raised by the wrapped writer is re-raised from the next
+    write or from close().
+    """
+
+    def __init__(self, writer, max_pending=256, batch_size=64):
+        self.writer = writer
+        self.root = writer.root
+        self.batch_size = batch_size
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for operation in batch:
+                if operation is None:
+                    return
+                if self._error is None:
+                    method, args = operation
+                    try:
+                        method(*args)
+                    except Exception as e:
+                        self._error = e
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, relative_path, data):
+        self._raise_pending_error()
+        self._queue.put((self.writer.write, (relative_path, data)))
+
+    def copy_file(self, src, relative_path):
+        self._raise_pending_error()
+        self._queue.put((self.writer.copy_file, (src, relative_path)))
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.writer.close()
+        self._raise_pending_error()
+
+
+class TarGzWriter(OutputWriter):
+    """
+    Stream output files straight into a reproducible .tar.gz archive.
+
+    Members get a fixed mtime, owner and mode, and the gzip header carries
+    no file name or build time, so identical input yields identical bytes.
+    Members are stored in the order they are written.
+    """
+
+    def __init__(self, path):
+        self.root = path
+        self._mtime = _fixed_mtime()
+        self._raw = open(path, "wb")
+        self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=self._mtime)
+        self._tar = tarfile.open(fileobj=self._gzip, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def _member(self, relative_path, size):
+        info = tarfile.TarInfo(relative_path.replace(os.sep, "/"))
+        info.size = size
+        info.mtime = self._mtime
+        info.mode = 0o644
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def write(self, relative_path, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._tar.addfile(self._member(relative_path, len(data)), io.BytesIO(data))
+
+    def copy_file(self, src, relative_path):
+        with open(src, "rb") as f:
+            self._tar.addfile(self._member(relative_path, os.fstat(f.fileno()).st_size), f)
+
+    def close(self):
+        self._tar.close()
+        self._gzip.close()
+        self._raw.close()
+
+
+class ZipWriter(OutputWriter):
+    """
+    Stream output files straight into a reproducible .zip archive.
+    """
+
+    def __init__(self, path):
+        self.root = path
+        self._date_time = _zip_date_time(_fixed_mtime())
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+
+    def _member(self, relative_path):
+        info = zipfile.ZipInfo(relative_path.replace(os.sep, "/"), date_time=self._date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        return info
+
+    def write(self, relative_path, data):
+        self._zip.writestr(self._member(relative_path), data)
+
+    def copy_file(self, src, relative_path):
+        with open(src, "rb") as f, self._zip.open(self._member(relative_path), "w") as member:
+            shutil.copyfileobj(f, member)
+
+    def close(self):
+        self._zip.close()
+
+
+def _zip_date_time(timestamp):
+    return time.gmtime(max(timestamp, _DEFAULT_EPOCH))[:6]
+
+
+def open_writer(target, atomic=False, background=False):
+    """
+    Return a writer for target: an archive when it ends in .tar.gz/.tgz/.zip,
+    otherwise a directory.
+
+    Args:
+        target (str): Output directory or archive path.
+        atomic (bool): Rename directory output files into place.
+        background (bool): Perform writes on a background thread.
+    """
+    if target.endswith((".tar.gz", ".tgz")):
+        writer = TarGzWriter(target)
+    elif target.endswith(".zip"):
+        writer = ZipWriter(target)
+    else:
+        writer = DirectoryWriter(target, atomic)
+    return BackgroundWriter(writer) if background else writer
@@ -1,5 +1,14 @@
+import contextlib
 import os
+import image_probe
+from content_index import scan_content
+from fast_renderer import markdown_to_html
+from headings import HeadingIndex
+from manifest import page_entry
+from output_writers import DirectoryWriter
 from markdown_processor import markdown_to_html_node
+from span_parser import MappedMarkdown
+from template_engine import CompiledTemplate, compile_source, load_template, select_layout
 
 
 def extract_title(markdown: str) -> str:
@@ -20,45 +29,226 @@ def extract_title(markdown: str) -> str:
             return line.strip()[2:].strip()
     raise ValueError("No H1 header found in markdown.")
 
-def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str = "/"):
+def _stage(profiler, name):
+    return contextlib.nullcontext() if profiler is None else profiler.stage(name)
+
+def render_page(markdown: str, template: str, base_path: str = "/", minify: bool = False,
+                profiler=None, fast: bool = False, transforms=None) -> str:
+    """
+    Render a markdown document into a full HTML page using the template.
+
+    Args:
+        markdown (str): The markdown content.
+        template (str | CompiledTemplate): The template text, or a template
+            compiled with the same base_path and minify settings.
+        base_path (str): Prefix applied to root-relative href/src paths.
+        minify (bool): Strip insignificant whitespace from template and content.
+        profiler (BuildProfiler): Optional profiler recording the parse,
+            serialize (or render, when fast) and template stages.
+        fast (bool): Render with fast_renderer.markdown_to_html, which gives
+            the same output without building a node tree. Ignored when there
+            are transforms.
+        transforms (TransformPipeline): Optional transforms applied to the tree.
+
+    Returns:
+        str: The rendered page.
+    """
+    headings = HeadingIndex()
+    if fast and transforms is None:
+        with _stage(profiler, "render"):
+            html = markdown_to_html(markdown, minify, headings)
+    else:
+        with _stage(profiler, "parse"):
+            node = markdown_to_html_node(markdown, transforms, headings)
+        with _stage(profiler, "serialize"):
+            html = node.to_html(minify)
+    title = extract_title(markdown)
+    with _stage(profiler, "template"):
+        return fill_template(template, title, html, base_path, minify, headings.toc_html())
+
+def render_mapped_page(from_path: str, template: str, base_path: str = "/", minify: bool = False,
+                       profiler=None, transforms=None) -> str:
+    """
+    Render a markdown file like render_page, parsing it from a memory map.
+
+    The file is never read into one string; text is only decoded while the
+    node tree is serialized (see span_parser.MappedMarkdown).
+    """
+    headings = HeadingIndex()
+    with MappedMarkdown(from_path) as source:
+        with _stage(profiler, "parse"):
+            node = source.to_html_node(headings)
+            if transforms is not None:
+                node = transforms.apply(node)
+        with _stage(profiler, "serialize"):
+            html = node.to_html(minify)
+        title = source.title()
+    with _stage(profiler, "template"):
+        return fill_template(template, title, html, base_path, minify, headings.toc_html())
+
+def fill_template(template, title: str, html: str, base_path: str = "/", minify: bool = False,
+                  toc: str = "") -> str:
+    """
+    Substitute the title, rendered content and table of contents into the template.
+
+    Root-relative href/src paths are prefixed with base_path for GitHub Pages
+    subdirectory deployment. {{ Toc }} is left empty for pages without
+    subheadings (see headings.HeadingIndex.toc_html).
+    """
+    if not isinstance(template, CompiledTemplate):
+        template = compile_source(template, base_path, minify)
+    return template.render({"Title": title, "Content": html, "Toc": toc})
+
+def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str = "/",
+                  minify: bool = False, use_mmap: bool = False, cache=None, writer=None, profiler=None,
+                  fast: bool = False, transforms=None, inline_css=None):
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
     
-    with open(from_path, "r", encoding="utf-8") as f:
+    with contextlib.nullcontext() if profiler is None else profiler.page(from_path):
+        template = load_template(template_path, base_path, minify, inline_css)
+
+        key = None
+        if cache is not None:
+            key = cache_key(cache, from_path, template, base_path, minify, transforms)
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                page = cached.decode("utf-8")
+                with _stage(profiler, "write"):
+                    write_page(dest_path, page, writer)
+                return page
+
+        if use_mmap:
+            page = render_mapped_page(from_path, template, base_path, minify, profiler, transforms)
+        else:
+            with open(from_path, "r", encoding="utf-8") as f:
+                markdown = f.read()
+            page = render_page(markdown, template, base_path, minify, profiler, fast, transforms)
+
+        if key is not None:
+            cache.put(key, page.encode("utf-8"))
+        with _stage(profiler, "write"):
+            write_page(dest_path, page, writer)
+        return page
+
+
+def cache_key(cache, from_path, template, base_path="/", minify=False, transforms=None):
+    """
+    Return the render cache key for the page at from_path with a compiled template.
+
+    Returns:
+        str: The key, or None when the transforms rule out caching (see
+        TransformPipeline.cache_key).
+    """
+    if transforms is not None:
+        transform_keys = transforms.cache_key()
+        if transform_keys is None:
+            return None
+    with open(from_path, "rb") as f:
         markdown = f.read()
+    options = (minify, image_probe.fingerprint(image_probe.referenced_images(markdown)))
+    if transforms is not None:
+        options += transform_keys
+    return cache.key(markdown, template.fingerprint, base_path, options)
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        template = f.read()
 
-    html = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
+def write_page(dest_path: str, page: str, writer=None):
+    """
+    Write a rendered page to disk, creating parent directories as needed.
+
+    With a writer, dest_path is relative to the writer's output root.
+    """
+    if writer is None:
+        writer = DirectoryWriter("")
+    writer.write(dest_path, page)
+
+
+def find_pages(dir_path_content, dest_dir_path):
+    """
+    Find all markdown pages below the content directory.
+
+    Files and directories matching the content ignore patterns are skipped
+    (see content_index.load_ignore).
+
+    Args:
+        dir_path_content (str): The content root directory.
+        dest_dir_path (str): The output root directory.
+
+    Returns:
+        List[Tuple[str, str]]: List of (from_path, dest_path) tuples
+    """
+    pages = []
+    # Sorted walk order, so builds and archives list pages deterministically
+    for relative_path in scan_content(dir_path_content, ".md"):
+        parts = relative_path.split("/")
+        from_path = os.path.join(dir_path_content, *parts)
+
+        # Change .md to .html below the output root
+        dest_path = os.path.join(dest_dir_path, *parts[:-1], os.path.splitext(parts[-1])[0] + ".html")
+
+        pages.append((from_path, dest_path))
+    return pages
 
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", html)
 
-    # Fix href/src paths for GitHub Pages subdirectory deployment
-    page = page.replace('href="/', f'href="{base_path}').replace('src="/', f'src="{base_path}')
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, base_path="/", minify=False,
+                             use_mmap=False, pages=None, cache=None, writer=None, profiler=None, fast=False,
+                             transforms=None, inline_css=None, feed=None, errors=None):
+    """
+    Generate every page below dir_path_content, or only the given subset.
+
+    Pages in a top-level section use layouts/<section>.html next to
+    template_path when it exists (see template_engine.select_layout).
+
+    Args:
+        pages (List[Tuple[str, str]]): Optional (from_path, dest_path) pairs as
+            returned by find_pages, e.g. one shard of the site.
+        cache (RenderCache): Optional cache of rendered pages.
+        writer: Output writer for paths relative to dest_dir_path; defaults
+            to a DirectoryWriter on dest_dir_path for the duration of the call.
+        profiler (BuildProfiler): Optional per-page time and memory profiler.
+        fast (bool): Skip the node tree (see render_page); ignored with use_mmap.
+        transforms (TransformPipeline): Optional transforms applied to every
+            rendered page's tree. Pages served from the cache are not
+            visited, so the cache is only used when every transform has a
+            cache key, which then becomes part of the page's key. Collecting
+            transforms have none, so they always see every page.
+        inline_css (Tuple[str, int]): Optional (static_dir, max_bytes) for
+            inlining small stylesheets into the templates (see load_template).
+        feed (FeedBuilder): Optional feed offered every page as it is rendered.
+        errors (ErrorReport): When given, a page that fails is recorded there
+            and skipped instead of aborting the build.
 
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(page)
+    Returns:
+        dict: Manifest entries keyed by source path relative to the content root.
+    """
+    if pages is None:
+        pages = find_pages(dir_path_content, dest_dir_path)
 
+    own_writer = writer is None
+    if own_writer:
+        writer = DirectoryWriter(dest_dir_path)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, base_path="/"):
-    for root, dirs, files in os.walk(dir_path_content):
-        for file in files:
-            if file.endswith(".md"):
-                from_path = os.path.join(root, file)
-                
-                # Compute relative path from content/ root
-                relative_path = os.path.relpath(from_path, dir_path_content)
-                
-                # Change .md to .html
-                dest_relative_path = os.path.splitext(relative_path)[0] + ".html"
-                
-                # Final destination path inside public/
-                dest_path = os.path.join(dest_dir_path, dest_relative_path)
+    entries = {}
+    try:
+        for from_path, dest_path in pages:
+            dest_relative_path = os.path.relpath(dest_path, dest_dir_path)
+            relative_path = os.path.relpath(from_path, dir_path_content).replace(os.sep, "/")
 
-                # Ensure destination directory exists
-                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            # Generate the page; the writer creates each output directory once
+            try:
+                page = generate_page(from_path, select_layout(template_path, relative_path), dest_relative_path,
+                                     base_path, minify, use_mmap, cache, writer, profiler, fast, transforms,
+                                     inline_css)
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors.add(relative_path, from_path, e)
+                continue
 
-                # Generate the page
-                generate_page(from_path, template_path, dest_path, base_path)
\ No newline at end of file
+            entries[relative_path] = page_entry(from_path, dest_relative_path.replace(os.sep, "/"), page)
+            if feed is not None:
+                feed.add(relative_path, entries[relative_path]["source_mtime_ns"], page)
+    finally:
+        if own_writer:
+            writer.close()
+    return entries
\ No newline at end of file
@@ -0,0 +1,261 @@
+import collections
+import concurrent.futures
+import json
+import os
+import time
+import image_probe
+from manifest import page_entry
+from output_writers import DirectoryWriter
+from page_generator import cache_key, find_pages, render_mapped_page, render_page, write_page
+from template_engine import load_template, select_layout
+
+# Rough peak memory of a page's node tree and output per byte of markdown
+MEMORY_PER_SOURCE_BYTE = 40
+# Render cost assumed per source byte until earlier builds have been timed
+DEFAULT_SECONDS_PER_BYTE = 1e-6
+# Work is cut into about this many batches per worker, so the last batches
+# to finish are small whichever worker takes them
+BATCHES_PER_JOB = 8
+MAX_BATCH_PAGES = 64
+
+
+class RenderTimes:
+    """
+    How long each page took to render in earlier builds.
+
+    Entries are [source size, seconds] keyed by relative source path. When a
+    path is given they are loaded from and saved to a JSON file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.pages = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.pages = json.load(f)
+            except (OSError, ValueError):
+                self.pages = {}
+
+    def record(self, relative_path, size, seconds):
+        self.pages[relative_path] = [size, seconds]
+        self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.pages, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def estimate_costs(sizes, times=None):
+    """
+    Estimate how long each page will take to render.
+
+    A page timed in an earlier build costs its measured time, scaled by how
+    much its source grew or shrank since. Other pages cost their source size
+    times the average seconds per byte of the timed pages.
+
+    Args:
+        sizes (Dict[str, int]): Source size keyed by relative source path.
+        times (RenderTimes): Timings from earlier builds, if any.
+
+    Returns:
+        Dict[str, float]: Estimated seconds keyed by relative source path.
+    """
+    history = times.pages if times is not None else {}
+    timed_bytes = sum(size for size, _ in history.values())
+    timed_seconds = sum(seconds for _, seconds in history.values())
+    rate = timed_seconds / timed_bytes if timed_bytes and timed_seconds else DEFAULT_SECONDS_PER_BYTE
+
+    costs = {}
+    for relative_path, size in sizes.items():
+        entry = history.get(relative_path)
+        if entry is not None and entry[0]:
+            costs[relative_path] = entry[1] * size / entry[0]
+        else:
+            costs[relative_path] = size * rate
+    return costs
+
+
+def plan_batches(costs, jobs, max_batch_pages=MAX_BATCH_PAGES):
+    """
+    Group pages into batches and order them most expensive first.
+
+    A page costing at least 1/(jobs * BATCHES_PER_JOB) of the total is a
+    batch of its own; cheaper pages are packed together up to that cost,
+    or max_batch_pages pages, so each dispatch carries a useful amount of
+    work. Starting with the largest batches keeps one giant page from
+    being left for last while the other workers sit idle.
+
+    Returns:
+        List[List[str]]: Batches of relative source paths.
+    """
+    total = sum(costs.values())
+    target = total / (jobs * BATCHES_PER_JOB) if total else float("inf")
+    batches = []
+    current = []
+    current_cost = 0.0
+    for relative_path in sorted(costs, key=lambda path: (-costs[path], path)):
+        cost = costs[relative_path]
+        if cost >= target:
+            batches.append([relative_path])
+            continue
+        current.append(relative_path)
+        current_cost += cost
+        if current_cost >= target or len(current) >= max_batch_pages:
+            batches.append(current)
+            current = []
+            current_cost = 0.0
+    if current:
+        batches.append(current)
+    # Stable, so batches of equal cost keep their deterministic order
+    batches.sort(key=lambda batch: -sum(costs[path] for path in batch))
+    return batches
+
+
+_worker_options = None
+
+
+def _init_worker(options, image_dir):
+    global _worker_options
+    _worker_options = options
+    if image_dir is not None:
+        image_probe.enable(image_dir)
+
+
+def _render_batch(batch):
+    template_path, base_path, minify, use_mmap, fast, inline_css = _worker_options
+    results = []
+    for relative_path, from_path in batch:
+        start = time.perf_counter()
+        try:
+            template = load_template(select_layout(template_path, relative_path), base_path, minify, inline_css)
+            if use_mmap:
+                page = render_mapped_page(from_path, template, base_path, minify)
+            else:
+                with open(from_path, "r", encoding="utf-8") as f:
+                    page = render_page(f.read(), template, base_path, minify, fast=fast)
+            results.append((relative_path, page, None, time.perf_counter() - start))
+        except Exception as e:
+            results.append((relative_path, None, e, time.perf_counter() - start))
+    return results
+
+
+def generate_pages_parallel(dir_path_content, template_path, dest_dir_path, base_path="/", minify=False,
+                            use_mmap=False, pages=None, cache=None, writer=None, fast=False, inline_css=None,
+                            feed=None, errors=None, jobs=None, times=None, memory_budget=None, ordered=False):
+    """
+    Generate pages like generate_pages_recursive, rendering them in worker processes.
+
+    Pages are served from the render cache in this process; the rest are
+    scheduled by estimated cost (see estimate_costs and plan_batches). Pages
+    are written here as their batches complete.
+
+    Args:
+        jobs (int): Number of worker processes; os.cpu_count() if None.
+        times (RenderTimes): Earlier timings for cost estimates; updated with
+            this build's timings.
+        memory_budget (int): Bytes of estimated page memory allowed in flight
+            at once; a batch that does not fit waits for others to finish,
+            though one batch is always allowed to run.
+        ordered (bool): Write pages in the order of pages rather than as they
+            complete, e.g. for reproducible archives.
+
+    Returns:
+        dict: Manifest entries keyed by source path relative to the content root.
+    """
+    if pages is None:
+        pages = find_pages(dir_path_content, dest_dir_path)
+    jobs = jobs or os.cpu_count() or 1
+
+    own_writer = writer is None
+    if own_writer:
+        writer = DirectoryWriter(dest_dir_path)
+
+    by_relative_path = {}
+    for from_path, dest_path in pages:
+        relative_path = os.path.relpath(from_path, dir_path_content).replace(os.sep, "/")
+        by_relative_path[relative_path] = (from_path, os.path.relpath(dest_path, dest_dir_path))
+    written = {}
+    pending_order = collections.deque(by_relative_path)
+    entries = {}
+
+    def finish(relative_path, page):
+        # page is None for a page that failed
+        if not ordered:
+            if page is not None:
+                write(relative_path, page)
+            return
+        written[relative_path] = page
+        while pending_order and pending_order[0] in written:
+            path = pending_order.popleft()
+            page = written.pop(path)
+            if page is not None:
+                write(path, page)
+
+    def write(relative_path, page):
+        from_path, dest_relative_path = by_relative_path[relative_path]
+        print(f"Generating page from {from_path} to {dest_relative_path}")
+        write_page(dest_relative_path, page, writer)
+        entries[relative_path] = page_entry(from_path, dest_relative_path.replace(os.sep, "/"), page)
+        if feed is not None:
+            feed.add(relative_path, entries[relative_path]["source_mtime_ns"], page)
+
+    try:
+        keys = {}
+        sizes = {}
+        for relative_path, (from_path, _) in by_relative_path.items():
+            if cache is not None:
+                template = load_template(select_layout(template_path, relative_path), base_path, minify, inline_css)
+                keys[relative_path] = cache_key(cache, from_path, template, base_path, minify)
+                cached = cache.get(keys[relative_path])
+                if cached is not None:
+                    finish(relative_path, cached.decode("utf-8"))
+                    continue
+            sizes[relative_path] = os.path.getsize(from_path)
+
+        batches = plan_batches(estimate_costs(sizes, times), jobs)
+        options = (template_path, base_path, minify, use_mmap, fast, inline_css)
+        with concurrent.futures.ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                                    initargs=(options, image_probe.static_dir())) as executor:
+            in_flight = {}
+
+            def collect(done):
+                for future in done:
+                    in_flight.pop(future)
+                    for relative_path, page, error, seconds in future.result():
+                        if error is not None:
+                            if errors is None:
+                                executor.shutdown(wait=False, cancel_futures=True)
+                                raise error
+                            errors.add(relative_path, by_relative_path[relative_path][0], error)
+                            finish(relative_path, None)
+                            continue
+                        if times is not None:
+                            times.record(relative_path, sizes[relative_path], seconds)
+                        if cache is not None:
+                            cache.put(keys[relative_path], page.encode("utf-8"))
+                        finish(relative_path, page)
+
+            for batch in batches:
+                memory = max(sizes[path] for path in batch) * MEMORY_PER_SOURCE_BYTE
+                # Keep the queue short so dispatch follows the cost order and the budget
+                while in_flight and (len(in_flight) >= jobs * 2 or (
+                        memory_budget is not None and sum(in_flight.values()) + memory > memory_budget)):
+                    done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    collect(done)
+                work = [(path, by_relative_path[path][0]) for path in batch]
+                in_flight[executor.submit(_render_batch, work)] = memory
+            while in_flight:
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+    finally:
+        if own_writer:
+            writer.close()
+    return entries
@@ -0,0 +1,196 @@
+import functools
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+
+_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@functools.lru_cache(maxsize=None)
+def generator_version():
+    """
+    Fingerprint of the generator's own source code.
+
+    Any change to a module that can affect output invalidates every cache
+    entry, so nobody has to remember to bump a version number.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(_SOURCE_DIR)):
+        if name.endswith(".py") and not name.startswith("test_"):
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(_SOURCE_DIR, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    A content-addressed directory of rendered pages.
+
+    Entries are keyed by a hash of everything that determines the output
+    (source bytes, template, base path, options and generator version) and
+    stored under objects/<2 hex>/<key>. Each entry starts with the SHA-256 of
+    its payload, which is verified on every read; corrupt entries are deleted
+    and treated as misses. Writes go to a unique temporary file followed by an
+    atomic rename, so several builds can share one directory safely.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def key(self, source, template, base_path="/", options=()):
+        """
+        Return the cache key for a page.
+
+        Args:
+            source (bytes): The markdown source, or any buffer such as an mmap.
+            template (str): The template text.
+            base_path (str): The base path used for href/src rewriting.
+            options (Iterable): Any other settings that change the output.
+        """
+        digest = hashlib.sha256()
+        for part in (generator_version(), template, base_path, repr(tuple(options))):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, "objects", key[:2], key)
+
+    def get(self, key):
+        """
+        Return the cached bytes for key, or None on a miss.
+        """
+        path = self._path(key)
+        data = _read_verified(path)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            # Refresh the mtime so eviction removes least recently used entries
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """
+        Store data under key.
+        """
+        _write_entry(self._path(key), data)
+
+    def size(self):
+        """
+        Return the total size in bytes of all cache entries.
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        objects = os.path.join(self.root, "objects")
+        for prefix in os.scandir(objects):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, st.st_mtime_ns, st.st_size
+
+    def prune(self, max_bytes=None):
+        """
+        Delete least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return 0
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for path, _, size in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+def _read_verified(path):
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    checksum, sep, data = raw.partition(b"\n")
+    if sep and hashlib.sha256(data).hexdigest().encode("ascii") == checksum:
+        return data
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return None
+
+
+def _write_entry(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(hashlib.sha256(data).hexdigest().encode("ascii") + b"\n" + data)
+    os.replace(tmp_path, path)
+
+
+def sync_cache(src_root, dst_root):
+    """
+    Copy verified entries present in src_root but missing from dst_root.
+
+    Used both to restore a runner's cache from a shared store and to save it
+    back; a plain directory stands in for the remote store.
+
+    Returns:
+        int: The number of entries copied.
+    """
+    src_objects = os.path.join(src_root, "objects")
+    if not os.path.isdir(src_objects):
+        return 0
+    copied = 0
+    for prefix in os.scandir(src_objects):
+        if not prefix.is_dir():
+            continue
+        for entry in os.scandir(prefix.path):
+            if entry.name.endswith(".tmp"):
+                continue
+            dst_path = os.path.join(dst_root, "objects", prefix.name, entry.name)
+            if os.path.exists(dst_path):
+                continue
+            data = _read_verified(entry.path)
+            if data is None:
+                continue
+            _write_entry(dst_path, data)
+            copied += 1
+    # The highlight and image size caches travel with the render cache
+    for name in ("highlight.json", "images.json"):
+        src = os.path.join(src_root, name)
+        dst = os.path.join(dst_root, name)
+        if os.path.exists(src) and (not os.path.exists(dst) or os.path.getmtime(src) > os.path.getmtime(dst)):
+            os.makedirs(dst_root, exist_ok=True)
+            shutil.copy2(src, dst)
+    return copied
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import shutil
+from manifest import MANIFEST_NAME, load_manifest, new_manifest, write_manifest
+
+
+def parse_shard(spec):
+    """
+    Parse a shard specification such as "2/4" into (index, count).
+
+    Shards are numbered from 1.
+
+    Raises:
+        ValueError: If the specification is malformed or out of range.
+    """
+    index, sep, count = spec.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"Invalid shard '{spec}': expected i/N, e.g. 1/4")
+    index, count = int(index), int(count)
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}': index must be between 1 and {count}")
+    return index, count
+
+
+def _stable_hash(relative_path):
+    return hashlib.sha1(relative_path.encode("utf-8")).hexdigest()
+
+
+def assign_shards(sizes, count):
+    """
+    Deterministically partition pages into count shards of similar total size.
+
+    Pages are placed largest first onto the currently lightest shard. Equal
+    sizes are ordered by a hash of the relative path, so every machine that
+    sees the same files computes the same assignment regardless of the order
+    the filesystem lists them in.
+
+    Args:
+        sizes (Dict[str, int]): Source size keyed by relative source path.
+        count (int): Number of shards.
+
+    Returns:
+        Dict[str, int]: Shard index (from 1) keyed by relative source path.
+    """
+    loads = [0] * count
+    assignment = {}
+    for relative_path in sorted(sizes, key=lambda path: (-sizes[path], _stable_hash(path), path)):
+        shard = min(range(count), key=lambda i: (loads[i], i))
+        loads[shard] += sizes[relative_path]
+        assignment[relative_path] = shard + 1
+    return assignment
+
+
+def select_shard(pages, dir_path_content, index, count):
+    """
+    Return the subset of find_pages() output that belongs to shard index.
+
+    Returns:
+        Tuple[List[Tuple[str, str]], List[str]]: The shard's (from_path, dest_path)
+        pairs and the sorted relative paths of every page in the site.
+    """
+    by_relative_path = {}
+    for from_path, dest_path in pages:
+        relative_path = os.path.relpath(from_path, dir_path_content).replace(os.sep, "/")
+        by_relative_path[relative_path] = (from_path, dest_path, os.path.getsize(from_path))
+
+    assignment = assign_shards({path: page[2] for path, page in by_relative_path.items()}, count)
+    selected = [
+        by_relative_path[path][:2] for path in sorted(by_relative_path) if assignment[path] == index
+    ]
+    return selected, sorted(by_relative_path)
+
+
+def shard_info(index, count, all_pages):
+    """
+    Return the shard section of a manifest.
+    """
+    return {"index": index, "count": count, "all_pages": all_pages}
+
+
+def merge_shards(shard_dirs, dest_dir, base_path="/", manifest_path=None):
+    """
+    Combine shard output directories into dest_dir and verify the result.
+
+    Every shard of the same partition must be present exactly once, the
+    shards must agree on the full page list and the minify setting and have
+    been rendered with base_path, every page must have been
+    rendered by exactly one shard and each file may come from only one
+    shard directory. Pages that failed in a shard built with keep-going
+    count as accounted for and are carried into the merged manifest's
+    "errors". The merged manifest is written to manifest_path, if given,
+    and never into dest_dir.
+
+    Every shard is checked before dest_dir is touched, and the site is
+    assembled in a temporary sibling directory that then replaces dest_dir,
+    so a failed merge leaves the previous dest_dir as it was.
+
+    Returns:
+        dict: The merged manifest.
+
+    Raises:
+        ValueError: If any shard is missing, duplicated or inconsistent.
+    """
+    manifests = []
+    for shard_dir in shard_dirs:
+        manifest = load_manifest(shard_dir)
+        if manifest is None or not manifest.get("shard"):
+            raise ValueError(f"No shard manifest found in {shard_dir}")
+        manifests.append((shard_dir, manifest))
+
+    first = manifests[0][1]
+    count = first["shard"]["count"]
+    all_pages = first["shard"]["all_pages"]
+    seen_shards = {}
+    for shard_dir, manifest in manifests:
+        shard = manifest["shard"]
+        if shard["count"] != count or shard["all_pages"] != all_pages:
+            raise ValueError(f"Shard in {shard_dir} belongs to a different partition")
+        if manifest["base_path"] != base_path:
+            raise ValueError(f"Shard in {shard_dir} was built with base path {manifest['base_path']}, not {base_path}")
+        if manifest.get("minify", False) != first.get("minify", False):
+            raise ValueError(f"Shard in {shard_dir} was built with a different minify setting")
+        if shard["index"] in seen_shards:
+            raise ValueError(
+                f"Shard {shard['index']}/{count} appears twice: {seen_shards[shard['index']]} and {shard_dir}"
+            )
+        seen_shards[shard["index"]] = shard_dir
+    missing_shards = sorted(set(range(1, count + 1)) - set(seen_shards))
+    if missing_shards:
+        raise ValueError(f"Missing shards: {', '.join(f'{i}/{count}' for i in missing_shards)}")
+
+    pages = {}
+    errors = {}
+    for shard_dir, manifest in manifests:
+        for relative_path, entry in manifest["pages"].items():
+            if relative_path in pages:
+                raise ValueError(f"Page {relative_path} was rendered by more than one shard")
+            pages[relative_path] = entry
+        errors.update(manifest.get("errors") or {})
+    missing_pages = sorted(set(all_pages) - set(pages) - set(errors))
+    if missing_pages:
+        raise ValueError(f"Pages missing from every shard: {', '.join(missing_pages)}")
+    unexpected = sorted(set(pages) - set(all_pages))
+    if unexpected:
+        raise ValueError(f"Pages not in the partition: {', '.join(unexpected)}")
+
+    origins = {}
+    for shard_dir, manifest in manifests:
+        for root, dirs, files in os.walk(shard_dir):
+            for file in files:
+                relative_path = os.path.relpath(os.path.join(root, file), shard_dir)
+                if relative_path == MANIFEST_NAME:
+                    continue
+                if relative_path in origins:
+                    raise ValueError(f"{relative_path} exists in both {origins[relative_path]} and {shard_dir}")
+                origins[relative_path] = shard_dir
+        for relative_path, entry in manifest["pages"].items():
+            try:
+                with open(os.path.join(shard_dir, entry["output"]), "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            except FileNotFoundError:
+                raise ValueError(f"Output for {relative_path} is missing from {shard_dir}") from None
+            if digest != entry["sha256"]:
+                raise ValueError(f"Output for {relative_path} does not match its manifest checksum")
+
+    tmp_dir = f"{os.path.normpath(dest_dir)}.{os.getpid()}.tmp"
+    old_dir = f"{os.path.normpath(dest_dir)}.{os.getpid()}.old"
+    try:
+        for relative_path, shard_dir in origins.items():
+            dest = os.path.join(tmp_dir, relative_path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copy2(os.path.join(shard_dir, relative_path), dest)
+        os.makedirs(tmp_dir, exist_ok=True)
+        if os.path.exists(dest_dir):
+            os.rename(dest_dir, old_dir)
+        os.rename(tmp_dir, dest_dir)
+    finally:
+        for leftover in (tmp_dir, old_dir):
+            if os.path.exists(leftover):
+                shutil.rmtree(leftover)
+
+    # Static files are copied by the first shard only
+    static = {}
+    for _, manifest in manifests:
+        static.update(manifest.get("static") or {})
+    merged = new_manifest(pages, base_path, None, static, first.get("templates"), first.get("minify", False),
+                          errors)
+    if manifest_path is not None:
+        write_manifest(manifest_path, merged)
+    return merged
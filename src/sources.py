@@ -0,0 +1,114 @@
+import itertools
+import os
+from build_plan import scan_tree
+from content_index import scan_content
+
+# Memory sources draw versions from one counter, so a version is never reused
+_versions = itertools.count(1)
+
+
+class Source:
+    """
+    A tree of input files addressed by posix paths relative to its root.
+
+    Every file has a version that changes whenever the file does, which is
+    what builds compare to decide whether a page or template is stale.
+    """
+
+    def files(self):
+        """
+        Return the version of every file, keyed by relative path in a
+        deterministic order.
+        """
+        raise NotImplementedError("Child classes must implement this method")
+
+    def version(self, relative_path):
+        """
+        Return the file's current version, or None if it does not exist.
+        """
+        raise NotImplementedError("Child classes must implement this method")
+
+    def read_bytes(self, relative_path):
+        raise NotImplementedError("Child classes must implement this method")
+
+    def read_text(self, relative_path):
+        return self.read_bytes(relative_path).decode("utf-8")
+
+    def exists(self, relative_path):
+        return self.version(relative_path) is not None
+
+    def copy_to(self, writer, relative_path):
+        """
+        Write the file through an output writer under the same relative path.
+        """
+        writer.write(relative_path, self.read_bytes(relative_path))
+
+
+class DirectorySource(Source):
+    """
+    Files below a directory on disk, versioned by (size, mtime_ns).
+
+    Listing honours the content ignore patterns (see content_index) unless
+    ignore is False. Static files are published whatever their names, e.g.
+    .nojekyll, so static sources list every file.
+    """
+
+    def __init__(self, root, ignore=True):
+        self.root = root
+        self.ignore = ignore
+
+    def path(self, relative_path):
+        return os.path.join(self.root, *relative_path.split("/"))
+
+    def files(self):
+        if self.ignore:
+            return scan_content(self.root, None)
+        return dict(sorted(scan_tree(self.root).items()))
+
+    def version(self, relative_path):
+        try:
+            st = os.stat(self.path(relative_path))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def read_bytes(self, relative_path):
+        with open(self.path(relative_path), "rb") as f:
+            return f.read()
+
+    def copy_to(self, writer, relative_path):
+        writer.copy_file(self.path(relative_path), relative_path)
+
+
+class MemorySource(Source):
+    """
+    Files held in a dict of relative path to str or bytes.
+
+    Change files through write() and remove() so their versions are bumped.
+    """
+
+    def __init__(self, files=None):
+        self._files = {}
+        for relative_path, data in (files or {}).items():
+            self.write(relative_path, data)
+
+    def write(self, relative_path, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._files[relative_path] = (next(_versions), data)
+
+    def remove(self, relative_path):
+        del self._files[relative_path]
+
+    def files(self):
+        return {path: self._files[path][0] for path in sorted(self._files)}
+
+    def version(self, relative_path):
+        entry = self._files.get(relative_path)
+        return None if entry is None else entry[0]
+
+    def read_bytes(self, relative_path):
+        try:
+            return self._files[relative_path][1]
+        except KeyError:
+            raise FileNotFoundError(relative_path) from None
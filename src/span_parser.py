@@ -0,0 +1,301 @@
+import mmap
+import os
+import re
+from headings import HeadingIndex
+from html_node import HTMLNode, LeafNode, ParentNode
+from image_probe import image_props
+from markdown_processor import markdown_to_html_node
+from node_parser import code_to_html_node, quote_to_html_node
+
+# Byte-level counterparts of the patterns used by the string parser
+_BLOCK_SEPARATOR = re.compile(rb"\n\s*\n")
+_HEADING = re.compile(rb"#{1,6} ")
+_ORDERED_ITEM = re.compile(rb"(\d+)\.\s+")
+_ORDERED_PREFIX = re.compile(rb"\d+\. ")
+_IMAGE = re.compile(rb"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK = re.compile(rb"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+# Only lines that start with a non-blank character rule out dedenting
+_UNINDENTED_LINE = re.compile(rb"(?m)^[^ \t\n]")
+# Line breaks other than \n that str.splitlines() honours: \r, \v, \f,
+# \x1c-\x1e and, UTF-8 encoded, \x85, \u2028 and \u2029
+_OTHER_LINE_BREAK = re.compile(rb"[\r\x0b\x0c\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+
+_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+_DELIMITERS = ((b"**", "b"), (b"_", "i"), (b"`", "code"))
+
+
+class SpanLeafNode(LeafNode):
+    """
+    A LeafNode whose value is a (start, end) span of a shared buffer.
+
+    The text is only decoded when the value is read, normally while the page
+    is being serialized. Paragraph spans still contain their line breaks, so
+    join_lines turns them into spaces as paragraph_to_html_node does.
+    Assigning a value, e.g. from a node transform, replaces the span's text.
+    """
+
+    def __init__(self, tag, buffer, start, end, join_lines=False, props=None):
+        HTMLNode.__init__(self, tag, None, None, props)
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.join_lines = join_lines
+
+    @property
+    def value(self):
+        if self._value is not None:
+            return self._value
+        text = self.buffer[self.start:self.end].decode("utf-8")
+        return text.replace("\n", " ") if self.join_lines else text
+
+    @value.setter
+    def value(self, value):
+        # HTMLNode.__init__ assigns None, which leaves the span in use
+        self._value = value
+
+
+class MappedMarkdown:
+    """
+    A markdown file parsed straight out of a memory map.
+
+    Blocks and inline runs are kept as offsets into the mapped file instead of
+    being copied out by read/dedent/strip/split/join, which keeps allocation
+    low on very large pages. The mapping must stay open until the node tree
+    has been serialized, so use it as a context manager:
+
+        with MappedMarkdown(path) as source:
+            html = source.to_html_node().to_html()
+
+    Files with line breaks other than \n, which the string parser's list
+    and title handling split on, or a common indentation (which it removes
+    with textwrap.dedent) are decoded and handed to markdown_to_html_node
+    instead. Only ASCII whitespace is treated as
+    whitespace when blocks and lines are trimmed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buffer = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+    def needs_fallback(self):
+        """
+        Return True if the span parser cannot reproduce the string parser's output.
+        """
+        buf = self.buffer
+        return _OTHER_LINE_BREAK.search(buf) is not None or _UNINDENTED_LINE.search(buf) is None
+
+    def to_html_node(self, headings=None):
+        """
+        Convert the mapped markdown to an HTML node tree.
+
+        Args:
+            headings (HeadingIndex): Collects the page's headings, as with
+                markdown_to_html_node.
+
+        Returns:
+            ParentNode: The same tree markdown_to_html_node would build.
+        """
+        if headings is None:
+            headings = HeadingIndex()
+        if self.needs_fallback():
+            return markdown_to_html_node(self._text(), headings=headings)
+        children = [self._block_to_html_node(start, end, headings) for start, end in self.blocks()]
+        return ParentNode("div", children, props={"class": "markdown-body"})
+
+    def _text(self):
+        # Decode with the same newline translation as a text-mode read
+        return self.buffer[:].decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    def title(self):
+        """
+        Return the H1 title, decoding only the title line.
+
+        Raises:
+            ValueError: If no H1 header is found.
+        """
+        if self.needs_fallback():
+            for line in self._text().splitlines():
+                if line.strip().startswith("# "):
+                    return line.strip()[2:].strip()
+            raise ValueError("No H1 header found in markdown.")
+        buf = self.buffer
+        for start, end in _lines(buf, 0, len(buf)):
+            start, end = _strip(buf, start, end)
+            if buf[start:start + 2] == b"# ":
+                start, end = _strip(buf, start + 2, end)
+                return buf[start:end].decode("utf-8")
+        raise ValueError("No H1 header found in markdown.")
+
+    def blocks(self):
+        """
+        Return the (start, end) span of every non-empty block.
+
+        The spans are collected up front: a suspended regex scan holds an
+        export of the map, and a traceback keeping it alive would make
+        close() fail with BufferError instead of the page's real error.
+        """
+        buf = self.buffer
+        blocks = []
+        pos = 0
+        for match in _BLOCK_SEPARATOR.finditer(buf):
+            start, end = _strip(buf, pos, match.start())
+            if start < end:
+                blocks.append((start, end))
+            pos = match.end()
+        start, end = _strip(buf, pos, len(buf))
+        if start < end:
+            blocks.append((start, end))
+        return blocks
+
+    def _block_to_html_node(self, start, end, headings):
+        buf = self.buffer
+        if _HEADING.match(buf, start, end):
+            return self._heading(start, end, headings)
+
+        if end - start >= 3 and buf[start:start + 3] == b"```" and buf[end - 3:end] == b"```":
+            # Code is copied verbatim anyway, so reuse the string implementation
+            return code_to_html_node(buf[start:end].decode("utf-8"))
+
+        lines = list(_lines(buf, start, end))
+        if all(buf[s:s + 1] == b">" for s, _ in lines):
+            return quote_to_html_node(buf[start:end].decode("utf-8"))
+
+        stripped = [_strip(buf, s, e) for s, e in lines]
+        if all(buf[s:s + 2] == b"- " for s, _ in stripped):
+            items = [ParentNode("li", self._inline(s + 2, e)) for s, e in stripped]
+            return ParentNode("ul", items)
+
+        if all(_ORDERED_PREFIX.match(buf, s, e) for s, e in stripped):
+            numbers = [int(_ORDERED_PREFIX.match(buf, s, e).group()[:-2]) for s, e in stripped]
+            if numbers == list(range(1, len(numbers) + 1)):
+                items = [ParentNode("li", self._inline(_ORDERED_ITEM.match(buf, s, e).end(), e))
+                         for s, e in stripped]
+                return ParentNode("ol", items)
+
+        return ParentNode("p", self._inline(start, end, join_lines=True))
+
+    def _heading(self, start, end, headings):
+        buf = self.buffer
+        level = 0
+        while buf[start + level:start + level + 1] == b"#":
+            level += 1
+        if level + 1 >= end - start:
+            raise ValueError("Invalid heading format")
+        content_start, content_end = _strip(buf, start + level + 1, end)
+        children = self._inline(content_start, content_end)
+        heading_id = headings.add(level, buf[content_start:content_end].decode("utf-8"))
+        return ParentNode(f"h{level}", children, {"id": heading_id})
+
+    def _inline(self, start, end, join_lines=False):
+        """
+        Mirror text_to_text_nodes over a span, returning HTML leaf nodes.
+        """
+        buf = self.buffer
+        # Runs are (tag, start, end); tag "" marks plain text still to be split
+        runs = [("", start, end)]
+        for delimiter, tag in _DELIMITERS:
+            runs = self._split_delimiter(runs, delimiter, tag, join_lines)
+
+        nodes = []
+        for tag, s, e in runs:
+            if tag:
+                nodes.append(SpanLeafNode(tag, buf, s, e, join_lines))
+            else:
+                nodes.extend(self._split_images_and_links(s, e, join_lines))
+        return nodes
+
+    def _split_delimiter(self, runs, delimiter, tag, join_lines):
+        buf = self.buffer
+        width = len(delimiter)
+        new_runs = []
+        for run in runs:
+            run_tag, start, end = run
+            if run_tag:
+                new_runs.append(run)
+                continue
+
+            bounds = [start - width]
+            pos = buf.find(delimiter, start, end)
+            while pos != -1:
+                bounds.append(pos)
+                pos = buf.find(delimiter, pos + width, end)
+            bounds.append(end)
+
+            if len(bounds) == 2:
+                new_runs.append(run)
+                continue
+            if len(bounds) % 2 == 1:
+                text = SpanLeafNode(None, buf, start, end, join_lines).value
+                raise ValueError(f"Invalid delimiter usage in: {text}")
+
+            for i in range(len(bounds) - 1):
+                s, e = bounds[i] + width, bounds[i + 1]
+                if s == e:
+                    continue  # Skip empty parts caused by leading/trailing delimiter
+                new_runs.append((tag if i % 2 == 1 else "", s, e))
+        return new_runs
+
+    def _split_images_and_links(self, start, end, join_lines):
+        buf = self.buffer
+        nodes = []
+        pos = start
+        for match in _IMAGE.finditer(buf, start, end):
+            nodes.extend(self._split_links(pos, match.start(), join_lines))
+            nodes.append(LeafNode("img", "", image_props(
+                _decode(buf, *match.span(2), join_lines),
+                _decode(buf, *match.span(1), join_lines),
+            )))
+            pos = match.end()
+        nodes.extend(self._split_links(pos, end, join_lines))
+        return nodes
+
+    def _split_links(self, start, end, join_lines):
+        buf = self.buffer
+        nodes = []
+        pos = start
+        for match in _LINK.finditer(buf, start, end):
+            if match.start() > pos:
+                nodes.append(SpanLeafNode(None, buf, pos, match.start(), join_lines))
+            text_start, text_end = match.span(1)
+            nodes.append(SpanLeafNode("a", buf, text_start, text_end, join_lines,
+                                      {"href": _decode(buf, *match.span(2), join_lines)}))
+            pos = match.end()
+        if pos < end:
+            nodes.append(SpanLeafNode(None, buf, pos, end, join_lines))
+        return nodes
+
+
+def _decode(buf, start, end, join_lines):
+    text = buf[start:end].decode("utf-8")
+    return text.replace("\n", " ") if join_lines else text
+
+def _strip(buf, start, end):
+    while start < end and buf[start] in _WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+def _lines(buf, start, end):
+    while True:
+        newline = buf.find(b"\n", start, end)
+        if newline == -1:
+            yield start, end
+            return
+        yield start, newline
+        start = newline + 1
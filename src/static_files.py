@@ -0,0 +1,75 @@
+import os
+import shutil
+from css_minifier import read_minified
+from manifest import file_entry
+from output_writers import DirectoryWriter
+
+
+def clean_public(clean_dir="public"):
+    """
+    Clean the public directory by removing it and creating a new one.
+    """
+    if os.path.exists(clean_dir):
+        shutil.rmtree(clean_dir)
+    os.makedirs(clean_dir)
+
+def copy_static(dest_dir="public", static_dir="static", writer=None, minify_css=False):
+    """
+    Copy static files to the public directory, or through writer if given.
+
+    With minify_css, stylesheets are written minified instead of copied.
+
+    Returns:
+        Dict[str, dict]: Manifest file entries keyed by relative path.
+    """
+    if writer is None:
+        writer = DirectoryWriter(dest_dir)
+    entries = {}
+    for src, relative_path in static_files(static_dir):
+        if minify_css and relative_path.endswith(".css"):
+            writer.write(relative_path, read_minified(src))
+        else:
+            writer.copy_file(src, relative_path)
+        entries[relative_path.replace(os.sep, "/")] = file_entry(src)
+    return entries
+
+
+def is_template_file(relative_path):
+    """
+    Return True for template.html and files under layouts/ and partials/.
+
+    These are compiled into pages rather than published.
+    """
+    relative_path = relative_path.replace(os.sep, "/")
+    return relative_path == "template.html" or relative_path.startswith(("layouts/", "partials/"))
+
+
+def static_files(static_dir="static", templates=False):
+    """
+    List the static files to publish, in sorted order.
+
+    Args:
+        templates (bool): List the template files instead of the files to publish.
+
+    Returns:
+        List[Tuple[str, str]]: (source path, path relative to static_dir) pairs
+    """
+    files = []
+    for root, dirs, names in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(names):
+            src = os.path.join(root, name)
+            relative_path = os.path.relpath(src, static_dir)
+            if is_template_file(relative_path) == templates:
+                files.append((src, relative_path))
+    return files
+
+
+def template_entries(static_dir="static"):
+    """
+    Return manifest file entries for every template file, keyed by relative path.
+    """
+    return {
+        relative_path.replace(os.sep, "/"): file_entry(src)
+        for src, relative_path in static_files(static_dir, templates=True)
+    }
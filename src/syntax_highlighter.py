@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import re
+
+# Every pattern below either always succeeds once started (unterminated
+# strings and comments run to the end of the line or input) or is bounded,
+# so tokenizing stays linear in the size of the snippet.
+_STRING = r'"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?'
+
+_PYTHON = re.compile(r"""
+    (?P<comment>\#[^\n]*)
+  | (?P<string>[rbuRBUfF]{0,2}(?:\"\"\"[\s\S]*?(?:\"\"\"|\Z)|'''[\s\S]*?(?:'''|\Z)|""" + _STRING + r"""))
+  | (?P<keyword>\b(?:False|None|True|and|as|assert|async|await|break|class|continue|def|del|elif|else|except|finally|for|from|global|if|import|in|is|lambda|match|case|nonlocal|not|or|pass|raise|return|try|while|with|yield)\b)
+  | (?P<builtin>\b(?:print|len|range|enumerate|zip|map|filter|open|int|str|float|list|dict|set|tuple|bool|isinstance|super|self|sorted|min|max|sum|any|all)\b)
+  | (?P<decorator>@[\w.]+)
+  | (?P<number>\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?)\b)
+""", re.VERBOSE)
+
+_SHELL = re.compile(r"""
+    (?P<comment>(?:^|(?<=\s))\#[^\n]*)
+  | (?P<string>""" + _STRING + r""")
+  | (?P<variable>\$\{[^}\n]*\}?|\$\w+|\$[@#?$!*-])
+  | (?P<keyword>\b(?:if|then|else|elif|fi|for|while|until|do|done|case|esac|function|in|return|export|local|set)\b)
+  | (?P<builtin>\b(?:echo|cd|source|exit|test|read|printf|python3?|pip|git|cat|ls|mkdir|rm|cp|mv)\b)
+  | (?P<number>\b\d+\b)
+""", re.VERBOSE | re.MULTILINE)
+
+_JSON = re.compile(r"""
+    (?P<key>"(?:\\.|[^"\\\n])*"(?=[ \t]*:))
+  | (?P<string>"(?:\\.|[^"\\\n])*"?)
+  | (?P<literal>\b(?:true|false|null)\b)
+  | (?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+""", re.VERBOSE)
+
+_HTML = re.compile(r"""
+    (?P<comment><!--[\s\S]*?(?:-->|\Z))
+  | (?P<tag></?[\w-]+|/?>)
+  | (?P<attr>[\w:-]+(?==))
+  | (?P<string>"[^"\n]*"?|'[^'\n]*'?)
+""", re.VERBOSE)
+
+_CSS = re.compile(r"""
+    (?P<comment>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>""" + _STRING + r""")
+  | (?P<keyword>@[\w-]+|!important)
+  | (?P<property>[\w-]+(?=[ \t]*:[^:]))
+  | (?P<number>\#[\da-fA-F]{3,8}\b|-?(?:\d+\.?\d*|\.\d+)(?:px|em|rem|%|vh|vw|s|ms|deg|fr)?)
+""", re.VERBOSE)
+
+LANGUAGES = {
+    "python": _PYTHON,
+    "py": _PYTHON,
+    "shell": _SHELL,
+    "sh": _SHELL,
+    "bash": _SHELL,
+    "console": _SHELL,
+    "json": _JSON,
+    "html": _HTML,
+    "xml": _HTML,
+    "css": _CSS,
+}
+
+
+def tokenize(code, language):
+    """
+    Split code into (token_class, text) pairs for a supported language.
+
+    Plain text between tokens is returned with a token_class of None, so
+    joining the texts always reproduces the input exactly.
+
+    Args:
+        code (str): The source snippet.
+        language (str): A key of LANGUAGES.
+
+    Returns:
+        List[Tuple[Optional[str], str]]: The token stream.
+    """
+    pattern = LANGUAGES[language]
+    tokens = []
+    pos = 0
+    for match in pattern.finditer(code):
+        start, end = match.span()
+        if start == end:
+            continue
+        if start > pos:
+            tokens.append((None, code[pos:start]))
+        tokens.append((match.lastgroup, code[start:end]))
+        pos = end
+    if pos < len(code):
+        tokens.append((None, code[pos:]))
+    return tokens
+
+
+class HighlightCache:
+    """
+    Tokenized snippets keyed by (language, code hash).
+
+    When a path is given the cache is loaded from and saved to a JSON file,
+    so unchanged snippets are not re-tokenized on the next build. The least
+    recently used entries are dropped once max_entries is exceeded.
+    """
+
+    def __init__(self, path=None, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def tokens(self, code, language):
+        digest = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        key = f"{language}:{digest}"
+        tokens = self.entries.pop(key, None)
+        if tokens is None:
+            tokens = tokenize(code, language)
+            self.dirty = True
+        # Re-insert so dict order tracks recency
+        self.entries[key] = tokens
+        if len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+        return tokens
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+_cache = HighlightCache()
+
+
+def use_cache_file(path):
+    """
+    Switch the highlighter to a cache persisted at path.
+    """
+    global _cache
+    _cache = HighlightCache(path)
+
+
+def save_cache():
+    """
+    Write the highlight cache to disk if it is file backed and has changed.
+    """
+    _cache.save()
+
+
+def highlight(code, language):
+    """
+    Return the cached token stream for code, or None if the language is unsupported.
+    """
+    language = language.lower()
+    if language not in LANGUAGES:
+        return None
+    return _cache.tokens(code, language)
@@ -0,0 +1,282 @@
+import functools
+import hashlib
+import os
+import re
+from css_minifier import inline_stylesheets
+from html_minifier import minify_template
+
+# {{ Name }} variables and {% directive "argument" %} tags
+_TAG = re.compile(r'\{\{\s*(\w+)\s*\}\}|\{%\s*(\w+)(?:\s+"([^"]*)"|\s+(\w+))?\s*%\}')
+_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class CompiledTemplate:
+    """
+    A template flattened into a list of text and variable segments.
+
+    Includes, layout inheritance, minification and base path rewriting are
+    all applied while compiling, so rendering a page only walks the segment
+    list once. Variables missing from the context are left in the output
+    as written, as plain string replacement did.
+
+    Attributes:
+        segments (List[Tuple[bool, str]]): (is_variable, text or name) pairs.
+        dependencies (Dict[str, int]): mtime_ns of every file read, by path.
+        fingerprint (str): Hash of the segments and options, for cache keys.
+    """
+
+    def __init__(self, segments, base_path="/", dependencies=None):
+        self.segments = segments
+        self.base_path = base_path
+        self.dependencies = dependencies or {}
+        digest = hashlib.sha256(repr((segments, base_path)).encode("utf-8"))
+        self.fingerprint = digest.hexdigest()
+
+    def stream(self, context):
+        """
+        Yield the page piece by piece.
+
+        Args:
+            context (Dict[str, str]): Variable values, e.g. Title and Content.
+        """
+        base_path = self.base_path
+        for is_variable, value in self.segments:
+            if not is_variable:
+                yield value
+            elif value in context:
+                yield rewrite_paths(context[value], base_path)
+            else:
+                yield "{{ " + value + " }}"
+
+    def render(self, context):
+        """
+        Return the whole page as one string.
+        """
+        return "".join(self.stream(context))
+
+
+def rewrite_paths(html, base_path="/"):
+    """
+    Prefix root-relative href/src attributes with base_path.
+    """
+    if base_path == "/" or ('href="/' not in html and 'src="/' not in html):
+        return html
+    return html.replace('href="/', f'href="{base_path}').replace('src="/', f'src="{base_path}')
+
+
+def _parse(source, path):
+    """
+    Parse template source into a node list.
+
+    Nodes are ("text", str), ("var", name), ("include", path) or
+    ("block", name, children). Returns (nodes, extends path or None).
+
+    Raises:
+        ValueError: On unknown, malformed or unbalanced tags.
+    """
+    root = []
+    stack = [(None, root)]
+    extends = None
+    pos = 0
+    for match in _TAG.finditer(source):
+        nodes = stack[-1][1]
+        if match.start() > pos:
+            nodes.append(("text", source[pos:match.start()]))
+        pos = match.end()
+        variable, directive, quoted, word = match.groups()
+        if variable:
+            nodes.append(("var", variable))
+        elif directive == "include" and quoted:
+            nodes.append(("include", quoted))
+        elif directive == "extends" and quoted:
+            if extends is not None or len(stack) > 1:
+                raise ValueError(f"{path}: extends must appear once, outside any block")
+            extends = quoted
+        elif directive == "block" and word:
+            block = []
+            nodes.append(("block", word, block))
+            stack.append((word, block))
+        elif directive == "endblock" and not quoted:
+            if len(stack) == 1 or (word and word != stack[-1][0]):
+                raise ValueError(f"{path}: unexpected {match.group()}")
+            stack.pop()
+        else:
+            raise ValueError(f"{path}: invalid template tag {match.group()}")
+    if len(stack) > 1:
+        raise ValueError(f"{path}: block '{stack[-1][0]}' is never closed")
+    if pos < len(source):
+        root.append(("text", source[pos:]))
+    return root, extends
+
+
+def _collect_blocks(nodes, directory, blocks):
+    for node in nodes:
+        if node[0] == "block":
+            blocks.setdefault(node[1], (node[2], directory))
+            _collect_blocks(node[2], directory, blocks)
+
+
+def read_file(path):
+    """
+    Return the text of a template file and its mtime_ns, the default reader.
+    """
+    version = os.stat(path).st_mtime_ns
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read(), version
+
+
+class _Compiler:
+    def __init__(self, read=read_file):
+        self.read = read
+        self.dependencies = {}
+
+    def compile_file(self, path, overrides, stack=()):
+        path = os.path.normpath(path)
+        if path in stack:
+            raise ValueError(f"Template cycle: {' -> '.join(stack + (path,))}")
+        stack = stack + (path,)
+        source, self.dependencies[path] = self.read(path)
+        return self.compile_source(source, os.path.dirname(path), overrides, stack, path)
+
+    def compile_source(self, source, directory, overrides, stack=(), path="<string>"):
+        nodes, extends = _parse(source, path)
+        if extends is None:
+            return self.flatten(nodes, directory, overrides, stack)
+        # Blocks from more derived templates win over this template's own
+        blocks = dict(overrides)
+        _collect_blocks(nodes, directory, blocks)
+        return self.compile_file(os.path.join(directory, extends), blocks, stack)
+
+    def flatten(self, nodes, directory, overrides, stack):
+        segments = []
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                segments.append((False, node[1]))
+            elif kind == "var":
+                segments.append((True, node[1]))
+            elif kind == "include":
+                segments.extend(self.compile_file(os.path.join(directory, node[1]), {}, stack))
+            elif node[1] in overrides:
+                children, child_directory = overrides[node[1]]
+                segments.extend(self.flatten(children, child_directory, overrides, stack))
+            else:
+                segments.extend(self.flatten(node[2], directory, overrides, stack))
+        return segments
+
+
+def _finish(segments, base_path, minify, inline_css=None, dependencies=None):
+    if minify:
+        # Minify the flattened template as one document, then split it again
+        source = "".join(value if not is_variable else "{{ " + value + " }}"
+                         for is_variable, value in segments)
+        source = minify_template(source)
+        segments = []
+        pos = 0
+        for match in _VARIABLE.finditer(source):
+            segments.append((False, source[pos:match.start()]))
+            segments.append((True, match.group(1)))
+            pos = match.end()
+        segments.append((False, source[pos:]))
+
+    merged = []
+    for is_variable, value in segments:
+        if not is_variable:
+            if not value:
+                continue
+            if inline_css is not None:
+                value, stylesheets = inline_stylesheets(value, *inline_css)
+                if dependencies is not None:
+                    # Editing an inlined stylesheet recompiles the template
+                    dependencies.update((path, os.stat(path).st_mtime_ns) for path in stylesheets)
+            value = rewrite_paths(value, base_path)
+            if merged and not merged[-1][0]:
+                merged[-1] = (False, merged[-1][1] + value)
+                continue
+        merged.append((is_variable, value))
+    return merged
+
+
+@functools.lru_cache(maxsize=32)
+def compile_source(source, base_path="/", minify=False, directory=".", inline_css=None):
+    """
+    Compile template text; includes and extends resolve relative to directory.
+
+    Returns:
+        CompiledTemplate: The compiled template.
+    """
+    compiler = _Compiler()
+    segments = compiler.compile_source(source, directory, {})
+    segments = _finish(segments, base_path, minify, inline_css, compiler.dependencies)
+    return CompiledTemplate(segments, base_path, compiler.dependencies)
+
+
+def compile_template(path, read=read_file, base_path="/", minify=False, inline_css=None):
+    """
+    Compile the template at path, reading it and every file it includes or
+    extends through read.
+
+    Args:
+        read (Callable[[str], Tuple[str, object]]): Returns a file's text and
+            a version that changes whenever the file does; mtime_ns by default.
+
+    Returns:
+        CompiledTemplate: The template; its dependencies map each file read
+        to its version.
+    """
+    compiler = _Compiler(read)
+    segments = compiler.compile_file(path, {})
+    segments = _finish(segments, base_path, minify, inline_css, compiler.dependencies)
+    return CompiledTemplate(segments, base_path, compiler.dependencies)
+
+
+_compiled = {}
+
+
+def load_template(path, base_path="/", minify=False, inline_css=None):
+    """
+    Return the compiled template for path, compiling it only when needed.
+
+    Compiled templates are cached by path and options and reused until the
+    mtime of the template or of any file it includes, extends or inlines
+    changes. Include and extends paths are relative to the file that names
+    them.
+
+    Args:
+        inline_css (Tuple[str, int]): Optional (static_dir, max_bytes); small
+            local stylesheets linked from the template are then inlined into
+            it as <style> elements (see css_minifier.inline_stylesheets).
+
+    Raises:
+        ValueError: If the template is malformed or includes itself.
+    """
+    key = (path, base_path, minify, inline_css)
+    template = _compiled.get(key)
+    if template is not None:
+        try:
+            fresh = all(os.stat(dependency).st_mtime_ns == mtime
+                        for dependency, mtime in template.dependencies.items())
+        except FileNotFoundError:
+            fresh = False
+        if fresh:
+            return template
+
+    template = compile_template(path, read_file, base_path, minify, inline_css)
+    _compiled[key] = template
+    return template
+
+
+def select_layout(template_path, relative_path, exists=os.path.exists):
+    """
+    Return the template for a page: the layout of its top-level section if any.
+
+    A page at blog/post/index.md uses layouts/blog.html next to the default
+    template when exists() says that file is there, and the default template
+    otherwise.
+    """
+    section, sep, _ = relative_path.replace(os.sep, "/").partition("/")
+    if sep:
+        layout = os.path.join(os.path.dirname(template_path), "layouts", section + ".html")
+        if exists(layout):
+            return layout
+    return template_path
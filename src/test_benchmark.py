@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from benchmark import (
+    BASELINE_BENCHMARKS,
+    PATHOLOGICAL_INPUTS,
+    check_linear_scaling,
+    compare_to_baseline,
+    escaping_overhead,
+    load_baseline,
+    render,
+    run_benchmarks,
+    save_baseline,
+    synthetic_corpus,
+)
+from node_parser import text_to_text_nodes
+
+# Wall-clock checks are noisy on shared machines, so they only run on request
+RUN_BENCHMARKS = bool(os.environ.get("RUN_BENCHMARKS"))
+
+
+class TestPathologicalInputs(unittest.TestCase):
+    def test_inputs_are_valid_markdown(self):
+        for name, (make_input, n, func) in PATHOLOGICAL_INPUTS.items():
+            with self.subTest(name=name):
+                func(make_input(10))
+
+    def test_many_links_are_all_parsed(self):
+        nodes = text_to_text_nodes(PATHOLOGICAL_INPUTS["many_links"][0](500))
+        self.assertEqual(sum(1 for node in nodes if node.url is not None), 500)
+
+    def test_huge_whitespace_run_splits_blocks(self):
+        html = render("a\n" + " " * 100000 + "\nb")
+        self.assertEqual(html, '<div class="markdown-body"><p>a</p><p>b</p></div>')
+
+    @unittest.skipUnless(RUN_BENCHMARKS, "set RUN_BENCHMARKS=1 to run timing checks")
+    def test_scaling_is_linear(self):
+        ratios = check_linear_scaling()
+        self.assertEqual(set(ratios), set(PATHOLOGICAL_INPUTS))
+
+
+class TestEscapingOverhead(unittest.TestCase):
+    @unittest.skipUnless(RUN_BENCHMARKS, "set RUN_BENCHMARKS=1 to run timing checks")
+    def test_escaping_within_budget(self):
+        # Typically a few percent; the bound leaves room for a noisy machine
+        self.assertLess(escaping_overhead(copies=10, rounds=3), 1.15)
+
+
+class TestBaseline(unittest.TestCase):
+    def baseline(self, **medians):
+        return {
+            "version": 1,
+            "benchmarks": {name: {"median": median, "samples": [median]} for name, median in medians.items()},
+        }
+
+    def run_result(self, **samples):
+        return {
+            "benchmarks": {name: {"median": sorted(s)[len(s) // 2], "samples": s} for name, s in samples.items()},
+        }
+
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(synthetic_corpus(5), synthetic_corpus(5))
+        self.assertIn("<ol>", render(synthetic_corpus(1)[0]))
+
+    def test_run_and_round_trip(self):
+        results = run_benchmarks(repeats=2, corpus=synthetic_corpus(3))
+        self.assertEqual(set(results["benchmarks"]), set(BASELINE_BENCHMARKS))
+        self.assertEqual(len(results["benchmarks"]["markdown_to_blocks"]["samples"]), 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            save_baseline(path, results)
+            self.assertEqual(load_baseline(path), results)
+        self.assertEqual(compare_to_baseline(results, results), {})
+
+    def test_regression_detected(self):
+        regressions = compare_to_baseline(self.run_result(parse=[1.4, 1.5, 1.6]), self.baseline(parse=1.0))
+        self.assertAlmostEqual(regressions["parse"], 1.5)
+
+    def test_noise_is_not_a_regression(self):
+        # Within tolerance
+        self.assertEqual(compare_to_baseline(self.run_result(parse=[1.1, 1.15, 1.2]), self.baseline(parse=1.0)), {})
+        # Slow median, but the fastest run matches the baseline
+        self.assertEqual(compare_to_baseline(self.run_result(parse=[0.9, 1.5, 1.6]), self.baseline(parse=1.0)), {})
+        # New benchmarks have nothing to compare against
+        self.assertEqual(compare_to_baseline(self.run_result(new=[9.0]), self.baseline(parse=1.0)), {})
+
+    def test_unknown_baseline_version(self):
+        with self.assertRaises(ValueError):
+            compare_to_baseline(self.run_result(parse=[1.0]), {"version": 99, "benchmarks": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
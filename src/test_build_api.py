@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from build_api import Builder, Site
+from output_writers import DirectoryWriter, MemoryWriter
+from sources import MemorySource
+
+TEMPLATE = "<title>{{ Title }}</title>{% include \"partials/nav.html\" %}{{ Content }}"
+
+
+class TestBuilder(unittest.TestCase):
+    def setUp(self):
+        self.content = MemorySource({
+            "index.md": "# Home\n\nSee [the post](/blog/post)",
+            "blog/post.md": "# Post\n\nHello",
+            "notes.txt": "not a page",
+        })
+        self.static = MemorySource({
+            "template.html": TEMPLATE,
+            "partials/nav.html": "<nav></nav>",
+            "layouts/blog.html": '{% extends "../template.html" %}',
+            "index.css": "body {}",
+        })
+        self.builder = Builder(Site(self.content, self.static, "/site/"))
+
+    def test_build_into_memory(self):
+        writer = MemoryWriter()
+        result = self.builder.build(writer)
+        self.assertEqual((result["pages"], result["rendered"], result["cached"], result["static"]), (2, 2, 0, 1))
+        self.assertEqual(result["outputs"], ["blog/post.html", "index.html"])
+        self.assertEqual(sorted(writer.files), ["blog/post.html", "index.css", "index.html"])
+        self.assertEqual(
+            writer.files["index.html"].decode("utf-8"),
+            '<title>Home</title><nav></nav><div class="markdown-body"><h1 id="home">Home</h1>'
+            '<p>See <a href="/site/blog/post">the post</a></p></div>',
+        )
+
+    def test_rebuild_reuses_pages_and_templates(self):
+        self.builder.build(MemoryWriter())
+        result = self.builder.build(MemoryWriter())
+        self.assertEqual((result["rendered"], result["cached"]), (0, 2))
+
+        self.content.write("blog/post.md", "# Post\n\nEdited")
+        writer = MemoryWriter()
+        result = self.builder.build(writer)
+        self.assertEqual((result["rendered"], result["cached"]), (1, 1))
+        self.assertIn(b"Edited", writer.files["blog/post.html"])
+
+        # Changing a partial recompiles the templates using it
+        self.static.write("partials/nav.html", "<nav>new</nav>")
+        writer = MemoryWriter()
+        result = self.builder.build(writer)
+        self.assertEqual(result["rendered"], 2)
+        self.assertIn(b"<nav>new</nav>", writer.files["index.html"])
+
+    def test_removed_page(self):
+        self.builder.build(MemoryWriter())
+        self.content.remove("blog/post.md")
+        result = self.builder.build(MemoryWriter())
+        self.assertEqual(result["outputs"], ["index.html"])
+
+    def test_keep_going(self):
+        self.content.write("bad.md", "# Bad\n\nnot **closed")
+        with self.assertRaises(ValueError):
+            self.builder.build(MemoryWriter())
+        result = self.builder.build(MemoryWriter(), keep_going=True)
+        self.assertEqual(result["pages"], 2)
+        self.assertEqual(result["errors"]["bad.md"]["blocks"][0]["line"], 3)
+
+    def test_from_directory(self):
+        with tempfile.TemporaryDirectory() as root:
+            for path, text in (("content/index.md", "# Home"), ("content/.draft.md", "# Draft"),
+                               ("static/template.html", TEMPLATE), ("static/partials/nav.html", "<nav></nav>"),
+                               ("static/.nojekyll", ""), ("static/.well-known/security.txt", "Contact: x")):
+                os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+                with open(os.path.join(root, path), "w") as f:
+                    f.write(text)
+            builder = Builder(Site.from_directory(root, minify=True))
+            result = builder.build(DirectoryWriter(os.path.join(root, "public")))
+            # Ignore patterns apply to content only; hidden static files are published
+            self.assertEqual(result["outputs"], ["index.html"])
+            self.assertEqual(result["static"], 2)
+            self.assertTrue(os.path.exists(os.path.join(root, "public", ".nojekyll")))
+            self.assertTrue(os.path.exists(os.path.join(root, "public", ".well-known", "security.txt")))
+            with open(os.path.join(root, "public", "index.html")) as f:
+                self.assertIn("<nav></nav>", f.read())
+            self.assertEqual(builder.build(MemoryWriter())["cached"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
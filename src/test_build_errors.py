@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from build_errors import ErrorReport, locate_block_errors
+from output_writers import MemoryWriter
+from page_generator import generate_pages_recursive
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestLocateBlockErrors(unittest.TestCase):
+    def test_every_failing_block_with_line(self):
+        markdown = "# Title\n\nfine\n\nthis **is broken\n\n- item\n- _open\n\n    indented `ok`\n"
+        self.assertEqual(locate_block_errors(markdown), [
+            {"line": 5, "type": "paragraph", "error": "ValueError: Invalid delimiter usage in: this **is broken"},
+            {"line": 7, "type": "unordered_list", "error": "ValueError: Invalid delimiter usage in: _open"},
+        ])
+
+    def test_valid_document(self):
+        self.assertEqual(locate_block_errors("# Title\n\nAll **good**"), [])
+
+
+class TestKeepGoing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write("template.html", TEMPLATE)
+        self.write("content/index.md", "# Home\n\nWelcome")
+        self.write("content/blog/bad.md", "# Bad\n\nok\n\nnot **closed")
+        self.write("content/blog/good.md", "# Good\n\nFine")
+        self.write("content/untitled.md", "Just text")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_failures_are_collected_and_others_built(self):
+        writer = MemoryWriter()
+        errors = ErrorReport(self.content)
+        entries = generate_pages_recursive(self.content, self.template, "public", writer=writer, errors=errors)
+        self.assertEqual(sorted(entries), ["blog/good.md", "index.md"])
+        self.assertEqual(sorted(writer.files), ["blog/good.html", "index.html"])
+        self.assertEqual(sorted(errors.errors), ["blog/bad.md", "untitled.md"])
+        self.assertEqual(errors.errors["untitled.md"],
+                         {"error": "ValueError: No H1 header found in markdown.", "blocks": []})
+        self.assertEqual(errors.format().splitlines(), [
+            f"{os.path.join(self.content, 'blog/bad.md')}:5: paragraph: ValueError: Invalid delimiter usage in: not **closed",
+            f"{os.path.join(self.content, 'untitled.md')}: ValueError: No H1 header found in markdown.",
+            "2 pages failed",
+        ])
+
+    def test_without_report_first_error_aborts(self):
+        with self.assertRaises(ValueError):
+            generate_pages_recursive(self.content, self.template, "public", writer=MemoryWriter())
+
+    def test_save(self):
+        errors = ErrorReport(self.content)
+        generate_pages_recursive(self.content, self.template, "public", writer=MemoryWriter(), errors=errors,
+                                 fast=True)
+        path = os.path.join(self.root, "errors.json")
+        errors.save(path)
+        with open(path, encoding="utf-8") as f:
+            self.assertIn('"line": 5', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from build_plan import format_plan, plan_build, scan_tree
+from manifest import new_manifest, write_manifest
+from page_generator import generate_pages_recursive
+from static_files import copy_static, template_entries
+
+
+class TestBuildPlan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.manifest = os.path.join(self.root, "cache", "manifest.json")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("content/index.md", "# Home\n\nHello")
+        self.write("content/blog/post.md", "# Post\n\nText")
+        self.write("content/notes.txt", "not a page")
+        self.write("static/template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        path = os.path.join(self.root, path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def build(self, base_path="/"):
+        template = os.path.join(self.static, "template.html")
+        static = copy_static(self.public, self.static)
+        entries = generate_pages_recursive(self.content, template, self.public, base_path)
+        write_manifest(self.manifest, new_manifest(entries, base_path, None, static, template_entries(self.static)))
+
+    def plan(self, base_path="/", minify=False):
+        return plan_build(self.content, self.static, self.public, base_path, minify, self.manifest)
+
+    def test_scan_tree(self):
+        self.assertEqual(sorted(scan_tree(self.content, ".md")), ["blog/post.md", "index.md"])
+        self.assertEqual(scan_tree(self.static)["index.css"][0], 7)
+        self.assertEqual(scan_tree(os.path.join(self.root, "missing")), {})
+
+    def test_first_build_renders_everything(self):
+        plan = self.plan()
+        self.assertEqual(plan["render"], ["blog/post.md", "index.md"])
+        self.assertEqual(plan["copy"], ["images/a.png", "index.css"])
+        self.assertEqual(plan["delete"], [])
+        self.assertEqual(plan["reason"], "no previous build manifest")
+
+    def test_unchanged_build_has_nothing_to_do(self):
+        self.build()
+        plan = self.plan()
+        self.assertEqual((plan["render"], plan["copy"], plan["delete"]), ([], [], []))
+        self.assertEqual((plan["unchanged_pages"], plan["unchanged_static"]), (2, 2))
+        self.assertIsNone(plan["reason"])
+
+    def test_changes_are_detected(self):
+        self.build()
+        self.write("content/index.md", "# Home\n\nHello again")
+        self.write("content/new.md", "# New")
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.write("static/index.css", "body {}", mtime_ns=1)
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        plan = self.plan()
+        self.assertEqual(plan["render"], ["index.md", "new.md"])
+        self.assertEqual(plan["copy"], ["index.css"])
+        self.assertEqual(plan["delete"], ["blog/post.html", "images/a.png"])
+
+    def test_full_rebuild_reasons(self):
+        self.build()
+        self.assertEqual(self.plan(base_path="/site/")["reason"], "base path changed from /")
+        self.assertEqual(self.plan(minify=True)["reason"], "minify setting changed")
+        self.write("static/template.html", "<title>{{ Title }}</title><main>{{ Content }}</main>")
+        plan = self.plan()
+        self.assertEqual(plan["reason"], "templates changed")
+        self.assertEqual(plan["render"], ["blog/post.md", "index.md"])
+        self.assertEqual(plan["copy"], [])
+
+    def test_format_plan(self):
+        self.build()
+        self.write("content/new.md", "# New")
+        self.assertEqual(
+            format_plan(self.plan()),
+            "Render 1:\n  new.md\nCopy 0:\nDelete 0:\nUnchanged: 2 pages, 2 static files",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from build_profiler import BuildProfiler
+from page_generator import generate_pages_recursive, render_page
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_stages_outside_a_page_are_ignored(self):
+        profiler = BuildProfiler()
+        with profiler.stage("parse"):
+            pass
+        self.assertEqual(profiler.pages, {})
+
+    def test_timing_only(self):
+        profiler = BuildProfiler()
+        with profiler.page("a.md"):
+            render_page("# A\n\ntext", "{{ Title }}{{ Content }}", profiler=profiler)
+        record = profiler.pages["a.md"]
+        self.assertEqual(list(record["stages"]), ["parse", "serialize", "template"])
+        self.assertNotIn("peak_bytes", record)
+        self.assertNotIn("top_allocations", profiler.report())
+
+    def test_memory_per_page_and_stage(self):
+        profiler = BuildProfiler(memory=True, top=3)
+        try:
+            with profiler.page("big.md"):
+                render_page("# Big\n\n" + "word " * 50000, "{{ Content }}", profiler=profiler)
+            with profiler.page("small.md"):
+                render_page("# Small", "{{ Content }}", profiler=profiler)
+        finally:
+            profiler.close()
+        self.assertFalse(tracemalloc.is_tracing())
+
+        big, small = profiler.pages["big.md"], profiler.pages["small.md"]
+        self.assertGreater(big["stages"]["parse"]["peak_bytes"], 250000)
+        self.assertGreaterEqual(big["peak_bytes"], big["stages"]["parse"]["peak_bytes"])
+        self.assertGreater(big["peak_bytes"], small["peak_bytes"])
+        self.assertLessEqual(len(profiler.top_allocations), 3)
+        self.assertEqual(profiler.top_allocations[0]["page"], "big.md")
+        self.assertIn("big.md", profiler.summary().splitlines()[3])
+
+    def test_report_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\nHello")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            profiler = BuildProfiler(memory=True)
+            try:
+                generate_pages_recursive(content, template, os.path.join(tmp, "public"), profiler=profiler)
+            finally:
+                profiler.close()
+            path = os.path.join(tmp, "profile.json")
+            profiler.save(path)
+            with open(path) as f:
+                report = json.load(f)
+        page = report["pages"][os.path.join(content, "index.md")]
+        self.assertEqual(list(page["stages"]), ["parse", "serialize", "template", "write"])
+        self.assertEqual(sorted(report["stages"]), ["parse", "serialize", "template", "write"])
+        self.assertTrue(report["memory"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+import image_probe
+from build_server import BuildServer, request_build, send_request, serve
+from manifest import MANIFEST_NAME, read_manifest
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+class TestBuildServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write("static/template.html", TEMPLATE)
+        self.write("static/index.css", "body {}")
+        self.write("content/index.md", "# Home\n\nHello **world**")
+        self.write("content/blog/post.md", "# Post\n\nA [link](/blog)")
+        self.builder = BuildServer(self.content, os.path.join(self.static, "template.html"), self.static)
+        self.public = os.path.join(self.root, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(os.path.join(self.root, path), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(os.path.join(self.root, path), encoding="utf-8") as f:
+            return f.read()
+
+    def test_second_build_uses_cache(self):
+        first = self.builder.build("/", self.public)
+        self.assertEqual((first["pages"], first["rendered"], first["cached"]), (2, 2, 0))
+        second = self.builder.build("/", self.public)
+        self.assertEqual((second["rendered"], second["cached"]), (0, 2))
+        self.assertEqual(
+            self.read("public/index.html"),
+            "<html><title>Home</title><body><div class=\"markdown-body\"><h1 id=\"home\">Home</h1>"
+            "<p>Hello <b>world</b></p></div></body></html>",
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+
+    def test_manifest_kept_out_of_output(self):
+        self.builder.build("/", self.public)
+        self.assertFalse(os.path.exists(os.path.join(self.public, MANIFEST_NAME)))
+        manifest_path = os.path.join(self.root, "cache", "manifest.json")
+        builder = BuildServer(self.content, os.path.join(self.static, "template.html"), self.static, manifest_path)
+        builder.build("/", self.public)
+        self.assertFalse(os.path.exists(os.path.join(self.public, MANIFEST_NAME)))
+        self.assertEqual(sorted(read_manifest(manifest_path)["pages"]), ["blog/post.md", "index.md"])
+
+    def test_changed_source_is_rerendered(self):
+        self.builder.build("/", self.public)
+        self.write("content/index.md", "# Home\n\nChanged and longer")
+        stats = self.builder.build("/", self.public)
+        self.assertEqual((stats["rendered"], stats["cached"]), (1, 1))
+        self.assertIn("Changed and longer", self.read("public/index.html"))
+
+    def test_image_changes_rerender_only_their_pages(self):
+        os.makedirs(os.path.join(self.static, "images"))
+        image = os.path.join(self.static, "images", "a.png")
+        with open(image, "wb") as f:
+            f.write(png(10, 20))
+        self.write("content/index.md", "# Home\n\n![a](/images/a.png)")
+        image_probe.enable(self.static)
+        self.addCleanup(image_probe.disable)
+        self.builder.build("/", self.public)
+
+        os.utime(image, ns=(1, 1))
+        stats = self.builder.build("/", self.public)
+        self.assertEqual((stats["rendered"], stats["cached"]), (0, 2))
+
+        with open(image, "wb") as f:
+            f.write(png(30, 40))
+        stats = self.builder.build("/", self.public)
+        self.assertEqual((stats["rendered"], stats["cached"]), (1, 1))
+        self.assertIn('width="30" height="40"', self.read("public/index.html"))
+
+    def test_base_path_change_invalidates(self):
+        self.builder.build("/", self.public)
+        stats = self.builder.build("/site/", self.public)
+        self.assertEqual(stats["rendered"], 2)
+        self.assertIn('href="/site/blog"', self.read("public/blog/post.html"))
+
+    def test_new_page_is_indexed(self):
+        self.builder.build("/", self.public)
+        self.write("content/blog/new.md", "# New")
+        stats = self.builder.build("/", self.public)
+        self.assertEqual(stats["pages"], 3)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "new.html")))
+
+    def test_socket_round_trip(self):
+        socket_path = os.path.join(self.root, "build.sock")
+        ready = threading.Event()
+        thread = threading.Thread(target=serve, args=(socket_path, self.builder, ready))
+        thread.start()
+        try:
+            ready.wait(5)
+            result = request_build(socket_path, "/", self.public)
+            self.assertTrue(result["ok"])
+            self.assertEqual(result["pages"], 2)
+            result = request_build(socket_path, "/", self.public)
+            self.assertEqual(result["cached"], 2)
+        finally:
+            send_request(socket_path, {"command": "shutdown"})
+            thread.join(5)
+        self.assertFalse(os.path.exists(socket_path))
+
+    def test_socket_reports_errors(self):
+        self.write("content/bad.md", "no title here")
+        socket_path = os.path.join(self.root, "build.sock")
+        ready = threading.Event()
+        thread = threading.Thread(target=serve, args=(socket_path, self.builder, ready))
+        thread.start()
+        try:
+            ready.wait(5)
+            result = request_build(socket_path, "/", self.public)
+            self.assertFalse(result["ok"])
+            self.assertIn("No H1 header", result["error"])
+        finally:
+            send_request(socket_path, {"command": "shutdown"})
+            thread.join(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
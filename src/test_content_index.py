@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from content_index import TreeIndex, is_ignored, load_ignore, scan_content
+from page_generator import find_pages
+
+
+class TestIgnorePatterns(unittest.TestCase):
+    def test_patterns(self):
+        patterns = (".*", "drafts/", "*.tmp", "blog/2019/*.md")
+        self.assertTrue(is_ignored(".git", True, patterns))
+        self.assertTrue(is_ignored("blog/.post.md.swp", False, patterns))
+        self.assertTrue(is_ignored("blog/drafts", True, patterns))
+        self.assertFalse(is_ignored("blog/drafts", False, patterns))
+        self.assertTrue(is_ignored("a/b/c.tmp", False, patterns))
+        self.assertTrue(is_ignored("blog/2019/old.md", False, patterns))
+        self.assertFalse(is_ignored("2019/old.md", False, patterns))
+        self.assertFalse(is_ignored("blog/post.md", False, patterns))
+
+
+class TestScanContent(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "content")
+        for path in ("index.md", "b/post.md", "b/a.md", "a/z.md", "a/notes.txt", "drafts/wip.md",
+                     ".git/HEAD.md", "b/post.md~", "b/2019/old.md"):
+            self.write(path, "# x")
+        self.write(".siteignore", "# drafts are not published\ndrafts/\n\nb/2019/\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def age_directories(self):
+        for directory, _, _ in os.walk(self.root):
+            os.utime(directory, ns=(10**18, 10**18))
+
+    def test_sorted_and_filtered_with_stat(self):
+        files = scan_content(self.root, ".md", TreeIndex())
+        self.assertEqual(list(files), ["index.md", "a/z.md", "b/a.md", "b/post.md"])
+        self.assertEqual(files["index.md"][0], 3)
+        self.assertEqual(list(scan_content(self.root, None, TreeIndex())),
+                         ["index.md", "a/notes.txt", "a/z.md", "b/a.md", "b/post.md"])
+
+    def test_find_pages_honours_ignore_file(self):
+        pages = find_pages(self.root, "out")
+        self.assertEqual(pages[0], (os.path.join(self.root, "index.md"), os.path.join("out", "index.html")))
+        self.assertEqual([dest for _, dest in pages],
+                         [os.path.join("out", *p) for p in (["index.html"], ["a", "z.html"], ["b", "a.html"],
+                                                            ["b", "post.html"])])
+
+    def test_unchanged_directories_are_not_listed_again(self):
+        self.age_directories()
+        path = os.path.join(self.tmp.name, "cache", "index.json")
+        index = TreeIndex(path)
+        scan_content(self.root, ".md", index)
+        # The root, a and b; ignored directories are never listed
+        self.assertEqual(index.listed, 3)
+        index.save()
+
+        index = TreeIndex(path)
+        files = scan_content(self.root, ".md", index)
+        self.assertEqual(index.listed, 0)
+        self.assertEqual(len(files), 4)
+
+        # A new file changes its directory's mtime, so only that directory is listed
+        self.write("a/new.md", "# new")
+        files = scan_content(self.root, ".md", index)
+        self.assertEqual(index.listed, 1)
+        self.assertIn("a/new.md", files)
+
+    def test_changed_ignore_file_resets_index(self):
+        self.age_directories()
+        index = TreeIndex()
+        scan_content(self.root, ".md", index)
+        self.write(".siteignore", "b/\n")
+        files = scan_content(self.root, ".md", index)
+        self.assertEqual(list(files), ["index.md", "a/z.md", "drafts/wip.md"])
+
+    def test_recently_modified_directories_are_not_cached(self):
+        index = TreeIndex()
+        scan_content(self.root, ".md", index)
+        scan_content(self.root, ".md", index)
+        self.assertEqual(index.listed, 6)
+
+    def test_ignore_defaults(self):
+        self.assertEqual(load_ignore(os.path.join(self.root, "a"))[:3], (".*", "*~", "#*#"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from css_minifier import inline_stylesheets, minify_css
+from output_writers import MemoryWriter
+from static_files import copy_static
+from template_engine import load_template
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_strips_comments_and_whitespace(self):
+        css = "/* layout */\nbody {\n  margin: 0;\n  color: #fff;\n}\n\nh1, h2 > a {\n  font-size: 2em;\n}\n"
+        self.assertEqual(minify_css(css), "body{margin:0;color:#fff}h1,h2>a{font-size:2em}")
+
+    def test_keeps_strings_and_licence_comments(self):
+        css = '/*! MIT */ a::after { content: "a ; }  /* b */"; }'
+        self.assertEqual(minify_css(css), '/*! MIT */ a::after{content:"a ; }  /* b */"}')
+
+    def test_quotes_in_comments_and_comments_in_strings(self):
+        css = "/* don't */ a { content: 'x' } c { color: red } /* end */"
+        self.assertEqual(minify_css(css), "a{content:'x'}c{color:red}")
+        self.assertEqual(minify_css('a { content: "/* not a comment */" }'), 'a{content:"/* not a comment */"}')
+
+    def test_keeps_descendant_pseudo_selector_space(self):
+        self.assertEqual(minify_css("nav :hover { color: red; }"), "nav :hover{color:red}")
+
+
+class TestInlineStylesheets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = self.tmp.name
+        self.write("index.css", "body {\n  margin: 0;\n}\n")
+        self.write("big.css", "p { color: red; }\n" * 100)
+        self.write("bg.css", "body { background: url(bg.png); }")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.static, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_inlines_small_local_stylesheet(self):
+        html, inlined = inline_stylesheets('<head><link href="/index.css" rel="stylesheet" /></head>', self.static, 100)
+        self.assertEqual(html, "<head><style>body{margin:0}</style></head>")
+        self.assertEqual(inlined, [os.path.join(self.static, "index.css")])
+
+    def test_leaves_other_links(self):
+        for link in ('<link href="/big.css" rel="stylesheet">',
+                     '<link href="/bg.css" rel="stylesheet">',
+                     '<link href="/missing.css" rel="stylesheet">',
+                     '<link href="https://example.com/a.css" rel="stylesheet">',
+                     '<link href="/index.css" rel="stylesheet" media="print">',
+                     '<link href="/index.css" rel="icon">'):
+            html, inlined = inline_stylesheets(link, self.static, 100)
+            self.assertEqual(html, link)
+            self.assertEqual(inlined, [])
+
+    def test_template_recompiled_when_stylesheet_changes(self):
+        template_path = os.path.join(self.static, "template.html")
+        self.write("template.html", '<head><link href="/index.css" rel="stylesheet"></head>{{ Content }}')
+        options = (self.static, 100)
+        template = load_template(template_path, "/blog/", True, options)
+        self.assertIn("<style>body{margin:0}</style>", template.render({"Content": ""}))
+        self.assertIs(load_template(template_path, "/blog/", True, options), template)
+
+        self.write("index.css", "body { margin: 1px; }")
+        os.utime(os.path.join(self.static, "index.css"), ns=(1, 1))
+        template = load_template(template_path, "/blog/", True, options)
+        self.assertIn("<style>body{margin:1px}</style>", template.render({"Content": ""}))
+
+    def test_copy_static_minifies_stylesheets(self):
+        writer = MemoryWriter()
+        copy_static(writer=writer, static_dir=self.static, minify_css=True)
+        self.assertEqual(writer.files["index.css"], b"body{margin:0}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import http.client
+import os
+import struct
+import tempfile
+import threading
+import unittest
+import image_probe
+from dev_server import DevServer, make_server
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "content", "blog", "tom"))
+        os.makedirs(os.path.join(self.root, "static", "images"))
+        self.write("static/template.html", TEMPLATE)
+        self.write("static/index.css", "body {}")
+        self.write("content/index.md", "# Home\n\nA [post](/blog/tom/)")
+        self.write("content/blog/tom/index.md", "# Tom\n\nHello")
+        self.write("content/about.md", "# About\n\nUs")
+        self.site = DevServer(os.path.join(self.root, "content"), os.path.join(self.root, "static", "template.html"),
+                              os.path.join(self.root, "static"), "/site/")
+        self.server = make_server(self.site, port=0, verbose=False)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(os.path.join(self.root, path), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def get(self, path, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1])
+        try:
+            connection.request("GET", path, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            connection.close()
+
+    def test_resolve(self):
+        content = os.path.join(self.root, "content")
+        static = os.path.join(self.root, "static")
+        self.assertEqual(self.site.resolve("/site/"), ("page", os.path.join(content, "index.md")))
+        self.assertEqual(self.site.resolve("/site/index.html?x=1"), ("page", os.path.join(content, "index.md")))
+        self.assertEqual(self.site.resolve("/site/blog/tom/"), ("page", os.path.join(content, "blog", "tom", "index.md")))
+        self.assertEqual(self.site.resolve("/site/about.html"), ("page", os.path.join(content, "about.md")))
+        self.assertEqual(self.site.resolve("/site/index.css"), ("static", os.path.join(static, "index.css")))
+        self.assertEqual(self.site.resolve("/site/blog/tom"), ("redirect", "/site/blog/tom/"))
+        self.assertEqual(self.site.resolve("/site"), ("redirect", "/site/"))
+        for path in ("/index.css", "/site/template.html", "/site/../static/index.css", "/site/missing.html"):
+            self.assertIsNone(self.site.resolve(path), path)
+
+    def test_renders_page_on_request(self):
+        status, headers, body = self.get("/site/")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "text/html; charset=utf-8")
+        self.assertIn(b'<a href="/site/blog/tom/">post</a>', body)
+        self.assertEqual(self.site.render(os.path.join(self.root, "content", "index.md"))[2], True)
+
+    def test_etag_not_modified(self):
+        status, headers, _ = self.get("/site/blog/tom/")
+        etag = headers["ETag"]
+        status, _, body = self.get("/site/blog/tom/", {"If-None-Match": etag})
+        self.assertEqual((status, body), (304, b""))
+
+        self.write("content/blog/tom/index.md", "# Tom\n\nChanged and longer")
+        status, headers, body = self.get("/site/blog/tom/", {"If-None-Match": etag})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], etag)
+        self.assertIn(b"Changed and longer", body)
+
+    def test_edited_image_rerenders_page(self):
+        def write_image(width, height):
+            with open(os.path.join(self.root, "static", "images", "a.png"), "wb") as f:
+                f.write(png(width, height))
+
+        write_image(10, 20)
+        self.write("content/about.md", "# About\n\n![a](/images/a.png)")
+        image_probe.enable(os.path.join(self.root, "static"))
+        self.addCleanup(image_probe.disable)
+        status, headers, body = self.get("/site/about.html")
+        self.assertIn(b'width="10" height="20"', body)
+        etag = headers["ETag"]
+
+        write_image(30, 40)
+        status, headers, body = self.get("/site/about.html", {"If-None-Match": etag})
+        self.assertEqual(status, 200)
+        self.assertIn(b'width="30" height="40"', body)
+        self.assertEqual(self.site.render(os.path.join(self.root, "content", "about.md"))[2], True)
+
+    def test_static_and_missing(self):
+        status, headers, body = self.get("/site/index.css")
+        self.assertEqual((status, headers["Content-Type"], body), (200, "text/css", b"body {}"))
+        status, _, _ = self.get("/site/index.css", {"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, 304)
+        self.assertEqual(self.get("/site/nope.html")[0], 404)
+        status, headers, _ = self.get("/site/blog/tom")
+        self.assertEqual((status, headers["Location"]), (301, "/site/blog/tom/"))
+
+    def test_render_error_is_500(self):
+        self.write("content/about.md", "# About\n\nBroken **bold")
+        self.assertEqual(self.get("/site/about.html")[0], 500)
+
+    def test_nothing_written(self):
+        before = sorted(os.walk(self.root))
+        self.get("/site/")
+        self.get("/site/index.css")
+        self.assertEqual(sorted(os.walk(self.root)), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
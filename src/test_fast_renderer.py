@@ -0,0 +1,97 @@
+import os
+import random
+import unittest
+from benchmark import PATHOLOGICAL_INPUTS, load_corpus, synthetic_corpus
+from fast_renderer import markdown_to_html
+from markdown_processor import markdown_to_html_node
+
+CONTENT_DIR = os.path.join(os.path.dirname(__file__), "..", "content")
+
+# Hand-picked edge cases from the parser tests
+EDGE_CASES = [
+    "",
+    "   \n\n  ",
+    "plain",
+    "# Title",
+    "###### Six",
+    "####### Seven is a paragraph",
+    "  indented\n  block\n\n  second",
+    "a\r\nb\r\n\r\nc",
+    "**bold** _italic_ `code` and **_nested_**",
+    "`a < b && c > \"d\"`",
+    "x & y <z> \"q\"",
+    "[link](/a?b=1&c=\"2\") and ![img](/i.png) and ![](x) and [](y)",
+    "!![not image](x) [a](b)![c](d)[e](f)",
+    "text![a](b)text[c](d)text",
+    "> quote **bold**\n>\n> more",
+    "- one\n- **two**\n  - three",
+    "1. one\n2. two\n3. three",
+    "1. one\n3. three",
+    "```\ncode <b>\n```",
+    "```python\ndef f(x):\n    return x < 1\n```",
+    "```brainfuck\n+++\n```",
+    "```c++ extra\nint x;\n```",
+    "line one\nline   two\twith\ttabs",
+    "unbalanced **bold",
+    "unbalanced _italic",
+    "#",
+    # Line separators that splitlines() breaks on but block typing does not
+    "1. a\u2028b",
+    "- a\x1cb",
+    "- a\u2029- b",
+    "1. a\x852. b\x0c3. c",
+    "1. a\u20283. b",
+]
+
+FRAGMENTS = [
+    "word", "other", " ", "  ", "\t", "**", "_", "`", "[", "]", "(", ")", "!", "#", "# ", "## ", "> ", "- ",
+    "1. ", "2. ", "\n", "\n\n", "```", "```python\n", "&", "<", ">", '"', "[a](/b)", "![a](/b.png)",
+    "**b**", "_i_", "`c`", "é", "日本", "\u2028", "\x1c", "\x85",
+]
+
+
+def random_markdown(rng, length):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(length))
+
+
+class TestFastRendererMatchesTree(unittest.TestCase):
+    def assert_same(self, markdown):
+        for minify in (False, True):
+            try:
+                expected = markdown_to_html_node(markdown).to_html(minify)
+            except ValueError as e:
+                with self.assertRaises(ValueError, msg=repr(markdown)) as raised:
+                    markdown_to_html(markdown, minify)
+                self.assertEqual(str(raised.exception), str(e), repr(markdown))
+                continue
+            self.assertEqual(markdown_to_html(markdown, minify), expected, repr(markdown))
+
+    def test_edge_cases(self):
+        for markdown in EDGE_CASES:
+            with self.subTest(markdown=markdown):
+                self.assert_same(markdown)
+
+    def test_site_content(self):
+        for root, dirs, files in os.walk(CONTENT_DIR):
+            for file in files:
+                with open(os.path.join(root, file), encoding="utf-8") as f:
+                    self.assert_same(f.read())
+        self.assert_same(load_corpus())
+
+    def test_synthetic_corpus(self):
+        for markdown in synthetic_corpus(20):
+            self.assert_same(markdown)
+
+    def test_pathological_inputs(self):
+        for name, (make_input, n, func) in PATHOLOGICAL_INPUTS.items():
+            with self.subTest(name=name):
+                self.assert_same(make_input(50))
+
+    def test_randomized(self):
+        rng = random.Random(40)
+        for _ in range(2000):
+            self.assert_same(random_markdown(rng, rng.randint(1, 40)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+import xml.dom.minidom
+from feed import FeedBuilder, page_summary, page_url
+from output_writers import MemoryWriter
+from page_generator import generate_pages_recursive
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestFeedHelpers(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("blog/tom/index.md"), "blog/tom/")
+        self.assertEqual(page_url("blog/tom.md"), "blog/tom.html")
+        self.assertEqual(page_url("index.md"), "")
+
+    def test_page_summary(self):
+        page = ('<html><title>x</title><body><div class="markdown-body"><h1>A &amp; <i>B</i></h1>'
+                "<p>First</p><ul><li>item</li></ul><p>Never reached</p></div></body></html>")
+        self.assertEqual(page_summary(page, 8), ("A &amp; B", "<p>First</p><ul><li>item</li></ul>"))
+        self.assertEqual(page_summary("<html></html>"), ("", ""))
+
+
+class TestFeedBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write("template.html", TEMPLATE)
+        self.write("content/index.md", "# Home\n\nWelcome")
+        for day, slug in enumerate(("first", "second", "third"), 1):
+            self.write(f"content/blog/{slug}/index.md", f"# Post {slug}\n\nBody of {slug} & more")
+            os.utime(os.path.join(self.content, "blog", slug, "index.md"), (day * 86400, day * 86400))
+        self.state = os.path.join(self.root, "cache", "feed.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def build(self, limit=2):
+        feed = FeedBuilder("https://example.com/", "blog", "/site/", limit, path=self.state)
+        writer = MemoryWriter()
+        generate_pages_recursive(self.content, self.template, "public", "/site/", writer=writer, feed=feed)
+        feed.write(writer)
+        return feed, writer.files["blog/feed.xml"].decode("utf-8")
+
+    def test_newest_posts_from_render_pass(self):
+        feed, xml_text = self.build()
+        self.assertTrue(feed.changed)
+        self.assertEqual([entry["title"] for entry in feed.entries()], ["Post third", "Post second"])
+        entry = feed.entries()[0]
+        self.assertEqual(entry["link"], "https://example.com/site/blog/third/")
+        self.assertEqual(entry["updated"], "1970-01-04T00:00:00Z")
+        self.assertEqual(entry["summary"], "<p>Body of third &amp; more</p>")
+
+        document = xml.dom.minidom.parseString(xml_text)
+        self.assertEqual(document.getElementsByTagName("updated")[0].firstChild.data, "1970-01-04T00:00:00Z")
+        self.assertEqual(len(document.getElementsByTagName("entry")), 2)
+        self.assertIn("&lt;p&gt;Body of third &amp;amp; more&lt;/p&gt;", xml_text)
+
+    def test_unchanged_entries_reuse_previous_feed(self):
+        _, first = self.build()
+        feed, second = self.build()
+        self.assertFalse(feed.changed)
+        self.assertEqual(first, second)
+
+        # An edit to a post outside the newest two does not change the feed
+        self.write("content/blog/first/index.md", "# Post first\n\nEdited")
+        os.utime(os.path.join(self.content, "blog", "first", "index.md"), (1, 1))
+        self.assertFalse(self.build()[0].changed)
+
+        self.write("content/blog/second/index.md", "# Post second\n\nEdited")
+        os.utime(os.path.join(self.content, "blog", "second", "index.md"), (2 * 86400, 2 * 86400))
+        feed, xml_text = self.build()
+        self.assertTrue(feed.changed)
+        self.assertIn("Edited", xml_text)
+
+    def test_same_date_ordered_by_path(self):
+        for slug in ("first", "second", "third"):
+            os.utime(os.path.join(self.content, "blog", slug, "index.md"), (86400, 86400))
+        feed, _ = self.build()
+        self.assertEqual([entry["title"] for entry in feed.entries()], ["Post first", "Post second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
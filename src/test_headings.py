@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from fast_renderer import markdown_to_html
+from headings import HeadingIndex, heading_text, slugify
+from markdown_processor import markdown_to_html_node
+from page_generator import render_mapped_page, render_page
+from span_parser import MappedMarkdown
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Toc }}{{ Content }}"
+MARKDOWN = "# Guide\n\n## Install\n\n### From **source**\n\n## Usage\n\n### Options\n\n## Install"
+
+
+class TestSlugs(unittest.TestCase):
+    def test_heading_text(self):
+        self.assertEqual(heading_text("Use **bold** and `code` in [links](/a) ![logo](/l.png)"),
+                         "Use bold and code in links")
+
+    def test_heading_text_matches_rendered_text(self):
+        for markdown in ("A `code` _and_ **bold** [link](/a)", "snake_case and camel_case", "![logo](/x.png) Logo"):
+            with self.subTest(markdown=markdown):
+                heading = markdown_to_html_node(f"## {markdown}").children[0]
+                rendered = "".join(child.value for child in heading.children if child.tag != "img")
+                self.assertEqual(heading_text(markdown), rendered.strip())
+
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  Tabs\tand   spaces "), "tabs-and-spaces")
+        self.assertEqual(slugify("Ünïcode café"), "ünïcode-café")
+        self.assertEqual(slugify("?!"), "section")
+
+    def test_repeated_headings_get_suffixes(self):
+        headings = HeadingIndex()
+        ids = [headings.add(2, text) for text in ("Notes", "Notes", "Notes-1", "Notes")]
+        self.assertEqual(ids, ["notes", "notes-1", "notes-1-1", "notes-2"])
+
+
+class TestToc(unittest.TestCase):
+    def test_nested_lists(self):
+        headings = HeadingIndex()
+        for level, text in ((1, "Title"), (2, "A"), (3, "A.1"), (4, "A.1.a"), (2, "B"), (3, "B.1"), (3, "B.2")):
+            headings.add(level, text)
+        self.assertEqual(
+            headings.toc_html(),
+            '<nav class="toc"><ul><li><a href="#a">A</a><ul><li><a href="#a1">A.1</a>'
+            '<ul><li><a href="#a1a">A.1.a</a></li></ul></li></ul></li>'
+            '<li><a href="#b">B</a><ul><li><a href="#b1">B.1</a></li><li><a href="#b2">B.2</a></li></ul></li></ul></nav>',
+        )
+
+    def test_skipped_level_closes_back(self):
+        headings = HeadingIndex()
+        for level, text in ((2, "A"), (4, "Deep"), (3, "Mid"), (2, "B")):
+            headings.add(level, text)
+        self.assertEqual(
+            headings.toc_html(),
+            '<nav class="toc"><ul><li><a href="#a">A</a><ul><li><a href="#deep">Deep</a></li>'
+            '<li><a href="#mid">Mid</a></li></ul></li><li><a href="#b">B</a></li></ul></nav>',
+        )
+
+    def test_escapes_text_and_is_empty_without_headings(self):
+        headings = HeadingIndex()
+        headings.add(1, "Only the title")
+        self.assertEqual(headings.toc_html(), "")
+        headings.add(2, "a < b")
+        self.assertIn('<a href="#a-b">a &lt; b</a>', headings.toc_html())
+
+
+class TestRenderedHeadings(unittest.TestCase):
+    def test_renderers_assign_the_same_ids(self):
+        tree = HeadingIndex()
+        html = markdown_to_html_node(MARKDOWN, headings=tree).to_html()
+        fast = HeadingIndex()
+        self.assertEqual(markdown_to_html(MARKDOWN, headings=fast), html)
+        self.assertEqual(fast.headings, tree.headings)
+        self.assertIn('<h3 id="from-source">From <b>source</b></h3>', html)
+        self.assertIn('<h2 id="install-1">Install</h2>', html)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(MARKDOWN)
+            mapped = HeadingIndex()
+            with MappedMarkdown(path) as source:
+                self.assertEqual(source.to_html_node(mapped).to_html(), html)
+            self.assertEqual(mapped.headings, tree.headings)
+
+    def test_toc_slot(self):
+        page = render_page(MARKDOWN, TEMPLATE)
+        self.assertTrue(page.startswith('<title>Guide</title><nav class="toc"><ul><li><a href="#install">Install</a>'))
+        self.assertEqual(render_page(MARKDOWN, TEMPLATE, fast=True), page)
+        self.assertEqual(render_page("# Title\n\nText", TEMPLATE),
+                         '<title>Title</title><div class="markdown-body"><h1 id="title">Title</h1><p>Text</p></div>')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(MARKDOWN)
+            self.assertEqual(render_mapped_page(path, TEMPLATE), page)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from html_minifier import minify_template
+from markdown_processor import markdown_to_html_node
+from page_generator import render_page
+
+
+class TestMinifyTemplate(unittest.TestCase):
+    def test_strips_whitespace_between_tags(self):
+        template = "<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n</html>\n"
+        self.assertEqual(minify_template(template), "<html><head><title>{{ Title }}</title></head></html>")
+
+    def test_keeps_a_space_between_inline_elements(self):
+        template = ('<p><a href="/a">x</a>\n  <a href="/b">y</a> <code>c</code>\t<em>e</em></p>\n'
+                    "<div> <strong>s</strong> </div>")
+        self.assertEqual(
+            minify_template(template),
+            '<p><a href="/a">x</a> <a href="/b">y</a> <code>c</code> <em>e</em></p><div><strong>s</strong></div>',
+        )
+
+    def test_strips_comments(self):
+        template = "<body><!-- navigation -->\n<nav>x</nav></body>"
+        self.assertEqual(minify_template(template), "<body><nav>x</nav></body>")
+
+    def test_collapses_text_whitespace(self):
+        template = "<p>Hello    there\n   world</p>"
+        self.assertEqual(minify_template(template), "<p>Hello there world</p>")
+
+    def test_preserves_pre_and_script(self):
+        template = "<div>\n<pre>  a\n   b</pre>\n<script>\n  var x = 1;\n</script>\n</div>"
+        self.assertEqual(
+            minify_template(template),
+            "<div><pre>  a\n   b</pre><script>\n  var x = 1;\n</script></div>",
+        )
+
+
+class TestMinifiedRendering(unittest.TestCase):
+    def test_content_whitespace_collapsed(self):
+        node = markdown_to_html_node("Some   spaced\ttext and `a   b` code")
+        self.assertEqual(
+            node.to_html(minify=True),
+            '<div class="markdown-body"><p>Some spaced text and <code>a   b</code> code</p></div>',
+        )
+
+    def test_code_block_untouched(self):
+        md = "```\ndef f():\n    return  1\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(node.to_html(minify=True), node.to_html())
+
+    def test_render_page_minified(self):
+        template = "<html>\n  <title>{{ Title }}</title>\n  <body>\n    {{ Content }}\n  </body>\n</html>"
+        page = render_page("# Hi\n\nThere", template, minify=True)
+        self.assertEqual(
+            page,
+            '<html><title>Hi</title><body> <div class="markdown-body"><h1 id="hi">Hi</h1><p>There</p></div> </body></html>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from html_node import HTMLNode, LeafNode, ParentNode
+from html_node import HTMLNode, LeafNode, ParentNode, escape_html
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html_empty(self):
@@ -147,5 +147,21 @@ class TestHTMLNode(unittest.TestCase):
         
         self.assertEqual(page.to_html(), expected)
 
+    def test_escape_html_plain_text_unchanged(self):
+        text = "Nothing special here"
+        self.assertIs(escape_html(text), text)
+
+    def test_escape_html(self):
+        self.assertEqual(escape_html('a < b && c > "d"'), 'a &lt; b &amp;&amp; c &gt; "d"')
+        self.assertEqual(escape_html('say "hi"', quote=True), "say &quot;hi&quot;")
+
+    def test_leaf_value_escaped(self):
+        node = LeafNode("b", "<script>alert(1)</script>")
+        self.assertEqual(node.to_html(), "<b>&lt;script&gt;alert(1)&lt;/script&gt;</b>")
+
+    def test_props_escaped(self):
+        node = LeafNode("a", "x", {"href": '/q?a=1&b="2"'})
+        self.assertEqual(node.to_html(), '<a href="/q?a=1&amp;b=&quot;2&quot;">x</a>')
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,131 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+import image_probe
+from fast_renderer import markdown_to_html
+from image_probe import ImageSizeCache, image_props, probe_dimensions
+from markdown_processor import markdown_to_html_node
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 10
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x03" + b"\x00" * 9
+    return b"\xff\xd8" + app0 + b"\xff\xff" + sof0 + b"\xff\xda"
+
+def webp(chunk, payload):
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+class TestProbeDimensions(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        image_probe.disable()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_formats(self):
+        vp8 = b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 640, 480) + b"\x00" * 4
+        bits = (320 - 1) | ((200 - 1) << 14)
+        vp8l = b"\x2f" + bits.to_bytes(4, "little") + b"\x00" * 5
+        vp8x = b"\x00" * 4 + (1000 - 1).to_bytes(3, "little") + (750 - 1).to_bytes(3, "little")
+        cases = {
+            "a.png": (png(1100, 438), (1100, 438)),
+            "a.gif": (gif(16, 9), (16, 9)),
+            "a.jpg": (jpeg(800, 600), (800, 600)),
+            "lossy.webp": (webp(b"VP8 ", vp8), (640, 480)),
+            "lossless.webp": (webp(b"VP8L", vp8l), (320, 200)),
+            "extended.webp": (webp(b"VP8X", vp8x), (1000, 750)),
+            "text.png": (b"not an image", None),
+            "short.png": (png(1, 1)[:20], None),
+            "short.jpg": (jpeg(8, 8)[:30], None),
+        }
+        for name, (data, expected) in cases.items():
+            with self.subTest(name=name):
+                self.assertEqual(probe_dimensions(self.write(name, data)), expected)
+
+    def test_cache_reuses_unchanged_files(self):
+        path = self.write("images/a.png", png(10, 20))
+        cache_path = os.path.join(self.tmp.name, "cache", "images.json")
+        cache = ImageSizeCache(cache_path)
+        with mock.patch("image_probe.probe_dimensions", wraps=probe_dimensions) as probe:
+            self.assertEqual(cache.dimensions(path), (10, 20))
+            self.assertEqual(cache.dimensions(path), (10, 20))
+            self.assertEqual(probe.call_count, 1)
+            cache.save()
+
+            # A new build loads the saved sizes
+            self.assertEqual(ImageSizeCache(cache_path).dimensions(path), (10, 20))
+            self.assertEqual(probe.call_count, 1)
+
+            self.write("images/a.png", png(30, 40) + b"\x00")
+            self.assertEqual(ImageSizeCache(cache_path).dimensions(path), (30, 40))
+            self.assertEqual(probe.call_count, 2)
+        self.assertIsNone(cache.dimensions(os.path.join(self.tmp.name, "missing.png")))
+
+    def test_image_props(self):
+        self.assertEqual(image_props("/images/a.png", "A"), {"src": "/images/a.png", "alt": "A"})
+        self.write("images/a.png", png(10, 20))
+        image_probe.enable(self.tmp.name)
+        self.assertEqual(
+            image_props("/images/a.png?v=2", "A"),
+            {"src": "/images/a.png?v=2", "alt": "A", "width": "10", "height": "20",
+             "loading": "lazy", "decoding": "async"},
+        )
+        for src in ("https://example.com/a.png", "/images/missing.png", "/../outside.png", "//cdn/a.png"):
+            self.assertEqual(image_props(src, "")["loading"], "lazy")
+            self.assertNotIn("width", image_props(src, ""))
+
+    def test_referenced_images(self):
+        markdown = "![a](/images/b.png) ![b](https://x/c.png) ![c](/images/a.png) ![d](//cdn/e.png) ![e](/images/b.png)"
+        self.assertEqual(image_probe.referenced_images(markdown), ("/images/a.png", "/images/b.png"))
+        self.assertEqual(image_probe.referenced_images(markdown.encode("utf-8")), ("/images/a.png", "/images/b.png"))
+
+    def test_fingerprint_tracks_dimensions(self):
+        sources = ("/images/a.png",)
+        self.assertEqual(image_probe.fingerprint(sources), "")
+        path = self.write("images/a.png", png(10, 20))
+        self.write("images/other.png", png(1, 1))
+        image_probe.enable(self.tmp.name)
+        before = image_probe.fingerprint(sources)
+        self.assertEqual(before, "/images/a.png=(10, 20)")
+
+        # A touch, new bytes with the same size or an unrelated image keep the key
+        os.utime(path, ns=(1, 1))
+        self.write("images/a.png", png(10, 20) + b"\x00")
+        self.write("images/other.png", png(2, 2))
+        self.assertEqual(image_probe.fingerprint(sources), before)
+
+        self.write("images/a.png", png(30, 20))
+        self.assertEqual(image_probe.fingerprint(sources), "/images/a.png=(30, 20)")
+        os.remove(path)
+        self.assertEqual(image_probe.fingerprint(sources), "/images/a.png=None")
+
+    def test_renderers_agree(self):
+        self.write("images/a.png", png(10, 20))
+        image_probe.enable(self.tmp.name)
+        markdown = "![a \"quoted\" alt](/images/a.png) and ![b](/images/b.png)"
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertIn('<img src="/images/a.png" alt="a &quot;quoted&quot; alt" width="10" height="20" '
+                      'loading="lazy" decoding="async"></img>', html)
+        self.assertEqual(markdown_to_html(markdown), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
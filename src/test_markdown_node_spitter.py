@@ -89,5 +89,18 @@ class TestMarkdownNodeSplitter(unittest.TestCase):
         self.assertEqual(split_nodes_image([node]), [node])
         self.assertEqual(split_nodes_link([node]), [node])
 
+    def test_link_text_repeated_in_image(self):
+        # The link must be split at its own position, not at the identical
+        # "[a](b)" text inside the preceding image
+        node = TextNode("![a](b) then [a](b) end", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("![a](b) then ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+                TextNode(" end", TextType.TEXT),
+            ],
+            split_nodes_link([node])
+        )
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
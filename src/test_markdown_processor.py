@@ -34,6 +34,44 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
             '<div class="markdown-body"><pre><code>def hello_world():\n    print("Hello, world!")</code></pre></div>',
         )
 
+    def test_codeblock_with_language(self):
+        md = textwrap.dedent("""\
+            ```python
+            x = 1  # one
+            ```
+        """)
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div class="markdown-body"><pre><code class="language-python">x = '
+            '<span class="tok-number">1</span>  <span class="tok-comment"># one</span></code></pre></div>',
+        )
+
+    def test_codeblock_with_unknown_language(self):
+        md = "```brainfuck\n+[>+<-]\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div class="markdown-body"><pre><code class="language-brainfuck">+[&gt;+&lt;-]</code></pre></div>',
+        )
+
+    def test_codeblock_escaped_once(self):
+        md = "```\nif a < b && c: print('&lt;')\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div class="markdown-body"><pre><code>if a &lt; b &amp;&amp; c: print(\'&amp;lt;\')</code></pre></div>',
+        )
+
+    def test_paragraph_special_characters_escaped(self):
+        node = markdown_to_html_node('Use <div> & "quotes" with [a link](/search?a=1&b="x")')
+        self.assertEqual(
+            node.to_html(),
+            '<div class="markdown-body"><p>Use &lt;div&gt; &amp; "quotes" with '
+            '<a href="/search?a=1&amp;b=&quot;x&quot;">a link</a></p></div>',
+        )
+
     def test_headings(self):
         md = textwrap.dedent("""\
             # Heading 1
@@ -46,7 +84,7 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
         html = node.to_html()
         self.assertEqual(
             html,
-            '<div class="markdown-body"><h1>Heading 1</h1><h2>Heading 2</h2><h3>Heading 3 with <b>bold</b></h3></div>',
+            '<div class="markdown-body"><h1 id="heading-1">Heading 1</h1><h2 id="heading-2">Heading 2</h2><h3 id="heading-3-with-bold">Heading 3 with <b>bold</b></h3></div>',
         )
 
     def test_blockquote(self):
@@ -113,9 +151,9 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
         node = markdown_to_html_node(md)
         html = node.to_html()
         expected_html = '<div class="markdown-body">' + \
-            '<h1>Mixed Markdown Document</h1>' + \
+            '<h1 id="mixed-markdown-document">Mixed Markdown Document</h1>' + \
             '<p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p>' + \
-            '<h2>Subheading</h2>' + \
+            '<h2 id="subheading">Subheading</h2>' + \
             '<ul><li>List item 1</li><li>List item 2</li></ul>' + \
             '<blockquote>This is a blockquote with multiple lines</blockquote>' + \
             '<pre><code>This is a code block\nwith multiple lines\n</code></pre>' + \
@@ -123,9 +161,9 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
             '</div>'
         self.assertIn('<div class="markdown-body">', html)
         self.assertIn("</div>", html)
-        self.assertIn("<h1>Mixed Markdown Document</h1>", html)
+        self.assertIn('<h1 id="mixed-markdown-document">Mixed Markdown Document</h1>', html)
         self.assertIn("<p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p>", html)
-        self.assertIn("<h2>Subheading</h2>", html)
+        self.assertIn('<h2 id="subheading">Subheading</h2>', html)
         self.assertIn("<ul><li>List item 1</li><li>List item 2</li></ul>", html)
         self.assertIn("<blockquote>This is a blockquote with multiple lines</blockquote>", html)
         self.assertIn("<pre><code>This is a code block\nwith multiple lines</code></pre>", html)
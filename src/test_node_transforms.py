@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+from html_node import LeafNode, ParentNode
+from markdown_processor import markdown_to_html_node
+from node_transforms import CollectImages, NodeTransform, RewriteUrls, TransformPipeline, WordCount
+from page_generator import generate_pages_recursive, render_mapped_page, render_page
+from render_cache import RenderCache
+
+MARKDOWN = """
+# Title with **bold**
+
+Some words and a [link](/docs) with ![an image](/a.png).
+
+```
+code words are not counted
+```
+
+- item `code` here
+- ![second](/b.png)
+"""
+
+
+class RecordVisits(NodeTransform):
+    def __init__(self):
+        self.visits = []
+
+    def visit(self, node, ancestors):
+        self.visits.append((node.tag, len(ancestors)))
+
+
+class UppercaseBold(NodeTransform):
+    tags = {"b"}
+
+    def visit(self, node, ancestors):
+        return LeafNode("strong", node.value.upper())
+
+
+class UppercaseText(NodeTransform):
+    def visit(self, node, ancestors):
+        if node.children is None and node.value:
+            node.value = node.value.upper()
+
+
+class TestTransformPipeline(unittest.TestCase):
+    def test_single_traversal_in_registration_order(self):
+        first = RecordVisits()
+        second = type("RecordVisitsAgain", (RecordVisits,), {})()
+        pipeline = TransformPipeline([first, second])
+        node = ParentNode("p", [LeafNode(None, "a"), ParentNode("b", [LeafNode(None, "c")])])
+        pipeline.apply(node)
+        self.assertEqual(first.visits, [("p", 0), (None, 1), ("b", 1), (None, 2)])
+        self.assertEqual(second.visits, first.visits)
+        self.assertEqual(list(pipeline.timings), ["RecordVisits", "RecordVisitsAgain"])
+
+    def test_duplicate_names_rejected(self):
+        with self.assertRaises(ValueError):
+            TransformPipeline([WordCount(), WordCount()])
+
+    def test_tags_filter_and_replacement(self):
+        recorder = RecordVisits()
+        pipeline = TransformPipeline([UppercaseBold(), recorder])
+        html = markdown_to_html_node("hello **bold** text", pipeline).to_html()
+        self.assertEqual(html, '<div class="markdown-body"><p>hello <strong>BOLD</strong> text</p></div>')
+        # The root is visited last, after its blocks
+        self.assertEqual(recorder.visits[-1], ("div", 0))
+        self.assertIn(("strong", 2), recorder.visits)
+
+    def test_builtin_transforms(self):
+        images, words = CollectImages(), WordCount()
+        pipeline = TransformPipeline([RewriteUrls(lambda url: "https://example.com" + url), images, words])
+        html = markdown_to_html_node(MARKDOWN, pipeline).to_html()
+        self.assertIn('<a href="https://example.com/docs">link</a>', html)
+        self.assertEqual(images.images, [("https://example.com/a.png", "an image"),
+                                         ("https://example.com/b.png", "second")])
+        self.assertEqual(words.words, 12)
+        self.assertIn("WordCount", pipeline.report())
+
+    def test_no_transforms_matches_plain_tree(self):
+        self.assertEqual(markdown_to_html_node(MARKDOWN, TransformPipeline()).to_html(),
+                         markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_render_page_falls_back_to_tree(self):
+        pipeline = TransformPipeline([UppercaseBold()])
+        page = render_page("# T\n\n**x**", "{{ Content }}", fast=True, transforms=pipeline)
+        self.assertIn("<strong>X</strong>", page)
+
+    def test_mapped_leaves_take_new_values(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(MARKDOWN)
+            page = render_mapped_page(path, "{{ Content }}", transforms=TransformPipeline([UppercaseText()]))
+        self.assertIn("<p>SOME WORDS AND A ", page)
+        self.assertEqual(page, render_page(MARKDOWN, "{{ Content }}", transforms=TransformPipeline([UppercaseText()])))
+
+    def test_generate_pages_recursive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for name in ("a", "b"):
+                with open(os.path.join(content, f"{name}.md"), "w") as f:
+                    f.write(f"# {name}\n\n![{name}](/{name}.png)")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            images = CollectImages()
+            for use_mmap in (False, True):
+                images.images.clear()
+                generate_pages_recursive(content, template, os.path.join(tmp, "public"), use_mmap=use_mmap,
+                                         transforms=TransformPipeline([images]))
+                self.assertEqual(images.images, [("/a.png", "a"), ("/b.png", "b")])
+
+
+class TestTransformCaching(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(self.content)
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\n[docs](/docs) ![logo](/logo.png)")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.cache = RenderCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, *transforms):
+        generate_pages_recursive(self.content, self.template, self.public, cache=self.cache,
+                                 transforms=TransformPipeline(transforms))
+        with open(os.path.join(self.public, "index.html")) as f:
+            return f.read()
+
+    def test_rewrite_key_is_part_of_cache_key(self):
+        self.assertIn('href="/a/docs"', self.build(RewriteUrls(lambda url: "/a" + url, key="/a")))
+        self.assertIn('href="/b/docs"', self.build(RewriteUrls(lambda url: "/b" + url, key="/b")))
+        self.assertIn('href="/a/docs"', self.build(RewriteUrls(lambda url: "/a" + url, key="/a")))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_uncacheable_transforms_skip_the_cache(self):
+        self.assertIn('href="/a/docs"', self.build(RewriteUrls(lambda url: "/a" + url)))
+        self.assertIn('href="/b/docs"', self.build(RewriteUrls(lambda url: "/b" + url)))
+        for _ in range(2):
+            images = CollectImages()
+            self.build(RewriteUrls(lambda url: url, key="same"), images)
+            self.assertEqual(images.images, [("/logo.png", "logo")])
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+from output_writers import (
+    BackgroundWriter,
+    DirectoryWriter,
+    MemoryWriter,
+    OutputWriter,
+    TarGzWriter,
+    ZipWriter,
+    open_writer,
+)
+from page_generator import generate_pages_recursive
+from static_files import copy_static
+
+
+class TestOutputWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("content/index.md", "# Home\n\nHello")
+        self.write("content/blog/post.md", "# Post\n\nText")
+        self.write("static/template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(os.path.join(self.root, path), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def build(self, target):
+        with open_writer(target) as writer:
+            copy_static(static_dir=self.static, writer=writer)
+            generate_pages_recursive(self.content, os.path.join(self.static, "template.html"), "",
+                                     writer=writer)
+
+    def test_open_writer_picks_backend(self):
+        self.assertIsInstance(open_writer(os.path.join(self.root, "out")), DirectoryWriter)
+        with open_writer(os.path.join(self.root, "a.tar.gz")) as writer:
+            self.assertIsInstance(writer, TarGzWriter)
+        with open_writer(os.path.join(self.root, "a.zip")) as writer:
+            self.assertIsInstance(writer, ZipWriter)
+
+    def test_directory_output(self):
+        out = os.path.join(self.root, "out")
+        self.build(out)
+        with open(os.path.join(out, "blog", "post.html")) as f:
+            self.assertIn('<h1 id="post">Post</h1>', f.read())
+        self.assertTrue(os.path.exists(os.path.join(out, "images", "a.png")))
+        self.assertFalse(os.path.exists(os.path.join(out, "template.html")))
+
+    def test_tar_gz_output(self):
+        path = os.path.join(self.root, "site.tar.gz")
+        self.build(path)
+        with tarfile.open(path) as tar:
+            self.assertEqual(
+                tar.getnames(),
+                ["index.css", "images/a.png", "index.html", "blog/post.html"],
+            )
+            self.assertTrue(all(member.mtime == 315532800 for member in tar.getmembers()))
+            self.assertIn(b'<h1 id="home">Home</h1>', tar.extractfile("index.html").read())
+
+    def test_zip_output(self):
+        path = os.path.join(self.root, "site.zip")
+        self.build(path)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                ["index.css", "images/a.png", "index.html", "blog/post.html"],
+            )
+            self.assertEqual(archive.read("images/a.png"), b"png")
+
+    def test_archives_are_reproducible(self):
+        for name in ("site.tar.gz", "site.zip"):
+            first, second = os.path.join(self.root, "1" + name), os.path.join(self.root, "2" + name)
+            self.build(first)
+            os.utime(os.path.join(self.static, "index.css"), (0, 0))
+            self.build(second)
+            with open(first, "rb") as a, open(second, "rb") as b:
+                self.assertEqual(a.read(), b.read(), name)
+
+    def test_memory_output(self):
+        writer = MemoryWriter()
+        copy_static(static_dir=self.static, writer=writer)
+        generate_pages_recursive(self.content, os.path.join(self.static, "template.html"), "",
+                                 writer=writer)
+        self.assertEqual(sorted(writer.files), ["blog/post.html", "images/a.png", "index.css", "index.html"])
+        self.assertIn(b'<h1 id="home">Home</h1>', writer.files["index.html"])
+
+    def test_directories_created_once(self):
+        out = os.path.join(self.root, "out")
+        os.makedirs(out)
+        writer = DirectoryWriter(out)
+        with mock.patch("output_writers.os.makedirs", wraps=os.makedirs) as makedirs:
+            for i in range(5):
+                writer.write(f"blog/{i}.html", "page")
+                writer.write(f"index{i}.html", "page")
+        self.assertEqual(makedirs.call_count, 2)
+        self.assertEqual(len(os.listdir(os.path.join(out, "blog"))), 5)
+
+    def test_atomic_writes_leave_no_temporary_files(self):
+        out = os.path.join(self.root, "out")
+        with open_writer(out, atomic=True) as writer:
+            writer.write("index.html", "old")
+            writer.write("index.html", "new")
+            writer.copy_file(os.path.join(self.static, "index.css"), "css/index.css")
+        self.assertEqual(sorted(os.listdir(out)), ["css", "index.html"])
+        with open(os.path.join(out, "index.html")) as f:
+            self.assertEqual(f.read(), "new")
+
+    def test_background_writes_flush_on_close(self):
+        memory = MemoryWriter()
+        with BackgroundWriter(memory, max_pending=2, batch_size=3) as writer:
+            for i in range(20):
+                writer.write(f"{i}.html", str(i))
+        self.assertEqual(len(memory.files), 20)
+        self.assertEqual(memory.files["19.html"], b"19")
+
+    def test_background_write_errors_are_raised(self):
+        class FailingWriter(OutputWriter):
+            root = ""
+
+            def write(self, relative_path, data):
+                raise OSError("disk full")
+
+        writer = BackgroundWriter(FailingWriter())
+        writer.write("index.html", "page")
+        with self.assertRaises(OSError):
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from build_errors import ErrorReport
+from output_writers import MemoryWriter
+from page_generator import generate_pages_recursive
+from parallel_build import RenderTimes, estimate_costs, generate_pages_parallel, plan_batches
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestScheduling(unittest.TestCase):
+    def test_estimates_from_history_and_size(self):
+        times = RenderTimes()
+        times.record("a.md", 1000, 0.5)
+        times.record("b.md", 1000, 0.1)
+        costs = estimate_costs({"a.md": 2000, "b.md": 1000, "new.md": 500}, times)
+        self.assertEqual(costs["a.md"], 1.0)
+        self.assertEqual(costs["b.md"], 0.1)
+        # Untimed pages use the average rate of the timed ones: 0.6 s / 2000 bytes
+        self.assertAlmostEqual(costs["new.md"], 0.15)
+
+    def test_estimates_without_history(self):
+        self.assertEqual(estimate_costs({"a.md": 10, "b.md": 0}), {"a.md": 10 * 1e-6, "b.md": 0.0})
+
+    def test_largest_first_and_small_pages_batched(self):
+        costs = {"giant.md": 100.0, "big.md": 20.0}
+        costs.update({f"small{i:02}.md": 1.0 for i in range(40)})
+        batches = plan_batches(costs, jobs=2)
+        self.assertEqual(batches[0], ["giant.md"])
+        self.assertEqual(batches[1], ["big.md"])
+        # 160 s over 2 jobs * 8 batches: small pages travel in tens
+        self.assertEqual([len(batch) for batch in batches[2:]], [10, 10, 10, 10])
+        self.assertEqual(sorted(path for batch in batches for path in batch), sorted(costs))
+
+    def test_batch_page_limit_and_zero_costs(self):
+        batches = plan_batches({f"p{i}.md": 0.0 for i in range(10)}, jobs=4, max_batch_pages=4)
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+
+    def test_render_times_persist(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "times.json")
+            times = RenderTimes(path)
+            times.record("a.md", 10, 0.25)
+            times.save()
+            self.assertEqual(RenderTimes(path).pages, {"a.md": [10, 0.25]})
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+        for i in range(12):
+            path = os.path.join(self.content, f"section{i % 3}", f"page{i}.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"# Page {i}\n\n" + "Some **bold** text. " * (i * 50 + 1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_output_as_sequential(self):
+        sequential = MemoryWriter()
+        expected = generate_pages_recursive(self.content, self.template, "public", writer=sequential)
+        parallel = MemoryWriter()
+        times = RenderTimes()
+        entries = generate_pages_parallel(self.content, self.template, "public", writer=parallel, jobs=2,
+                                          times=times, memory_budget=1)
+        self.assertEqual(parallel.files, sequential.files)
+        self.assertEqual(entries, expected)
+        self.assertEqual(len(times.pages), 12)
+
+    def test_ordered_writes(self):
+        writer = MemoryWriter()
+        generate_pages_parallel(self.content, self.template, "public", writer=writer, jobs=3, ordered=True)
+        self.assertEqual(list(writer.files), [f"section{s}/page{i}.html" for s in range(3)
+                                              for i in sorted(range(s, 12, 3), key=lambda i: f"page{i}.md")])
+
+    def test_errors(self):
+        with open(os.path.join(self.content, "section0", "page3.md"), "w") as f:
+            f.write("# Bad\n\nnot **closed")
+        with self.assertRaises(ValueError):
+            generate_pages_parallel(self.content, self.template, "public", writer=MemoryWriter(), jobs=2)
+        errors = ErrorReport(self.content)
+        entries = generate_pages_parallel(self.content, self.template, "public", writer=MemoryWriter(), jobs=2,
+                                          errors=errors, ordered=True)
+        self.assertEqual(len(entries), 11)
+        self.assertEqual(errors.errors["section0/page3.md"]["blocks"][0]["line"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import threading
+import unittest
+from page_generator import generate_page
+from render_cache import RenderCache, sync_cache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.cache = RenderCache(os.path.join(self.root, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        key = self.cache.key(b"# Hi", "{{ Content }}")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, b"<h1>Hi</h1>")
+        self.assertEqual(self.cache.get(key), b"<h1>Hi</h1>")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_depends_on_every_input(self):
+        base = self.cache.key(b"src", "tpl", "/", (False,))
+        self.assertEqual(base, self.cache.key(b"src", "tpl", "/", (False,)))
+        self.assertNotEqual(base, self.cache.key(b"src2", "tpl", "/", (False,)))
+        self.assertNotEqual(base, self.cache.key(b"src", "tpl2", "/", (False,)))
+        self.assertNotEqual(base, self.cache.key(b"src", "tpl", "/site/", (False,)))
+        self.assertNotEqual(base, self.cache.key(b"src", "tpl", "/", (True,)))
+
+    def test_corrupt_entry_is_discarded(self):
+        key = self.cache.key(b"x", "")
+        self.cache.put(key, b"payload")
+        path = self.cache._path(key)
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"X")
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(os.path.exists(path))
+
+    def test_prune_evicts_least_recently_used(self):
+        keys = [self.cache.key(bytes([i]), "") for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, b"x" * 100)
+            os.utime(self.cache._path(key), ns=(i * 10**9, i * 10**9))
+        entry_size = os.path.getsize(self.cache._path(keys[0]))
+        removed = self.cache.prune(max_bytes=2 * entry_size)
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_concurrent_writers(self):
+        key = self.cache.key(b"same", "")
+        threads = [threading.Thread(target=self.cache.put, args=(key, b"data" * 1000)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get(key), b"data" * 1000)
+        leftovers = [name for name in os.listdir(os.path.dirname(self.cache._path(key))) if name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    def test_sync_to_and_from_shared_store(self):
+        key = self.cache.key(b"page", "")
+        self.cache.put(key, b"rendered")
+        shared = os.path.join(self.root, "shared")
+        self.assertEqual(sync_cache(self.cache.root, shared), 1)
+        self.assertEqual(sync_cache(self.cache.root, shared), 0)
+
+        fresh_root = os.path.join(self.root, "fresh")
+        self.assertEqual(sync_cache(shared, fresh_root), 1)
+        self.assertEqual(RenderCache(fresh_root).get(key), b"rendered")
+
+
+class TestGeneratePageWithCache(unittest.TestCase):
+    def test_second_render_is_a_hit(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            template = os.path.join(root, "template.html")
+            with open(source, "w") as f:
+                f.write("# Title\n\nBody")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            cache = RenderCache(os.path.join(root, "cache"))
+
+            first = generate_page(source, template, os.path.join(root, "a.html"), cache=cache)
+            second = generate_page(source, template, os.path.join(root, "b.html"), cache=cache)
+            self.assertEqual(first, second)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            with open(os.path.join(root, "b.html")) as f:
+                self.assertEqual(f.read(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
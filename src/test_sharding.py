@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from build_errors import ErrorReport
+from manifest import MANIFEST_NAME, load_manifest, new_manifest, read_manifest, save_manifest
+from page_generator import find_pages, generate_pages_recursive
+from sharding import assign_shards, merge_shards, parse_shard, select_shard, shard_info
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestParseShard(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+
+    def test_invalid(self):
+        for spec in ["0/4", "5/4", "x/4", "2", "1/0"]:
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    parse_shard(spec)
+
+
+class TestAssignShards(unittest.TestCase):
+    def test_balanced_by_size(self):
+        sizes = {"a.md": 100, "b.md": 60, "c.md": 50, "d.md": 10}
+        assignment = assign_shards(sizes, 2)
+        loads = [sum(size for path, size in sizes.items() if assignment[path] == i) for i in (1, 2)]
+        self.assertEqual(loads, [110, 110])
+
+    def test_independent_of_input_order(self):
+        sizes = {f"page{i}.md": i % 7 for i in range(50)}
+        reversed_sizes = dict(reversed(list(sizes.items())))
+        self.assertEqual(assign_shards(sizes, 3), assign_shards(reversed_sizes, 3))
+
+    def test_every_page_assigned_once(self):
+        sizes = {f"page{i}.md": 1 for i in range(10)}
+        assignment = assign_shards(sizes, 4)
+        self.assertEqual(set(assignment), set(sizes))
+        self.assertTrue(all(1 <= shard <= 4 for shard in assignment.values()))
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+        for i in range(7):
+            path = os.path.join(self.content, f"section{i % 2}", f"page{i}.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"# Page {i}\n\n" + "text " * (i * 10))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_shard(self, index, count, errors=None, base_path="/", minify=False):
+        dest = os.path.join(self.root, f"out{index}")
+        pages, all_pages = select_shard(find_pages(self.content, dest), self.content, index, count)
+        os.makedirs(dest)
+        entries = generate_pages_recursive(self.content, self.template, dest, base_path, minify, pages=pages,
+                                           errors=errors)
+        save_manifest(dest, new_manifest(entries, base_path, shard_info(index, count, all_pages), minify=minify,
+                                         errors=errors.errors if errors else None))
+        return dest
+
+    def test_merge_combines_all_shards(self):
+        shard_dirs = [self.build_shard(i, 3) for i in (1, 2, 3)]
+        manifest_path = os.path.join(self.root, "cache", "manifest.json")
+        merged = merge_shards(shard_dirs, os.path.join(self.root, "site"), manifest_path=manifest_path)
+        self.assertEqual(len(merged["pages"]), 7)
+        self.assertIsNone(merged["shard"])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "site", "section1", "page5.html")))
+        # The manifest is kept out of the published site
+        self.assertFalse(os.path.exists(os.path.join(self.root, "site", MANIFEST_NAME)))
+        self.assertEqual(read_manifest(manifest_path)["pages"], merged["pages"])
+
+    def test_merge_rejects_other_base_path(self):
+        shard_dirs = [self.build_shard(1, 2), self.build_shard(2, 2, base_path="/blog/")]
+        with self.assertRaises(ValueError) as context:
+            merge_shards(shard_dirs, os.path.join(self.root, "site"))
+        self.assertIn("base path /blog/", str(context.exception))
+
+    def test_merge_rejects_other_minify_setting(self):
+        shard_dirs = [self.build_shard(1, 2), self.build_shard(2, 2, minify=True)]
+        with self.assertRaises(ValueError) as context:
+            merge_shards(shard_dirs, os.path.join(self.root, "site"))
+        self.assertIn("minify", str(context.exception))
+
+    def test_merge_carries_keep_going_errors(self):
+        with open(os.path.join(self.content, "section0", "page2.md"), "w") as f:
+            f.write("No title")
+        shard_dirs = [self.build_shard(i, 3, ErrorReport(self.content)) for i in (1, 2, 3)]
+        merged = merge_shards(shard_dirs, os.path.join(self.root, "site"))
+        self.assertEqual(len(merged["pages"]), 6)
+        self.assertEqual(list(merged["errors"]), ["section0/page2.md"])
+
+    def test_merge_detects_missing_shard(self):
+        shard_dirs = [self.build_shard(i, 3) for i in (1, 3)]
+        with self.assertRaises(ValueError) as context:
+            merge_shards(shard_dirs, os.path.join(self.root, "site"))
+        self.assertIn("Missing shards: 2/3", str(context.exception))
+
+    def test_merge_detects_duplicate_shard(self):
+        shard_dirs = [self.build_shard(i, 2) for i in (1, 2)]
+        with self.assertRaises(ValueError) as context:
+            merge_shards(shard_dirs + [shard_dirs[0]], os.path.join(self.root, "site"))
+        self.assertIn("appears twice", str(context.exception))
+
+    def test_merge_detects_tampered_output(self):
+        shard_dirs = [self.build_shard(i, 2) for i in (1, 2)]
+        manifest = load_manifest(shard_dirs[0])
+        output = next(iter(manifest["pages"].values()))["output"]
+        with open(os.path.join(shard_dirs[0], output), "a") as f:
+            f.write("extra")
+        site = os.path.join(self.root, "site")
+        os.makedirs(site)
+        with open(os.path.join(site, "index.html"), "w") as f:
+            f.write("previous")
+        with self.assertRaises(ValueError) as context:
+            merge_shards(shard_dirs, site)
+        self.assertIn("checksum", str(context.exception))
+        # The previous site is left as it was, with nothing merged into it
+        self.assertEqual(sorted(os.listdir(self.root)), ["content", "out1", "out2", "site", "template.html"])
+        self.assertEqual(os.listdir(site), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
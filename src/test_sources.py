@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from output_writers import MemoryWriter
+from sources import DirectorySource, MemorySource
+
+
+class TestMemorySource(unittest.TestCase):
+    def test_versions_change_on_write(self):
+        source = MemorySource({"b.md": "# B", "a/index.md": b"# A"})
+        self.assertEqual(list(source.files()), ["a/index.md", "b.md"])
+        version = source.version("b.md")
+        source.write("b.md", "# B")
+        self.assertNotEqual(source.version("b.md"), version)
+        self.assertEqual(source.read_text("a/index.md"), "# A")
+
+    def test_missing(self):
+        source = MemorySource({"a.md": "# A"})
+        source.remove("a.md")
+        self.assertIsNone(source.version("a.md"))
+        self.assertFalse(source.exists("a.md"))
+        with self.assertRaises(FileNotFoundError):
+            source.read_bytes("a.md")
+
+
+class TestDirectorySource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "images"))
+        for path, data in (("index.css", "body {}"), ("images/a.png", "png"), (".hidden", "x")):
+            with open(os.path.join(self.root, path), "w") as f:
+                f.write(data)
+        self.source = DirectorySource(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_files_and_versions(self):
+        files = self.source.files()
+        self.assertEqual(list(files), ["index.css", "images/a.png"])
+        self.assertEqual(files["images/a.png"], self.source.version("images/a.png"))
+        self.assertIsNone(self.source.version("missing.css"))
+        self.assertEqual(self.source.read_text("index.css"), "body {}")
+
+    def test_copy_to(self):
+        writer = MemoryWriter()
+        self.source.copy_to(writer, "images/a.png")
+        self.assertEqual(writer.files, {"images/a.png": b"png"})
+
+
+if __name__ == "__main__":
+    unittest.main()
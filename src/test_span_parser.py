@@ -0,0 +1,157 @@
+import os
+import random
+import tempfile
+import unittest
+from build_errors import ErrorReport
+from markdown_processor import markdown_to_html_node
+from page_generator import extract_title, generate_pages_recursive
+from span_parser import MappedMarkdown, SpanLeafNode
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content")
+
+SAMPLES = [
+    "# Title\n\nA paragraph\nover two lines with **bold**, _italic_ and `code`.",
+    "## Heading with [a link](/x) and ![img](/i.png)\n\nText",
+    "- one\n- **two**\n- [three](/3)",
+    "1. first\n2.   second\n3. third _it_",
+    "1. one\n3. three",
+    "> quoted **text**\n> on two lines",
+    "```\ndef f():\n    return 1\n```",
+    "```python\nx = '<tag>'\n```",
+    "Text ![a](b) then [a](b) end & <escaped>",
+    "**bold**_it_`code`[l](/u)",
+    "# a\nb",
+    "Paragraph\n   \n\t\nAfter whitespace-only lines",
+    "Héllo **wörld** — [ünïcode](/ü)",
+    "",
+    "   \n  \n",
+]
+
+
+def random_markdown(rng, blocks=20):
+    words = ["alpha", "beta", "**bold**", "_it_", "`code`", "[link](/l)", "![img](/i)", "x & y", "a<b"]
+    out = []
+    for _ in range(blocks):
+        line = lambda: " ".join(rng.choice(words) for _ in range(rng.randint(1, 8)))
+        kind = rng.randrange(6)
+        if kind == 0:
+            out.append("#" * rng.randint(1, 6) + " " + line())
+        elif kind == 1:
+            out.append("\n".join("- " + line() for _ in range(rng.randint(1, 4))))
+        elif kind == 2:
+            out.append("\n".join(f"{i}. " + line() for i in range(1, rng.randint(2, 5))))
+        elif kind == 3:
+            out.append("\n".join("> " + line() for _ in range(rng.randint(1, 3))))
+        elif kind == 4:
+            out.append("```\n" + line() + "\n```")
+        else:
+            out.append("\n".join(line() for _ in range(rng.randint(1, 4))))
+    return "\n\n".join(out)
+
+
+class TestMappedMarkdown(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, markdown):
+        path = os.path.join(self.tmp.name, "page.md")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(markdown)
+        return path
+
+    def assert_same_html(self, markdown):
+        with MappedMarkdown(self.write(markdown)) as source:
+            self.assertEqual(source.to_html_node().to_html(), markdown_to_html_node(markdown).to_html())
+
+    def test_samples_match_string_parser(self):
+        for markdown in SAMPLES:
+            with self.subTest(markdown=markdown):
+                self.assert_same_html(markdown)
+
+    def test_site_content_matches_string_parser(self):
+        for root, dirs, files in os.walk(CONTENT_DIR):
+            for file in files:
+                with open(os.path.join(root, file), encoding="utf-8") as f:
+                    markdown = f.read()
+                with self.subTest(file=file):
+                    self.assert_same_html(markdown)
+                    with MappedMarkdown(self.write(markdown)) as source:
+                        self.assertEqual(source.title(), extract_title(markdown))
+
+    def test_random_documents_match_string_parser(self):
+        rng = random.Random(1234)
+        for _ in range(50):
+            self.assert_same_html(random_markdown(rng))
+
+    def test_indented_and_crlf_fall_back(self):
+        self.assert_same_html("    # Indented\n\n    text")
+        path = self.write("# Title\r\n\r\nLine one\r\nline two")
+        with MappedMarkdown(path) as source:
+            self.assertTrue(source.needs_fallback())
+            self.assertEqual(
+                source.to_html_node().to_html(),
+                '<div class="markdown-body"><h1 id="title">Title</h1><p>Line one line two</p></div>',
+            )
+
+    def test_other_line_breaks_fall_back(self):
+        for markdown in ("# T\n\n1. a\u2028b", "# T\n\n- a\x1cb", "# T\n\n- a\u2029- b", "x\x85# Title\n\ntext"):
+            with self.subTest(markdown=markdown):
+                try:
+                    expected = markdown_to_html_node(markdown).to_html()
+                except ValueError as e:
+                    expected = str(e)
+                with MappedMarkdown(self.write(markdown)) as source:
+                    self.assertTrue(source.needs_fallback())
+                    try:
+                        html = source.to_html_node().to_html()
+                    except ValueError as e:
+                        html = str(e)
+                    self.assertEqual(html, expected)
+                    self.assertEqual(source.title(), extract_title(markdown))
+
+    def test_paragraph_leaves_are_spans(self):
+        with MappedMarkdown(self.write("Some **bold** text")) as source:
+            paragraph = source.to_html_node().children[0]
+            self.assertTrue(all(isinstance(child, SpanLeafNode) for child in paragraph.children))
+            self.assertEqual(paragraph.children[1].value, "bold")
+
+    def test_invalid_delimiter_raises(self):
+        with MappedMarkdown(self.write("an **unclosed bold")) as source:
+            with self.assertRaises(ValueError) as context:
+                source.to_html_node()
+        self.assertIn("Invalid delimiter usage in: an **unclosed bold", str(context.exception))
+
+    def test_invalid_block_before_the_last_raises(self):
+        # A pending scan of the map must not turn the error into a BufferError on close
+        for markdown in ("# T\n\nan **unclosed bold\n\nlast", "# T\n\n- a\n- b **c\n\nlast"):
+            with self.subTest(markdown=markdown):
+                with self.assertRaises(ValueError) as context:
+                    with MappedMarkdown(self.write(markdown)) as source:
+                        source.to_html_node()
+                self.assertIn("Invalid delimiter usage", str(context.exception))
+
+    def test_keep_going_reports_the_real_error(self):
+        content = os.path.join(self.tmp.name, "content")
+        os.makedirs(content)
+        with open(os.path.join(content, "bad.md"), "w") as f:
+            f.write("# Bad\n\nan **unclosed bold\n\nlast")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("{{ Content }}")
+        errors = ErrorReport(content)
+        generate_pages_recursive(content, template, os.path.join(self.tmp.name, "public"), use_mmap=True,
+                                 errors=errors)
+        self.assertTrue(errors.errors["bad.md"]["error"].startswith("ValueError: Invalid delimiter usage"))
+        self.assertEqual(errors.errors["bad.md"]["blocks"][0]["line"], 3)
+
+    def test_title_missing(self):
+        with MappedMarkdown(self.write("## Not a title")) as source:
+            with self.assertRaises(ValueError):
+                source.title()
+
+
+if __name__ == "__main__":
+    unittest.main()
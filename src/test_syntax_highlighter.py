@@ -0,0 +1,80 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from syntax_highlighter import HighlightCache, highlight, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    def test_round_trip(self):
+        code = 'def f(x):\n    # add one\n    return x + 1  # "done"\n'
+        self.assertEqual("".join(text for _, text in tokenize(code, "python")), code)
+
+    def test_python_tokens(self):
+        tokens = tokenize('def f():\n    return "hi"  # note', "python")
+        self.assertIn(("keyword", "def"), tokens)
+        self.assertIn(("keyword", "return"), tokens)
+        self.assertIn(("string", '"hi"'), tokens)
+        self.assertIn(("comment", "# note"), tokens)
+
+    def test_unterminated_string_runs_to_end_of_line(self):
+        tokens = tokenize('x = "open\ny = 1', "python")
+        self.assertIn(("string", '"open'), tokens)
+        self.assertIn(("number", "1"), tokens)
+
+    def test_shell_tokens(self):
+        tokens = tokenize('echo "$HOME" # comment\nexport PATH=$PATH:/bin', "sh")
+        self.assertIn(("builtin", "echo"), tokens)
+        self.assertIn(("comment", "# comment"), tokens)
+        self.assertIn(("variable", "$PATH"), tokens)
+        self.assertIn(("keyword", "export"), tokens)
+
+    def test_json_tokens(self):
+        tokens = tokenize('{"a": 1.5, "b": [true, null, "x"]}', "json")
+        self.assertIn(("key", '"a"'), tokens)
+        self.assertIn(("number", "1.5"), tokens)
+        self.assertIn(("literal", "true"), tokens)
+        self.assertIn(("string", '"x"'), tokens)
+
+    def test_html_and_css_tokens(self):
+        tokens = tokenize('<a href="/x">hi</a><!-- c -->', "html")
+        self.assertIn(("tag", "<a"), tokens)
+        self.assertIn(("attr", "href"), tokens)
+        self.assertIn(("string", '"/x"'), tokens)
+        self.assertIn(("comment", "<!-- c -->"), tokens)
+        tokens = tokenize("a { color: #fff; margin: 2px; } /* x */", "css")
+        self.assertIn(("property", "color"), tokens)
+        self.assertIn(("number", "#fff"), tokens)
+        self.assertIn(("number", "2px"), tokens)
+        self.assertIn(("comment", "/* x */"), tokens)
+
+    def test_unsupported_language(self):
+        self.assertIsNone(highlight("x", "cobol"))
+
+
+class TestHighlightCache(unittest.TestCase):
+    def test_persisted_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "highlight.json")
+            cache = HighlightCache(path)
+            tokens = cache.tokens("x = 1", "python")
+            cache.save()
+            self.assertTrue(os.path.exists(path))
+
+            reloaded = HighlightCache(path)
+            self.assertEqual(len(reloaded.entries), 1)
+            self.assertEqual([tuple(t) for t in reloaded.tokens("x = 1", "python")], tokens)
+            self.assertFalse(reloaded.dirty)
+
+    def test_evicts_least_recently_used(self):
+        cache = HighlightCache(max_entries=2)
+        cache.tokens("a", "python")
+        cache.tokens("b", "python")
+        cache.tokens("a", "python")
+        cache.tokens("c", "python")
+        self.assertEqual(len(cache.entries), 2)
+        self.assertNotIn(f"python:{hashlib.sha1(b'b').hexdigest()}", cache.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
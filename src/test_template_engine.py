@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from page_generator import fill_template, generate_pages_recursive
+from template_engine import compile_source, load_template, rewrite_paths, select_layout
+
+
+class TestTemplateEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "partials"))
+        os.makedirs(os.path.join(self.root, "layouts"))
+        self.write("partials/header.html", '<header><a href="/">{{ Title }}</a></header>')
+        self.write(
+            "template.html",
+            '<title>{{ Title }}</title>{% include "partials/header.html" %}'
+            "{% block main %}<article>{{ Content }}</article>{% endblock %}"
+            "{% block footer %}<footer>Site</footer>{% endblock %}",
+        )
+        self.write(
+            "layouts/blog.html",
+            '{% extends "../template.html" %}'
+            "{% block main %}<main class=\"post\">{{ Content }}</main>{% endblock main %}",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def write(self, name, text, mtime_ns=None):
+        with open(self.path(name), "w", encoding="utf-8") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(self.path(name), ns=(mtime_ns, mtime_ns))
+
+    def test_variables(self):
+        template = compile_source("<title>{{ Title }}</title>{{Content}}")
+        self.assertEqual(template.render({"Title": "T", "Content": "<p>x</p>"}), "<title>T</title><p>x</p>")
+        self.assertEqual(template.segments, [(False, "<title>"), (True, "Title"), (False, "</title>"),
+                                             (True, "Content")])
+
+    def test_missing_variable_is_kept(self):
+        self.assertEqual(compile_source("a {{ Other }} b").render({}), "a {{ Other }} b")
+
+    def test_include_and_blocks(self):
+        page = load_template(self.path("template.html")).render({"Title": "Home", "Content": "Hi"})
+        self.assertEqual(
+            page,
+            '<title>Home</title><header><a href="/">Home</a></header><article>Hi</article><footer>Site</footer>',
+        )
+
+    def test_layout_overrides_blocks(self):
+        page = load_template(self.path("layouts/blog.html")).render({"Title": "Post", "Content": "Hi"})
+        self.assertEqual(
+            page,
+            '<title>Post</title><header><a href="/">Post</a></header>'
+            '<main class="post">Hi</main><footer>Site</footer>',
+        )
+
+    def test_base_path_and_minify_applied_at_compile_time(self):
+        template = compile_source('<a  href="/x">\n  {{ Content }}\n</a>', "/site/", True)
+        self.assertEqual(template.segments, [(False, '<a href="/site/x"> '), (True, "Content"), (False, " </a>")])
+        self.assertEqual(template.render({"Content": '<img src="/i.png">'}),
+                         '<a href="/site/x"> <img src="/site/i.png"> </a>')
+
+    def test_matches_string_replacement(self):
+        template = '<title>{{ Title }}</title>\n<link href="/index.css" />\n<article>{{ Content }}</article>'
+        html = '<p><a href="/blog">x</a></p>'
+        expected = (template.replace("{{ Title }}", "T").replace("{{ Content }}", html)
+                    .replace('href="/', 'href="/base/').replace('src="/', 'src="/base/'))
+        self.assertEqual(fill_template(template, "T", html, "/base/"), expected)
+        self.assertEqual(rewrite_paths(html), html)
+
+    def test_cache_invalidated_by_included_file(self):
+        first = load_template(self.path("layouts/blog.html"))
+        self.assertIs(load_template(self.path("layouts/blog.html")), first)
+        self.write("partials/header.html", "<header>New</header>", mtime_ns=1)
+        second = load_template(self.path("layouts/blog.html"))
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.fingerprint, first.fingerprint)
+        self.assertIn("<header>New</header>", second.render({}))
+
+    def test_errors(self):
+        for source in ("{% block a %}", "{% endblock %}", "{% unknown %}",
+                       '{% block a %}{% extends "x" %}{% endblock %}'):
+            with self.assertRaises(ValueError):
+                compile_source(source)
+        self.write("loop.html", '{% include "loop.html" %}')
+        with self.assertRaises(ValueError):
+            load_template(self.path("loop.html"))
+
+    def test_select_layout(self):
+        template = self.path("template.html")
+        self.assertEqual(select_layout(template, "blog/post/index.md"), self.path("layouts/blog.html"))
+        self.assertEqual(select_layout(template, "contact/index.md"), template)
+        self.assertEqual(select_layout(template, "blog.md"), template)
+
+    def test_sections_use_their_layout(self):
+        content = self.path("content")
+        os.makedirs(os.path.join(content, "blog"))
+        with open(os.path.join(content, "index.md"), "w") as f:
+            f.write("# Home")
+        with open(os.path.join(content, "blog", "post.md"), "w") as f:
+            f.write("# Post")
+        public = self.path("public")
+        generate_pages_recursive(content, self.path("template.html"), public)
+        with open(os.path.join(public, "index.html")) as f:
+            self.assertIn("<article>", f.read())
+        with open(os.path.join(public, "blog", "post.html")) as f:
+            self.assertIn('<main class="post">', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()